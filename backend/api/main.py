@@ -1,25 +1,173 @@
-from fastapi import FastAPI
-from pydantic import BaseModel
-from typing import List, Optional
-
-from backend.models.schema import Brief, LayoutResponse, LayoutResult, Pins
-from backend.core.orchestrator import Orchestrator
-from backend.interaction.service import generate_candidates, apply_pins_and_optimize, Candidate, local_edit_move, local_edit_resize
+import asyncio
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from fastapi import FastAPI, HTTPException, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from pydantic import BaseModel, ValidationError
+from typing import FrozenSet, List, Literal, Optional
+
+from backend.models.schema import Brief, EditPreview, EditResult, JobStatus, LayoutResponse, LayoutResult, Pins, SessionState
+from backend.core.orchestrator import Orchestrator, sections
+from backend.core.jobs import JobQueue, QueueFull, default_job_queue
+from backend.core.batch import BatchRunner, ndjson
+from backend.core.offload import Overloaded, WorkPool, candidate_stream_task, candidates_task, edit_task, export_task, layout_task, optimize_task
+from backend.core.telemetry import RequestMetrics, registry
+from backend.core.tracing import chrome_trace
+from backend.core.warmup import warm_up
+from backend.interaction.service import Candidate
+from backend.interaction.session import Session, SessionStore, default_session_store
 from backend.interaction.prefs import update_from_choice, load_weights
 from backend.qa.human_eval import record_rating, record_pairwise
+from backend.rules.profiling import profiler
+
+# Process state is built on first use (the lifespan builds it at startup), not at import:
+# importing the app stays light and a pre-forked server process builds its own
+
+
+@lru_cache(maxsize=None)
+def orchestrator() -> Orchestrator:
+    return Orchestrator()
+
+
+@lru_cache(maxsize=None)
+def work_pool() -> WorkPool:
+    # CPU-heavy handlers run here, off the event loop, so light endpoints stay responsive
+    return WorkPool()
+
+
+@lru_cache(maxsize=None)
+def job_queue() -> JobQueue:
+    return default_job_queue(orchestrator(), work_pool())
+
+
+@lru_cache(maxsize=None)
+def batch_runner() -> BatchRunner:
+    return BatchRunner(orchestrator=orchestrator())
+
+
+@lru_cache(maxsize=None)
+def session_store() -> SessionStore:
+    return default_session_store(orchestrator())
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Warm up and start candidate workers before the first request; stop them with the server.
+    # Under the pre-fork server the parent has already warmed up and this is a no-op.
+    warm_up()
+    orchestrator().pool.warm()
+    work_pool().warm()
+    job_queue().start()
+    yield
+    job_queue().shutdown()
+    work_pool().shutdown()
+    batch_runner().shutdown()
+    orchestrator().pool.shutdown()
+
+
+app = FastAPI(title="House Blueprint AI", version="0.1.0", lifespan=lifespan)
+app.add_middleware(RequestMetrics)
+
+# Live counters and queue depths, read on every /metrics scrape
+registry.sample("blueprint_result_cache_hits_total", "Layout responses served from the result cache", lambda: orchestrator().cache.hits, "counter")
+registry.sample("blueprint_result_cache_misses_total", "Result cache lookups that had to compute", lambda: orchestrator().cache.misses, "counter")
+registry.sample("blueprint_coalesced_runs_total", "Layout runs answered by a concurrent identical run", lambda: orchestrator().flights.shared, "counter")
+registry.sample("blueprint_work_inflight", "Requests admitted to the work pool", lambda: work_pool().inflight)
+registry.sample("blueprint_work_capacity", "Requests the work pool admits before shedding", lambda: work_pool().capacity)
+registry.sample("blueprint_work_rejected_total", "Requests shed with 503 by the work pool", lambda: work_pool().rejected, "counter")
+registry.sample("blueprint_job_queue_depth", "Layout jobs waiting for a worker", lambda: job_queue().depth)
+registry.sample("blueprint_job_rejected_total", "Layout jobs refused with 503 (queue full)", lambda: job_queue().rejected, "counter")
+registry.sample("blueprint_sessions", "Live editing sessions", lambda: len(session_store()))
 
-app = FastAPI(title="House Blueprint AI", version="0.1.0")
-orch = Orchestrator()
+
+@app.exception_handler(Overloaded)
+@app.exception_handler(QueueFull)
+async def overloaded(request: Request, exc: Exception):
+    return JSONResponse(status_code=503, content={"detail": f"server busy: {exc}"}, headers={"Retry-After": "1"})
+
+
+def _compute(brief: Brief, timings: bool, deadline_ms: Optional[float], parts: FrozenSet[str]) -> LayoutResponse:
+    # Cache lookup and request coalescing stay in Orchestrator.run; only the pipeline run is offloaded
+    return work_pool().execute(layout_task, brief, timings, deadline_ms, parts)
 
 
 @app.get("/health")
-def health():
+async def health():
     return {"status": "ok"}
 
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Process metrics in the Prometheus text format."""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+@app.get("/rules/profile")
+async def rules_profile():
+    return {"enabled": profiler.enabled, "rules": profiler.snapshot()}
+
+
+class ProfileToggle(BaseModel):
+    enabled: bool
+    reset: bool = False
+
+
+@app.post("/rules/profile")
+async def rules_profile_set(req: ProfileToggle):
+    if req.reset:
+        profiler.reset()
+    if req.enabled:
+        profiler.enable()
+    else:
+        profiler.disable()
+    return {"enabled": profiler.enabled}
+
+
 @app.post("/layout", response_model=LayoutResponse)
-def generate_layout(brief: Brief):
-    return orch.run(brief.model_dump())
+async def generate_layout(brief: Brief, timings: bool = False, deadline_ms: Optional[float] = None, include: Optional[str] = None):
+    """``include``: comma-separated optional sections to compute (cost, analysis, metrics,
+    governance); the others are skipped and returned empty. Default: all."""
+    try:
+        parts = sections(s.strip() for s in include.split(",") if s.strip()) if include is not None else None
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    return await work_pool().call(orchestrator().run, brief, timings, deadline_ms, _compute, parts)
+
+
+@app.post("/layout/batch")
+async def generate_layouts(briefs: List[Brief], deadline_ms: Optional[float] = None):
+    """Solve many briefs on the batch workers; streams one NDJSON record per brief as it finishes."""
+    records = batch_runner().run(briefs, deadline_ms=deadline_ms)
+    return StreamingResponse(work_pool().stream(ndjson(records)), media_type="application/x-ndjson")
+
+
+@app.post("/layout/trace")
+async def trace_layout(brief: Brief):
+    """Run the pipeline and return its stage timings as Chrome trace JSON."""
+    resp = await work_pool().call(orchestrator().run, brief, True, None, _compute)
+    return chrome_trace(resp.timings)
+
+
+@app.post("/jobs/layout", response_model=JobStatus, status_code=202)
+async def submit_layout_job(brief: Brief, deadline_ms: Optional[float] = None):
+    """Queue a layout run; poll GET /jobs/{id} for progress and the result."""
+    return job_queue().submit(brief, deadline_ms=deadline_ms).to_status()
+
+
+@app.get("/jobs/{job_id}", response_model=JobStatus)
+async def get_job(job_id: str):
+    status = job_queue().get(job_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail="unknown job")
+    return status
+
+
+@app.post("/jobs/{job_id}/cancel", response_model=JobStatus)
+async def cancel_job(job_id: str):
+    status = job_queue().cancel(job_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail="unknown job")
+    return status
 
 
 class CandidatesRequest(BaseModel):
@@ -28,8 +176,29 @@ class CandidatesRequest(BaseModel):
 
 
 @app.post("/candidates", response_model=List[Candidate])
-def list_candidates(req: CandidatesRequest):
-    return generate_candidates(req.brief, k=req.k)
+async def list_candidates(req: CandidatesRequest):
+    return await work_pool().run(candidates_task, req.brief, req.k)
+
+
+@app.post("/candidates/stream")
+async def stream_candidates(req: CandidatesRequest, format: Literal["ndjson", "sse"] = "ndjson"):
+    """Candidates as each is produced and explained, then their final ranking: NDJSON, or
+    server-sent events with format=sse (``candidate`` and ``rank`` events).
+
+    Candidates arrive in provisional (soft cost) order, the first one before the solve; the
+    critic's ranking follows as rank updates (``CandidateUpdate``). They are produced on a
+    work pool process and sent back record by record."""
+    records = work_pool().produce(candidate_stream_task, req.brief, req.k)
+    if format == "sse":
+        return StreamingResponse(work_pool().stream(_sse(records)), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+    return StreamingResponse(work_pool().stream(ndjson(records)), media_type="application/x-ndjson")
+
+
+def _sse(records):
+    for record in records:
+        line = next(ndjson([record]))
+        yield f"event: {'rank' if record['final'] else 'candidate'}\ndata: {line}\n"
+    yield "event: end\ndata: {}\n\n"
 
 
 class OptimizeWithPinsRequest(BaseModel):
@@ -38,9 +207,9 @@ class OptimizeWithPinsRequest(BaseModel):
     pins: Pins
 
 
-@app.post("/optimize", response_model=LayoutResult)
-def optimize_with_pins(req: OptimizeWithPinsRequest):
-    return apply_pins_and_optimize(req.brief, req.layout, req.pins)
+@app.post("/optimize", response_model=EditResult)
+async def optimize_with_pins(req: OptimizeWithPinsRequest):
+    return await work_pool().run(optimize_task, req.brief, req.layout, req.pins)
 
 
 class MoveOp(BaseModel):
@@ -62,14 +231,137 @@ class EditRequest(BaseModel):
     resize: Optional[ResizeOp] = None
 
 
-@app.post("/edit", response_model=LayoutResult)
-def apply_edit(req: EditRequest):
-    layout = req.layout
-    if req.move:
-        layout = local_edit_move(layout, req.move.name, req.move.dx, req.move.dy, req.brief)
-    if req.resize:
-        layout = local_edit_resize(layout, req.resize.name, req.resize.dw, req.resize.dh, req.brief)
-    return layout
+@app.post("/edit", response_model=EditResult)
+async def apply_edit(req: EditRequest):
+    move = (req.move.name, req.move.dx, req.move.dy) if req.move else None
+    resize = (req.resize.name, req.resize.dw, req.resize.dh) if req.resize else None
+    return await work_pool().run(edit_task, req.brief, req.layout, move, resize)
+
+
+class SessionCreate(BaseModel):
+    brief: Brief
+    layout: Optional[LayoutResult] = None  # default: solve the brief
+
+
+class SessionEdit(BaseModel):
+    move: Optional[MoveOp] = None
+    resize: Optional[ResizeOp] = None
+    pins: Optional[Pins] = None  # re-optimise around these rooms
+
+
+def _session(session_id: str) -> Session:
+    session = session_store().get(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="session not found")
+    return session
+
+
+@app.post("/sessions", response_model=SessionState, status_code=201)
+async def create_session(req: SessionCreate, cost: bool = False):
+    """Start an editing session; later edits send only the change, not brief and layout."""
+
+    def create() -> SessionState:
+        layout = req.layout or orchestrator().run(req.brief, compute=_compute, include=()).layout
+        return session_store().create(req.brief, layout).to_state(cost=cost)
+
+    return await work_pool().call(create)
+
+
+@app.get("/sessions/{session_id}", response_model=SessionState)
+async def get_session(session_id: str, cost: bool = False):
+    session = _session(session_id)
+    return await work_pool().call(session.to_state, None, cost) if cost else session.to_state()
+
+
+@app.patch("/sessions/{session_id}", response_model=SessionState)
+async def edit_session(session_id: str, req: SessionEdit, cost: bool = False):
+    """Apply an edit; only the changed rooms and the rooms depending on them are re-validated."""
+    session = _session(session_id)
+    move = (req.move.name, req.move.dx, req.move.dy) if req.move else None
+    resize = (req.resize.name, req.resize.dw, req.resize.dh) if req.resize else None
+
+    def edit() -> SessionState:
+        try:
+            delta = session.edit(move, resize, req.pins)
+        except KeyError as e:
+            raise HTTPException(status_code=422, detail=f"unknown room: {e.args[0]}")
+        return session.to_state(delta, cost)
+
+    return await work_pool().call(edit)
+
+
+class PreviewRequest(BaseModel):
+    move: Optional[MoveOp] = None
+    resize: Optional[ResizeOp] = None
+    cost: bool = True  # include the cost change (about 1 ms of the preview)
+    seq: Optional[int] = None  # echoed back
+
+
+def _preview(session: Session, req: PreviewRequest) -> EditPreview:
+    move = (req.move.name, req.move.dx, req.move.dy) if req.move else None
+    resize = (req.resize.name, req.resize.dw, req.resize.dh) if req.resize else None
+    try:
+        preview = session.preview(move, resize, cost=req.cost)
+    except KeyError as e:
+        raise HTTPException(status_code=422, detail=f"unknown room: {e.args[0]}")
+    preview.seq = req.seq
+    return preview
+
+
+@app.post("/sessions/{session_id}/preview", response_model=EditPreview)
+async def preview_edit(session_id: str, req: PreviewRequest):
+    """What an edit would change (overlaps, corridor, violations, cost), without applying it."""
+    return await work_pool().call(_preview, _session(session_id), req)
+
+
+@app.websocket("/sessions/{session_id}/preview")
+async def preview_channel(ws: WebSocket, session_id: str):
+    """Drag preview channel: one PreviewRequest per pointer move, one EditPreview back.
+
+    When moves arrive faster than previews are computed, only the latest unanswered move is
+    answered. Errors come back as ``{"seq", "error"}`` and keep the channel open.
+    """
+    session = session_store().get(session_id)
+    if session is None:
+        await ws.close(code=1008)
+        return
+    await ws.accept()
+    latest: "asyncio.Queue[Optional[str]]" = asyncio.Queue(maxsize=1)
+
+    async def receive() -> None:
+        try:
+            while True:
+                text = await ws.receive_text()
+                if latest.full():
+                    latest.get_nowait()  # superseded by a newer pointer position
+                latest.put_nowait(text)
+        except WebSocketDisconnect:
+            if latest.full():
+                latest.get_nowait()
+            latest.put_nowait(None)
+
+    reader = asyncio.create_task(receive())
+    try:
+        while (text := await latest.get()) is not None:
+            req = None
+            try:
+                req = PreviewRequest.model_validate_json(text)
+                reply = (await work_pool().call(_preview, session, req)).model_dump(mode="json")
+            except ValidationError as e:
+                reply = {"seq": None, "error": str(e)}
+            except (HTTPException, Overloaded) as e:
+                reply = {"seq": req.seq if req else None, "error": e.detail if isinstance(e, HTTPException) else f"server busy: {e}"}
+            await ws.send_json(reply)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        reader.cancel()
+
+
+@app.delete("/sessions/{session_id}", status_code=204)
+async def delete_session(session_id: str):
+    if not session_store().delete(session_id):
+        raise HTTPException(status_code=404, detail="session not found")
 
 
 class ExportRequest(BaseModel):
@@ -79,8 +371,8 @@ class ExportRequest(BaseModel):
 
 
 @app.post("/export")
-def export_payload(req: ExportRequest):
-    return orch.export(req.brief, req.layout, req.formats)
+async def export_payload(req: ExportRequest):
+    return await work_pool().run(export_task, req.brief, req.layout, req.formats)
 
 
 class RatingRequest(BaseModel):
@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import os
+import signal
+import socket
+import sys
+from typing import List
+
+
+def _listen(host: str, port: int, backlog: int = 2048) -> socket.socket:
+    sock = socket.socket(socket.AF_INET6 if ":" in host else socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+# Exit status of a server process whose startup (lifespan) failed, as with uvicorn's CLI
+STARTUP_FAILURE = 3
+
+
+def _run_server(sock: socket.socket, log_level: str) -> int:
+    import uvicorn
+
+    from backend.api.main import app
+
+    server = uvicorn.Server(uvicorn.Config(app, log_level=log_level, lifespan="on"))
+    server.run(sockets=[sock])
+    return 0 if server.started else STARTUP_FAILURE
+
+
+def serve(host: str = "127.0.0.1", port: int = 8000, workers: int = 1, log_level: str = "info") -> int:
+    """Serve the API from a warmed-up parent, forking ``workers`` server processes.
+
+    The parent imports the app and runs ``warm_up`` before it binds the socket, so every
+    process starts with the imports, compiled rules and OR-Tools state already loaded
+    (shared copy-on-write) and nothing connects before the server is warm. A worker that dies
+    is replaced by a fresh fork of the warm parent.
+
+    With several server processes, layouts compute in the process that took the request
+    unless BLUEPRINT_API_WORKERS / BLUEPRINT_CANDIDATE_WORKERS say otherwise (nested pools
+    would start from a cold forkserver). Each process keeps its own /metrics and in-memory
+    jobs; set BLUEPRINT_JOB_DB so any process can answer for a job.
+    """
+    workers = max(1, workers)
+    if workers > 1:
+        os.environ.setdefault("BLUEPRINT_API_WORKERS", "0")
+        os.environ.setdefault("BLUEPRINT_CANDIDATE_WORKERS", "0")
+    import backend.api.main  # noqa: F401  (the app; each server process builds its own state)
+    from backend.core.warmup import warm_up
+
+    print(f"warm-up took {warm_up() * 1e3:.0f} ms", file=sys.stderr)
+    sock = _listen(host, port)
+    if workers == 1:
+        return _run_server(sock, log_level)
+
+    children: List[int] = []
+    stopping = False
+
+    def spawn() -> None:
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            code = 1
+            try:
+                code = _run_server(sock, log_level)
+            finally:
+                os._exit(code)
+        children.append(pid)
+
+    def stop(signum: int, frame: object) -> None:
+        nonlocal stopping
+        stopping = True
+        for pid in children:
+            os.kill(pid, signal.SIGTERM)
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    for _ in range(workers):
+        spawn()
+    failed = False
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        if pid not in children:
+            continue
+        children.remove(pid)
+        if stopping:
+            continue
+        if os.waitstatus_to_exitcode(status) == STARTUP_FAILURE:
+            # Respawning would only fail again
+            print(f"server process {pid} failed to start; stopping", file=sys.stderr)
+            failed = True
+            stop(signal.SIGTERM, None)
+        else:
+            spawn()
+    sock.close()
+    return 1 if failed else 0
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Any, Dict, List
+
+
+def solve(args: argparse.Namespace) -> int:
+    """Solve brief files and stream one NDJSON record per brief as it finishes."""
+    from pydantic import ValidationError
+
+    from backend.core.batch import BatchRunner, ndjson
+    from backend.models.schema import Brief
+
+    paths: List[str] = []
+    briefs: List[Brief] = []
+    failed = 0
+    for p in args.briefs:
+        try:
+            briefs.append(Brief(**json.loads(Path(p).read_text(encoding="utf-8"))))
+            paths.append(p)
+        except (OSError, ValueError, ValidationError) as e:
+            failed += 1
+            sys.stdout.write(next(ndjson([{"path": p, "status": "error", "error": f"{type(e).__name__}: {e}"}])))
+
+    runner = BatchRunner(workers=args.jobs)
+    try:
+        for rec in runner.run(briefs, deadline_ms=args.deadline_ms):
+            failed += rec["status"] != "ok"
+            rec = {"path": paths[rec.pop("index")], **rec}
+            sys.stdout.write(next(ndjson([rec])))
+            sys.stdout.flush()
+    finally:
+        runner.shutdown()
+    return 1 if failed else 0
+
+
+def serve(args: argparse.Namespace) -> int:
+    """Run the API server, warmed up before it accepts connections (pre-forked with --workers)."""
+    from backend.api.server import serve as run
+
+    return run(args.host, args.port, workers=args.workers, log_level=args.log_level)
+
+
+def main(argv: List[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m backend.cli", description="House Blueprint AI command line")
+    sub = ap.add_subparsers(dest="command", required=True)
+    sp = sub.add_parser("solve", help=solve.__doc__, description=solve.__doc__)
+    sp.add_argument("briefs", nargs="+", help="brief JSON files (e.g. briefs/*.json)")
+    sp.add_argument("--jobs", "-j", type=int, default=1, help="worker processes (1: solve in-process)")
+    sp.add_argument("--deadline-ms", type=float, default=None, help="latency budget per brief")
+    sp.set_defaults(func=solve)
+    sp = sub.add_parser("serve", help=serve.__doc__, description=serve.__doc__)
+    sp.add_argument("--host", default="127.0.0.1")
+    sp.add_argument("--port", type=int, default=8000)
+    sp.add_argument("--workers", "-w", type=int, default=1, help="server processes forked from the warm parent")
+    sp.add_argument("--log-level", default="info")
+    sp.set_defaults(func=serve)
+    args = ap.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, Iterable, Iterator, Optional, Sequence
+
+from backend.core.orchestrator import Orchestrator
+from backend.core.pool import CandidatePool, process_context
+from backend.core.warmup import warm_up
+from backend.models.schema import Brief
+from backend.rules.profiling import profiler, run_profiled
+
+# Per-process orchestrator, created once per worker by _warm and reused for every brief
+_orch: Optional[Orchestrator] = None
+
+
+def _warm() -> None:
+    global _orch
+    # Batch workers screen candidates in-process rather than through a nested pool
+    _orch = Orchestrator(pool=CandidatePool(workers=0))
+    warm_up()  # solve a tiny brief so the first real task runs warm
+
+
+def _solve(orch: Orchestrator, index: int, brief: Brief | Dict[str, Any], deadline_ms: Optional[float]) -> Dict[str, Any]:
+    try:
+        resp = orch.run(brief, deadline_ms=deadline_ms)
+    except Exception as e:  # one bad brief must not end the batch
+        return {"index": index, "status": "error", "error": f"{type(e).__name__}: {e}"}
+    return {"index": index, "status": "ok", "result": resp.model_dump(mode="json")}
+
+
+def _solve_in_worker(index: int, brief: Brief | Dict[str, Any], deadline_ms: Optional[float]) -> Dict[str, Any]:
+    if _orch is None:
+        _warm()
+    return _solve(_orch, index, brief, deadline_ms)
+
+
+def default_batch_workers() -> int:
+    env = os.environ.get("BLUEPRINT_BATCH_WORKERS")
+    return max(0, int(env)) if env is not None else (os.cpu_count() or 1)
+
+
+def ndjson(records: Iterable[Dict[str, Any]]) -> Iterator[str]:
+    for rec in records:
+        yield json.dumps(rec, separators=(",", ":")) + "\n"
+
+
+class BatchRunner:
+    """Solves many briefs on warm worker processes, yielding each record as it finishes.
+
+    Records are ``{"index", "status": "ok", "result"}`` or ``{"index", "status": "error",
+    "error"}`` in completion order. Each worker keeps one Orchestrator, so compiled rules and
+    geometry caches are shared by every brief it solves. With at most one worker (or a broken
+    pool) briefs run in-process on ``orchestrator``.
+    """
+
+    def __init__(self, workers: Optional[int] = None, orchestrator: Optional[Orchestrator] = None) -> None:
+        self.workers = default_batch_workers() if workers is None else max(0, workers)
+        self.orchestrator = orchestrator
+        self._lock = threading.Lock()
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                ctx = process_context(["backend.core.batch"])
+                self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=ctx, initializer=_warm)
+            return self._executor
+
+    def shutdown(self) -> None:
+        with self._lock:
+            ex, self._executor = self._executor, None
+        if ex is not None:
+            ex.shutdown(wait=True, cancel_futures=True)
+
+    def run(self, briefs: Sequence[Brief | Dict[str, Any]], deadline_ms: Optional[float] = None) -> Iterator[Dict[str, Any]]:
+        todo = dict(enumerate(briefs))
+        if self.workers > 1 and len(todo) > 1:
+            try:
+                yield from self._run_parallel(todo, deadline_ms)
+                return
+            except BrokenProcessPool:
+                self.shutdown()  # recreated on the next batch; finish this one in-process
+        if self.orchestrator is None:
+            self.orchestrator = Orchestrator()
+        for i, brief in todo.items():
+            yield _solve(self.orchestrator, i, brief, deadline_ms)
+
+    def _run_parallel(self, todo: Dict[int, Brief | Dict[str, Any]], deadline_ms: Optional[float]) -> Iterator[Dict[str, Any]]:
+        ex = self._get_executor()
+        queued = iter(list(todo.items()))
+        running: Dict[Future, int] = {}
+
+        def fill() -> None:
+            # Keep a short window in flight so a dropped stream leaves little work behind
+            for i, brief in queued:
+                running[ex.submit(run_profiled, profiler.enabled, _solve_in_worker, i, brief, deadline_ms)] = i
+                if len(running) >= 2 * self.workers:
+                    break
+
+        try:
+            fill()
+            while running:
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for f in done:
+                    rec, stats = f.result()
+                    profiler.merge(stats)
+                    del running[f], todo[rec["index"]]
+                    yield rec
+                fill()
+        finally:
+            for f in running:
+                f.cancel()
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional
+
+# Share of the request budget reserved for each stage, in pipeline order. A stage may use
+# whatever is left minus the reserves of the stages after it, so time saved early carries over.
+STAGE_SHARES: Dict[str, float] = {"solve": 0.6, "candidates": 0.25, "finalize": 0.15}
+_ORDER = list(STAGE_SHARES)
+
+# Below this a CP-SAT call is not worth starting; the heuristic layout is kept instead
+MIN_CPSAT_S = 0.02
+# Rough cost of screening and scoring one candidate, used to size the candidate set
+CANDIDATE_COST_S = 0.003
+
+_current: ContextVar[Optional["Deadline"]] = ContextVar("blueprint_deadline", default=None)
+
+
+class Deadline:
+    """Latency budget of one request and what had to be cut to meet it."""
+
+    def __init__(self, deadline_ms: float) -> None:
+        self.total_s = max(0.0, deadline_ms) / 1e3
+        self.end = time.perf_counter() + self.total_s
+        self.reasons: List[str] = []
+
+    @property
+    def degraded(self) -> bool:
+        return bool(self.reasons)
+
+    def remaining(self) -> float:
+        return max(0.0, self.end - time.perf_counter())
+
+    def expired(self) -> bool:
+        return time.perf_counter() >= self.end
+
+    def allot(self, stage: str) -> float:
+        """Seconds ``stage`` may use now: what is left minus the shares of later stages."""
+        later = _ORDER[_ORDER.index(stage) + 1 :]
+        return max(0.0, self.remaining() - self.total_s * sum(STAGE_SHARES[s] for s in later))
+
+    def stage_end(self, stage: str) -> float:
+        """Absolute ``perf_counter`` time by which ``stage`` should be done."""
+        return time.perf_counter() + self.allot(stage)
+
+    def degrade(self, reason: str) -> None:
+        if reason not in self.reasons:
+            self.reasons.append(reason)
+
+
+@contextmanager
+def deadline(deadline_ms: Optional[float]) -> Iterator[Optional[Deadline]]:
+    """Make a new Deadline current for the block (yields None without a budget)."""
+    if deadline_ms is None:
+        yield None
+        return
+    d = Deadline(deadline_ms)
+    token = _current.set(d)
+    try:
+        yield d
+    finally:
+        _current.reset(token)
+
+
+def current_deadline() -> Optional[Deadline]:
+    return _current.get()
+
+
+@contextmanager
+def solver_budget(default_s: float) -> Iterator[float]:
+    """CP-SAT time limit for one solver call under the current deadline (0.0: skip the call).
+    Flags the request degraded if the call was skipped or ran into a shortened limit.
+    """
+    d = _current.get()
+    if d is None:
+        yield default_s
+        return
+    limit = min(default_s, d.allot("solve"))
+    if limit < MIN_CPSAT_S:
+        d.degrade("solver skipped: no time left for CP-SAT")
+        yield 0.0
+        return
+    t0 = time.perf_counter()
+    yield limit
+    if limit < default_s and time.perf_counter() - t0 >= 0.9 * limit:
+        d.degrade(f"solver stopped at a shortened {limit:.3f}s time limit")
+
+
+def candidate_count(default: int) -> int:
+    """How many optional candidates of one kind to generate under the current deadline."""
+    d = _current.get()
+    if d is None:
+        return default
+    fit = int(d.allot("candidates") / CANDIDATE_COST_S)
+    k = max(0, min(default, fit))
+    if k < default:
+        d.degrade(f"candidate set reduced ({k} of {default})")
+    return k
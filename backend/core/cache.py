@@ -0,0 +1,212 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+from uuid import uuid4
+
+from backend.models.schema import Brief, LayoutResponse
+
+_code_version: Optional[str] = None
+
+
+def code_version() -> str:
+    """BLUEPRINT_CODE_VERSION if set (e.g. a commit id), else a hash of the backend sources."""
+    global _code_version
+    if _code_version is None:
+        env = os.environ.get("BLUEPRINT_CODE_VERSION")
+        if env:
+            _code_version = env
+        else:
+            root = Path(__file__).resolve().parents[1]
+            h = hashlib.sha256()
+            for p in sorted(root.rglob("*.py")):
+                h.update(p.relative_to(root).as_posix().encode())
+                h.update(p.read_bytes())
+            _code_version = h.hexdigest()[:16]
+    return _code_version
+
+
+def brief_hash(brief: Brief) -> str:
+    """Canonical hash of a brief: defaults filled in, keys sorted."""
+    blob = json.dumps(brief.model_dump(mode="json"), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(blob.encode()).hexdigest()
+
+
+def result_key(brief: Brief, rules_version: str) -> str:
+    return hashlib.sha256(f"{brief_hash(brief)}:{rules_version}:{code_version()}".encode()).hexdigest()
+
+
+class ResultCache:
+    """Layout responses by result_key: an in-memory LRU over an optional SQLite file.
+
+    The SQLite tier is trimmed to ``max_db_bytes`` of stored JSON, least recently used first.
+    The cache keeps its own deep copy of a stored response, and a hit is a deep copy with a
+    fresh ``governance.run_id``, so callers may change what they get.
+    """
+
+    def __init__(self, max_entries: int = 256, path: Optional[str] = None, max_db_bytes: int = 256 << 20) -> None:
+        self.max_entries = max(0, max_entries)
+        self.max_db_bytes = max_db_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._mem: "OrderedDict[str, LayoutResponse]" = OrderedDict()
+        self.path = path or None
+        self._db: Optional[sqlite3.Connection] = None
+        self._pid = 0
+        self._db_bytes = 0
+        if self.path:
+            db = sqlite3.connect(self.path)
+            try:
+                db.execute("CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, data TEXT, size INTEGER, used REAL)")
+                db.execute("CREATE INDEX IF NOT EXISTS results_used ON results (used)")
+                db.commit()
+            finally:
+                db.close()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 or self.path is not None
+
+    def _conn(self) -> sqlite3.Connection:
+        # One connection per process: a pre-forked server worker must not use its parent's
+        if self._db is None or self._pid != os.getpid():
+            self._db, self._pid = sqlite3.connect(self.path, check_same_thread=False), os.getpid()
+            self._db_bytes = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+        return self._db
+
+    def get(self, *keys: str) -> Optional[LayoutResponse]:
+        """Response stored under the first of ``keys`` found (one hit or miss either way)."""
+        with self._lock:
+            resp = None
+            for key in keys:
+                resp = self._lookup(key)
+                if resp is not None:
+                    break
+            if resp is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return fresh_copy(resp)
+
+    def _lookup(self, key: str) -> Optional[LayoutResponse]:
+        resp = self._mem.get(key)
+        if resp is not None:
+            self._mem.move_to_end(key)
+        elif self.path is not None:
+            db = self._conn()
+            row = db.execute("SELECT data FROM results WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                db.execute("UPDATE results SET used = ? WHERE key = ?", (time.time(), key))
+                db.commit()
+                resp = LayoutResponse.model_validate_json(row[0])
+                self._remember(key, resp)
+        return resp
+
+    def put(self, key: str, resp: LayoutResponse) -> None:
+        resp = resp.model_copy(deep=True)
+        with self._lock:
+            self._remember(key, resp)
+            if self.path is not None:
+                db = self._conn()
+                data = resp.model_dump_json()
+                old = db.execute("SELECT size FROM results WHERE key = ?", (key,)).fetchone()
+                db.execute(
+                    "INSERT OR REPLACE INTO results (key, data, size, used) VALUES (?, ?, ?, ?)",
+                    (key, data, len(data), time.time()),
+                )
+                self._db_bytes += len(data) - (old[0] if old else 0)
+                self._trim_db(db)
+                db.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._mem.clear()
+            if self.path is not None:
+                db = self._conn()
+                db.execute("DELETE FROM results")
+                db.commit()
+                self._db_bytes = 0
+
+    def _remember(self, key: str, resp: LayoutResponse) -> None:
+        if self.max_entries <= 0:
+            return
+        self._mem[key] = resp
+        self._mem.move_to_end(key)
+        while len(self._mem) > self.max_entries:
+            self._mem.popitem(last=False)
+
+    def _trim_db(self, db: sqlite3.Connection) -> None:
+        while self._db_bytes > self.max_db_bytes:
+            row = db.execute("SELECT key, size FROM results ORDER BY used LIMIT 1").fetchone()
+            if row is None:
+                break
+            db.execute("DELETE FROM results WHERE key = ?", (row[0],))
+            self._db_bytes -= row[1]
+
+
+def fresh_copy(resp: LayoutResponse) -> LayoutResponse:
+    """Deep copy of a shared response with its own run id."""
+    out = resp.model_copy(deep=True)
+    if out.governance is not None:
+        out.governance.run_id = str(uuid4())
+    return out
+
+
+class SingleFlight:
+    """At most one call per key at a time: concurrent callers with the same key wait for the
+    running call and share its result (or exception)."""
+
+    def __init__(self) -> None:
+        self.shared = 0  # calls answered by another caller's computation
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, Future] = {}
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """``(result, shared)``; ``shared`` is True if another caller computed it."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = Future()
+            else:
+                self.shared += 1
+        if not leader:
+            return call.result(), True
+        try:
+            result = fn()
+        except BaseException as e:
+            call.set_exception(e)
+            raise
+        else:
+            call.set_result(result)
+            return result, False
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+
+_default: Optional[ResultCache] = None
+_default_lock = threading.Lock()
+
+
+def default_result_cache() -> ResultCache:
+    """Process-wide cache (BLUEPRINT_RESULT_CACHE entries, 0 disables; BLUEPRINT_RESULT_CACHE_DB
+    adds the SQLite tier, capped at BLUEPRINT_RESULT_CACHE_DB_MB)."""
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = ResultCache(
+                max_entries=int(os.environ.get("BLUEPRINT_RESULT_CACHE", "256")),
+                path=os.environ.get("BLUEPRINT_RESULT_CACHE_DB") or None,
+                max_db_bytes=int(float(os.environ.get("BLUEPRINT_RESULT_CACHE_DB_MB", "256")) * (1 << 20)),
+            )
+        return _default
@@ -0,0 +1,317 @@
+from __future__ import annotations
+
+import os
+import queue
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional
+from uuid import uuid4
+
+from backend.models.schema import Brief, JobStatus, LayoutResponse, LayoutResult
+
+FINAL = ("done", "failed", "cancelled")
+
+_current: ContextVar[Optional["Job | JobLink"]] = ContextVar("blueprint_job", default=None)
+
+
+class QueueFull(Exception):
+    """Too many jobs are waiting; the submission should be retried later."""
+
+
+@dataclass
+class Job:
+    """One queued layout run. Progress fields are written by the solver's callback thread."""
+
+    brief: Brief
+    deadline_ms: Optional[float] = None
+    id: str = field(default_factory=lambda: str(uuid4()))
+    status: str = "queued"
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    solutions: int = 0
+    objective: Optional[float] = None
+    layout: Optional[LayoutResult] = None
+    result: Optional[LayoutResponse] = None
+    error: Optional[str] = None
+    cancel_event: threading.Event = field(default_factory=threading.Event, repr=False)
+
+    @property
+    def cancelled(self) -> bool:
+        return self.cancel_event.is_set()
+
+    def report(self, layout: LayoutResult, objective: Optional[float]) -> None:
+        """Record an improving intermediate solution."""
+        self.solutions += 1
+        self.objective = objective
+        self.layout = layout
+
+    def to_status(self) -> JobStatus:
+        return JobStatus(
+            id=self.id,
+            status=self.status,
+            created_at=self.created_at,
+            started_at=self.started_at,
+            finished_at=self.finished_at,
+            solutions=self.solutions,
+            objective=self.objective,
+            layout=self.layout,
+            result=self.result,
+            error=self.error,
+        )
+
+
+class JobLink:
+    """Picklable stand-in for a Job inside a worker process.
+
+    The solver reads ``cancelled`` and calls ``report`` as it does on a Job; both cross back to
+    the submitting process through a manager's Event (the job's own ``cancel_event``) and Queue,
+    which ``JobQueue`` drains into the Job.
+    """
+
+    def __init__(self, cancel_event: Any, progress: Any) -> None:
+        self.cancel_event = cancel_event
+        self.progress = progress
+
+    @property
+    def cancelled(self) -> bool:
+        return self.cancel_event.is_set()
+
+    def report(self, layout: LayoutResult, objective: Optional[float]) -> None:
+        self.progress.put((layout, objective))
+
+
+@contextmanager
+def running(job: Job | JobLink) -> Iterator[Job | JobLink]:
+    token = _current.set(job)
+    try:
+        yield job
+    finally:
+        _current.reset(token)
+
+
+def current_job() -> Optional[Job | JobLink]:
+    """The job being run in this context, if any (solver calls report progress to it)."""
+    return _current.get()
+
+
+class SqliteJobStore:
+    """Persists job status snapshots so they outlive the process that ran them."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self._pid = 0
+        db = sqlite3.connect(path)
+        try:
+            db.execute("CREATE TABLE IF NOT EXISTS jobs (id TEXT PRIMARY KEY, created_at REAL, status TEXT, data TEXT)")
+            # Jobs that were queued or running when a previous server stopped will never finish
+            db.execute(
+                "UPDATE jobs SET status = 'failed' WHERE status NOT IN (?, ?, ?)", FINAL
+            )
+            db.commit()
+        finally:
+            db.close()
+
+    def _conn(self) -> sqlite3.Connection:
+        # One connection per process: a pre-forked server worker must not use its parent's
+        if self._db is None or self._pid != os.getpid():
+            self._db, self._pid = sqlite3.connect(self.path, check_same_thread=False), os.getpid()
+        return self._db
+
+    def save(self, status: JobStatus) -> None:
+        with self._lock:
+            db = self._conn()
+            db.execute(
+                "INSERT OR REPLACE INTO jobs (id, created_at, status, data) VALUES (?, ?, ?, ?)",
+                (status.id, status.created_at, status.status, status.model_dump_json()),
+            )
+            db.commit()
+
+    def load(self, job_id: str) -> Optional[JobStatus]:
+        with self._lock:
+            row = self._conn().execute("SELECT status, data FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        status = JobStatus.model_validate_json(row[1])
+        if row[0] != status.status:  # interrupted by a restart
+            status.status, status.error = row[0], "server stopped before the job finished"
+        return status
+
+    def close(self) -> None:
+        with self._lock:
+            if self._db is not None and self._pid == os.getpid():
+                self._db.close()
+            self._db = None
+
+
+class JobQueue:
+    """Queue of layout jobs, dispatched by background threads.
+
+    With a ``work`` pool (``backend.core.offload.WorkPool``) the pipeline of each job runs as
+    ``layout_task`` on its worker processes; cache lookups stay with ``orchestrator`` here.
+    Without one, jobs run in this process. At most ``max_queued`` jobs wait for a worker;
+    further submissions raise QueueFull. Finished jobs stay in memory (the most recent
+    ``max_jobs``) and, with a ``store``, are also persisted on every status change.
+    """
+
+    def __init__(self, orchestrator: Any, workers: int = 1, store: Optional[SqliteJobStore] = None, max_jobs: int = 1000, max_queued: int = 64, work: Any = None) -> None:
+        self.orchestrator = orchestrator
+        self.work = work
+        self.workers = max(1, workers)
+        self.store = store
+        self.max_jobs = max_jobs
+        self.max_queued = max(1, max_queued)
+        self.rejected = 0
+        self._queue: "queue.Queue[Optional[Job]]" = queue.Queue()
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._threads: List[threading.Thread] = []
+
+    def start(self) -> None:
+        with self._lock:
+            if self._threads:
+                return
+            for i in range(self.workers):
+                t = threading.Thread(target=self._work, name=f"layout-job-{i}", daemon=True)
+                t.start()
+                self._threads.append(t)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            threads, self._threads = self._threads, []
+            live = [j for j in self._jobs.values() if j.status not in FINAL]
+        for job in live:
+            job.cancel_event.set()
+        for _ in threads:
+            self._queue.put(None)
+        for t in threads:
+            t.join()
+        if self.store is not None:
+            self.store.close()
+
+    def submit(self, brief: Brief, deadline_ms: Optional[float] = None) -> Job:
+        job = Job(brief=brief, deadline_ms=deadline_ms)
+        if self._remote:
+            job.cancel_event = self.work.manager().Event()  # also seen by the worker process
+        with self._lock:
+            if self._depth() >= self.max_queued:
+                self.rejected += 1
+                raise QueueFull(f"{self.max_queued} jobs waiting")
+            self._jobs[job.id] = job
+            self._evict()
+        self._save(job)
+        self.start()
+        self._queue.put(job)
+        return job
+
+    @property
+    def depth(self) -> int:
+        """Jobs waiting for a worker."""
+        with self._lock:
+            return self._depth()
+
+    def _depth(self) -> int:
+        return sum(1 for j in self._jobs.values() if j.status == "queued")
+
+    def get(self, job_id: str) -> Optional[JobStatus]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is not None:
+            return job.to_status()
+        return self.store.load(job_id) if self.store is not None else None
+
+    def cancel(self, job_id: str) -> Optional[JobStatus]:
+        """Cancel a queued or running job; a running CP-SAT search stops at its next solution."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None:
+            return self.get(job_id)
+        if job.status not in FINAL:
+            job.cancel_event.set()
+            if job.status == "queued":
+                self._finish(job, "cancelled")
+        return job.to_status()
+
+    def _work(self) -> None:
+        while True:
+            job = self._queue.get()
+            if job is None:
+                return
+            if job.cancelled:
+                continue
+            job.status, job.started_at = "running", time.time()
+            self._save(job)
+            try:
+                with running(job):
+                    if self.work is None:
+                        result = self.orchestrator.run(job.brief, deadline_ms=job.deadline_ms)
+                    else:
+                        result = self.orchestrator.run(job.brief, deadline_ms=job.deadline_ms, compute=lambda *a: self._execute(job, *a))
+            except Exception as e:  # the job records the failure; the worker keeps going
+                job.error = f"{type(e).__name__}: {e}"
+                self._finish(job, "failed")
+                continue
+            if job.cancelled:
+                self._finish(job, "cancelled")
+            else:
+                job.result, job.layout = result, result.layout
+                self._finish(job, "done")
+
+    @property
+    def _remote(self) -> bool:
+        return self.work is not None and self.work.workers > 0
+
+    def _execute(self, job: Job, *args: Any) -> LayoutResponse:
+        from backend.core.offload import layout_task
+
+        if not self._remote:
+            return self.work.execute(layout_task, *args, job)
+        link = JobLink(job.cancel_event, self.work.manager().Queue())
+
+        def pump() -> None:
+            # Improving solutions reported in the worker, until the end marker
+            for item in iter(link.progress.get, None):
+                job.report(*item)
+
+        t = threading.Thread(target=pump, name=f"job-progress-{job.id[:8]}", daemon=True)
+        t.start()
+        try:
+            return self.work.execute(layout_task, *args, link)
+        finally:
+            link.progress.put(None)
+            t.join()
+
+    def _finish(self, job: Job, status: str) -> None:
+        job.status, job.finished_at = status, time.time()
+        self._save(job)
+
+    def _save(self, job: Job) -> None:
+        if self.store is not None:
+            self.store.save(job.to_status())
+
+    def _evict(self) -> None:
+        # Drop the oldest finished jobs beyond max_jobs (they remain in the store, if any)
+        over = len(self._jobs) - self.max_jobs
+        for job_id in [k for k, j in self._jobs.items() if j.status in FINAL][: max(0, over)]:
+            del self._jobs[job_id]
+
+
+def default_job_queue(orchestrator: Any, work: Any = None) -> JobQueue:
+    """Queue running on ``work``, configured from BLUEPRINT_JOB_WORKERS, BLUEPRINT_JOB_QUEUE
+    (max waiting jobs) and BLUEPRINT_JOB_DB (SQLite path, optional)."""
+    path = os.environ.get("BLUEPRINT_JOB_DB")
+    store = SqliteJobStore(path) if path else None
+    return JobQueue(
+        orchestrator,
+        workers=int(os.environ.get("BLUEPRINT_JOB_WORKERS", "1")),
+        store=store,
+        max_queued=int(os.environ.get("BLUEPRINT_JOB_QUEUE", "64")),
+        work=work,
+    )
@@ -0,0 +1,258 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing.managers import SyncManager
+from typing import Any, Callable, Dict, FrozenSet, Iterable, Iterator, List, Optional, Tuple
+
+from backend.core.jobs import Job, JobLink, running
+from backend.core.orchestrator import Orchestrator
+from backend.core.pool import CandidatePool, default_workers, process_context
+from backend.core.warmup import warm_up
+from backend.models.schema import Brief, EditResult, LayoutResponse, LayoutResult, Pins, ValidationReport
+from backend.rules.profiling import profiler, run_profiled
+
+# Per-process orchestrator for offloaded tasks, created once per worker by _warm
+_orch: Optional[Orchestrator] = None
+
+
+def _warm() -> None:
+    global _orch
+    # Tasks already run one per worker: screen candidates in-process, no nested pool
+    _orch = Orchestrator(pool=CandidatePool(workers=0))
+    warm_up()  # solve a tiny brief so the first real task runs warm
+
+
+def _local() -> Orchestrator:
+    if _orch is None:
+        _warm()
+    return _orch
+
+
+# ----- tasks (module-level so worker processes can run them) -----
+
+
+def layout_task(brief: Brief, timings: bool, deadline_ms: Optional[float], parts: FrozenSet[str], job: Optional[Job | JobLink] = None) -> LayoutResponse:
+    if job is None:
+        return _local()._measured(brief, timings, deadline_ms, parts)
+    # A queued job: the solver reports progress to it and stops when it is cancelled
+    with running(job):
+        return _local()._measured(brief, timings, deadline_ms, parts)
+
+
+def candidates_task(brief: Brief, k: int) -> List[Any]:
+    from backend.interaction.service import generate_candidates
+
+    return generate_candidates(brief, k=k, orch=_local())
+
+
+def candidate_stream_task(brief: Brief, k: int) -> Iterator[Dict[str, Any]]:
+    from backend.interaction.service import iter_candidates
+
+    for update in iter_candidates(brief, k=k, orch=_local()):
+        yield update.model_dump(mode="json")
+
+
+def _produce(task: Callable[..., Iterable[Any]], out: Any, stop: Any, *args: Any) -> None:
+    # Worker side of WorkPool.produce: ship each item as it comes, then None to end
+    try:
+        for item in task(*args):
+            if stop.is_set():
+                break
+            out.put(item)
+    finally:
+        out.put(None)
+
+
+def export_task(brief: Brief, layout: LayoutResult, formats: List[str]) -> Dict[str, str]:
+    return _local().export(brief, layout, formats)
+
+
+def _validated(brief: Brief, layout: LayoutResult) -> EditResult:
+    # One full check of the edited layout; violation deltas need the state a session keeps
+    report = ValidationReport(**_local().rules.check(layout, brief))
+    return EditResult(rooms=layout.rooms, dropped=layout.dropped, validation=report)
+
+
+def optimize_task(brief: Brief, layout: LayoutResult, pins: Pins) -> EditResult:
+    from backend.interaction.service import apply_pins_and_optimize
+
+    return _validated(brief, apply_pins_and_optimize(brief, layout, pins))
+
+
+def edit_task(brief: Brief, layout: LayoutResult, move: Optional[Tuple[str, int, int]], resize: Optional[Tuple[str, int, int]]) -> EditResult:
+    from backend.interaction.service import local_edit_move, local_edit_resize
+
+    if move:
+        layout = local_edit_move(layout, *move, brief)
+    if resize:
+        layout = local_edit_resize(layout, *resize, brief)
+    return _validated(brief, layout)
+
+
+class Overloaded(Exception):
+    """The work queue is full; the request should be retried later."""
+
+
+class _Held:
+    """Iterator that calls ``release`` once, when exhausted, closed or garbage-collected."""
+
+    def __init__(self, it: Iterator[Any], release: Callable[[], None]) -> None:
+        self._it = it
+        self._release: Optional[Callable[[], None]] = release
+
+    def __iter__(self) -> "_Held":
+        return self
+
+    def __next__(self) -> Any:
+        try:
+            return next(self._it)
+        except BaseException:
+            self.close()
+            raise
+
+    def close(self) -> None:
+        release, self._release = self._release, None
+        if release is not None:
+            close = getattr(self._it, "close", None)
+            if close is not None:
+                close()
+            release()
+
+    def __del__(self) -> None:
+        self.close()
+
+
+class WorkPool:
+    """Bounded offload of CPU-heavy request work away from the event loop.
+
+    At most ``workers + max_queue`` requests are admitted at once (the rest get Overloaded);
+    ``workers`` of them compute in worker processes while the others wait their turn. With no
+    process workers the tasks run on a thread, one at a time. A streamed response holds its
+    slot for as long as it streams.
+    """
+
+    def __init__(self, workers: Optional[int] = None, max_queue: Optional[int] = None) -> None:
+        env = os.environ.get("BLUEPRINT_API_WORKERS")
+        self.workers = max(0, workers if workers is not None else int(env) if env is not None else default_workers())
+        self.max_queue = max(0, max_queue if max_queue is not None else int(os.environ.get("BLUEPRINT_API_QUEUE", "8")))
+        self.capacity = max(1, self.workers) + self.max_queue
+        self.inflight = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max(1, self.workers))
+        self._threads = ThreadPoolExecutor(max_workers=self.capacity, thread_name_prefix="offload")
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._manager: Optional[SyncManager] = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                ctx = process_context(["backend.core.offload"])
+                self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=ctx, initializer=_warm)
+            return self._executor
+
+    def manager(self) -> SyncManager:
+        """Manager for events and queues shared with the worker processes (started on first use)."""
+        with self._lock:
+            if self._manager is None:
+                self._manager = process_context(["backend.core.offload"]).Manager()
+            return self._manager
+
+    def warm(self) -> None:
+        if self.workers > 0:
+            ex = self._get_executor()
+            for f in [ex.submit(os.getpid) for _ in range(self.workers)]:
+                f.result()
+
+    def shutdown(self) -> None:
+        with self._lock:
+            ex, self._executor = self._executor, None
+        if ex is not None:
+            ex.shutdown(wait=True, cancel_futures=True)
+        with self._lock:
+            manager, self._manager = self._manager, None
+        if manager is not None:
+            manager.shutdown()
+
+    def execute(self, task: Callable[..., Any], *args: Any) -> Any:
+        """Run ``task`` on a worker process (blocking), or here without process workers."""
+        if self.workers > 0:
+            try:
+                result, stats = self._get_executor().submit(run_profiled, profiler.enabled, task, *args).result()
+                profiler.merge(stats)
+                return result
+            except BrokenProcessPool:
+                with self._lock:
+                    self._executor = None  # recreated on the next request
+                raise
+        with self._slots:
+            return task(*args)
+
+    def produce(self, task: Callable[..., Iterable[Any]], *args: Any) -> Iterator[Any]:
+        """Items of the generator task ``task(*args)``, produced on a worker process and sent
+        back over a queue as each is made (here, without process workers). Items must not be
+        None. Closing the iterator early stops the task at its next item."""
+        if self.workers == 0:
+            with self._slots:
+                yield from task(*args)
+            return
+        manager = self.manager()
+        out, stop = manager.Queue(), manager.Event()
+        fut = self._get_executor().submit(run_profiled, profiler.enabled, _produce, task, out, stop, *args)
+        try:
+            while True:
+                try:
+                    item = out.get(timeout=0.1)
+                except queue.Empty:
+                    if fut.done():
+                        fut.result()  # the worker died before its end marker
+                    continue
+                if item is None:
+                    break
+                yield item
+            _, stats = fut.result()
+            profiler.merge(stats)
+        except BrokenProcessPool:
+            with self._lock:
+                self._executor = None  # recreated on the next request
+            raise
+        finally:
+            stop.set()
+
+    def _admit(self) -> None:
+        with self._lock:
+            if self.inflight >= self.capacity:
+                self.rejected += 1
+                raise Overloaded(f"{self.inflight} requests in progress")
+            self.inflight += 1
+
+    def _release(self) -> None:
+        with self._lock:
+            self.inflight -= 1
+
+    async def call(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Admit a request and run ``fn(*args)`` off the event loop; raises Overloaded when full.
+
+        ``fn`` runs on a thread, so it may do cheap work (cache lookups) before handing the
+        heavy part to ``execute``.
+        """
+        self._admit()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._threads, lambda: fn(*args))
+        finally:
+            self._release()
+
+    def stream(self, chunks: Iterable[Any]) -> Iterator[Any]:
+        """Admit a streamed response now (raises Overloaded when full); its slot is held until
+        the stream ends or is closed or dropped."""
+        self._admit()
+        return _Held(iter(chunks), self._release)
+
+    async def run(self, task: Callable[..., Any], *args: Any) -> Any:
+        """Admit a request and run a module-level task on the workers."""
+        return await self.call(self.execute, task, *args)
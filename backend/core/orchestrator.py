@@ -1,27 +1,38 @@
-from typing import Any, Dict
+from typing import Any, Callable, Dict, FrozenSet, Iterable
 import random
 from uuid import uuid4
 
 from backend.models.schema import Brief, LayoutResponse, LayoutResult, CostBreakdown, AnalysisReport, GovernanceReport
 from backend.rules.engine import RulesEngine
+from backend.core.pool import CandidatePool, default_pool
+from backend.core.budget import candidate_count, deadline
+from backend.core.jobs import current_job
+from backend.core.cache import ResultCache, SingleFlight, default_result_cache, fresh_copy, result_key
+from backend.core.telemetry import observe_run
+from backend.core.tracing import count, span, tracing
 from backend.solver.solver import LayoutSolver
-from backend.models.scene import from_brief_and_layout
+from backend.models.scene import Building, from_brief_and_layout
 from backend.solver.costs import evaluate_cost, aggregate_cost
 from backend.retrieval.library import retrieve_seed
 from backend.solver.refine import refine_layout
-from backend.learned.proposal import propose_variants
-from backend.learned.critic import Critic
-from backend.learned.topology import propose_topologies
-from backend.learned.parser import parse_requirements_text
-from backend.learned.placement import apply_learned_placements
 from backend.geometry.openings import apply_openings
 from backend.geometry.stairs import ensure_stairs
-from backend.analysis.structure import analyze_structure
-from backend.analysis.mep import analyze_mep
-from backend.analysis.facade import analyze_facade
-from backend.qa.metrics import compute_metrics
 from backend.models.schema import ValidationReport
-from backend.rules.loader import load_rules
+
+# Response sections a caller may leave out; layout and validation are always computed
+OPTIONAL_SECTIONS: FrozenSet[str] = frozenset({"cost", "analysis", "metrics", "governance"})
+SECTIONS: FrozenSet[str] = OPTIONAL_SECTIONS | {"layout", "validation"}
+
+
+def sections(include: Iterable[str] | None) -> FrozenSet[str]:
+    """Optional sections to compute for ``include`` (None: all of them)."""
+    if include is None:
+        return OPTIONAL_SECTIONS
+    names = frozenset(include)
+    unknown = names - SECTIONS
+    if unknown:
+        raise ValueError(f"unknown response sections: {', '.join(sorted(unknown))}")
+    return names & OPTIONAL_SECTIONS
 
 
 class Orchestrator:
@@ -29,82 +40,189 @@ class Orchestrator:
     Coordinates parsing requirements, generation (solver + heuristics), validation, and export.
     """
 
-    def __init__(self) -> None:
+    def __init__(self, pool: CandidatePool | None = None, cache: ResultCache | None = None) -> None:
         self.solver = LayoutSolver()
         self.rules = RulesEngine()
+        self.pool = pool or default_pool()
+        self.cache = cache if cache is not None else default_result_cache()
+        self.flights = SingleFlight()
 
     def parse_requirements(self, raw_text: str) -> Dict[str, Any]:
         # LLM-ready stub: parse text into a Brief
+        from backend.learned.parser import parse_requirements_text
+
         brief = parse_requirements_text(raw_text)
         return brief.model_dump()
 
-    def generate_layout(self, brief: Dict[str, Any]) -> LayoutResult:
-        layout_dict = self.solver.solve(brief)
-        return LayoutResult(**layout_dict)
+    def generate_layout(self, brief: Brief) -> LayoutResult:
+        return self.solver.solve(brief)
 
-    def validate(self, layout: LayoutResult, brief: Dict[str, Any] | Brief | None = None) -> Dict[str, Any]:
+    def validate(self, layout: LayoutResult, brief: Brief | None = None) -> Dict[str, Any]:
         return self.rules.check(layout, brief)
 
-    def run(self, brief: Dict[str, Any]) -> LayoutResponse:
-        # Early pruning of brief against absolute minimums
-        brief = self.rules.early_prune(brief)
+    def run(
+        self,
+        brief: Dict[str, Any] | Brief,
+        timings: bool = False,
+        deadline_ms: float | None = None,
+        compute: Callable[[Brief, bool, float | None, FrozenSet[str]], LayoutResponse] | None = None,
+        include: Iterable[str] | None = None,
+    ) -> LayoutResponse:
+        """Full pipeline; with ``timings`` the response carries per-stage wall/CPU times.
+
+        With ``deadline_ms`` the budget is split across solve, candidate evaluation and the
+        final passes (``backend.core.budget``): CP-SAT time limits and the candidate set shrink
+        as the deadline gets close, and a response that had to cut work is flagged degraded.
+
+        Responses are cached by brief, rule-set version and code version (``backend.core.cache``);
+        timed runs and briefs without a seed bypass the cache and degraded responses are not
+        stored. Concurrent runs of the same brief and deadline share one computation, except
+        inside a job (it may be cancelled; a cancelled run comes back degraded). ``compute``
+        replaces the pipeline run itself (e.g. to hand it to a worker process) with the same
+        signature as ``_measured``.
+
+        ``include`` limits the optional sections (cost, analysis, metrics, governance); stages
+        only needed by excluded sections do not run and those fields come back empty. A cached
+        full response also serves narrower requests.
+
+        Computed runs are always traced: their stages and run counters feed the process metrics
+        (``backend.core.telemetry``); the timings stay on the response only when asked for.
+        """
+        if not isinstance(brief, Brief):
+            brief = Brief(**brief)  # the only conversion: every stage below takes the model
+        parts = sections(include)
+        compute = compute or self._measured
+        if timings:
+            resp = compute(brief, True, deadline_ms, parts)
+            observe_run(resp.timings)
+            return resp
+        full_key = result_key(brief, self.rules.rule_set().version)
+        key = full_key if parts == OPTIONAL_SECTIONS else f"{full_key}/{'+'.join(sorted(parts))}"
+        # Parallel CP-SAT search only reproduces with a seed: unseeded runs are never cached
+        cacheable = brief.seed is not None
+        if cacheable:
+            if parts == OPTIONAL_SECTIONS:
+                hit = self.cache.get(key)
+            else:
+                hit = self.cache.get(key, full_key)
+                if hit is not None:
+                    hit = hit.model_copy(update={f: None for f in OPTIONAL_SECTIONS - parts})
+            if hit is not None:
+                return hit
+
+        def solve_and_store() -> LayoutResponse:
+            resp = compute(brief, True, deadline_ms, parts)
+            observe_run(resp.timings)
+            resp.timings = None
+            if cacheable and not resp.degraded:
+                self.cache.put(key, resp)  # stores its own copy
+            return resp
+
+        if current_job() is not None:
+            # A job may be cancelled mid-run; callers must not share its result
+            return solve_and_store()
+        resp, shared = self.flights.do((key, deadline_ms), solve_and_store)
+        return fresh_copy(resp) if shared else resp
+
+    def _measured(self, brief: Brief, timings: bool, deadline_ms: float | None, parts: FrozenSet[str] = OPTIONAL_SECTIONS) -> LayoutResponse:
+        with tracing(timings) as trace, deadline(deadline_ms) as budget:
+            resp = self._run(brief, parts)
+            if budget is not None:
+                if budget.expired():
+                    budget.degrade(f"deadline of {deadline_ms:g} ms exceeded")
+                resp.degraded = budget.degraded
+                resp.degraded_reasons = list(budget.reasons)
+            job = current_job()
+            if job is not None and job.cancelled:
+                # CP-SAT stopped at its next solution: a cut-short layout, never cached
+                resp.degraded = True
+                resp.degraded_reasons.append("job cancelled: the solver stopped early")
+        if trace is not None:
+            resp.timings = trace.timings()
+        return resp
+
+    def _run(self, brief: Brief, parts: FrozenSet[str] = OPTIONAL_SECTIONS) -> LayoutResponse:
+        from backend.learned.critic import Critic
+        from backend.learned.proposal import propose_variants
+        from backend.learned.topology import propose_topologies
+
+        # Early pruning of brief against absolute minimums; the validated Brief and the
+        # LayoutResult models are passed through every stage from here on
+        with span("prune"):
+            brief = self.rules.early_prune(brief)
         # Seed and run id for reproducibility
-        brief_obj = Brief(**brief) if not isinstance(brief, Brief) else brief
-        if brief_obj.seed is not None:
-            random.seed(brief_obj.seed)
+        if brief.seed is not None:
+            random.seed(brief.seed)
         run_id = str(uuid4())
         # Stage 0: learned topology proposals
-        topo_candidates = propose_topologies(brief, k=2)
+        with span("topology"):
+            topo_candidates = propose_topologies(brief, k=candidate_count(2))
         # Stage 1: retrieval seed
-        seed = retrieve_seed(brief)
+        with span("retrieval"):
+            seed = retrieve_seed(brief)
         # Stage 2: base layout (constraint-based placeholder + heuristic)
-        base_layout = self.solver.solve(brief, seed.model_dump() if seed else None)
-        base_layout = LayoutResult(**base_layout)
+        with span("solve"):
+            base_layout = self.solver.solve(brief, seed)
         # Stage 3: heuristic refinement
-        if len(base_layout.rooms) > 0:
-            base_layout = refine_layout(base_layout, brief, iterations=2)
+        with span("refine"):
+            if len(base_layout.rooms) > 0:
+                base_layout = refine_layout(base_layout, brief, iterations=2)
         # Stage 4: learned proposal/critic loop: combine candidates (topology + refined + jitters)
-        candidates = topo_candidates + [base_layout] + propose_variants(base_layout, brief, k=3)
-        # Mid-pipeline rule filtering: discard candidates with fatal errors
-        filtered = []
-        for cand in candidates:
-            rep = self.rules.check(cand, brief)
-            fatals = [v for v in rep["violations"] if v.startswith("[error]")]
-            if not fatals:
-                filtered.append(cand)
-        if filtered:
-            candidates = filtered
-        # brief_obj already defined above
-        critic = Critic()
-        best = max(candidates, key=lambda L: critic.score(brief_obj, L))
-        layout = LayoutResult(**best.model_dump())
-
-        validation = self.validate(layout, brief)
+        with span("variants"):
+            candidates = topo_candidates + [base_layout] + propose_variants(base_layout, brief, k=candidate_count(3))
+        # Mid-pipeline rule filtering (discard candidates with fatal errors) and critic scoring,
+        # spread over the candidate pool's worker processes
+        with span("screen_and_score"):
+            best = self.pool.select(brief, candidates, self.rules, Critic(), fallback=len(topo_candidates))
+            layout = candidates[best]
+        count("candidate:" + ("topology" if best < len(topo_candidates) else "base" if best == len(topo_candidates) else "variant"))
+
+        with span("validate"):
+            validation = ValidationReport(**self.validate(layout, brief))
         # Final compliance report already includes scene-level declarative rules
-        # Build scene and evaluate soft cost
-        scene = from_brief_and_layout(brief_obj, layout)
+        # Everything below only runs for the sections requested
+        cost = analysis = metrics = governance = None
+        if parts & {"cost", "analysis", "metrics"}:
+            # Build scene and evaluate soft cost
+            with span("scene"):
+                scene = self.scene(brief, layout)
+        if "cost" in parts:
+            with span("cost"):
+                terms = evaluate_cost(scene, brief)
+                total, weighted = aggregate_cost(terms, brief)
+                cost = CostBreakdown(total=total, terms=weighted)
+        # Structural/MEP/Facade heuristics (metrics reuse structure and MEP)
+        if parts & {"analysis", "metrics"}:
+            from backend.analysis.facade import analyze_facade
+            from backend.analysis.mep import analyze_mep
+            from backend.analysis.structure import analyze_structure
+
+            with span("analysis"):
+                structure_info = analyze_structure(scene)
+                mep_info = analyze_mep(scene)
+                if "analysis" in parts:
+                    analysis = AnalysisReport(structure=structure_info, mep=mep_info, facade=analyze_facade(scene))
+        if "metrics" in parts:
+            from backend.qa.metrics import compute_metrics
+
+            with span("metrics"):
+                metrics = compute_metrics(brief, layout, validation, scene, structure_info, mep_info)
+        if "governance" in parts:
+            rule_set = self.rules.rule_set()
+            governance = GovernanceReport(run_id=run_id, seed=brief.seed, tenant_id=brief.tenant_id, consent_external=brief.consent_external, rule_ids=rule_set.rule_ids, rules_version=rule_set.version)
+        return LayoutResponse(layout=layout, validation=validation, cost=cost, analysis=analysis, metrics=metrics, governance=governance)
+
+    def scene(self, brief: Brief, layout: LayoutResult) -> Building:
+        """Scene of a layout with placements, openings and stairs, as costed and analysed."""
+        from backend.learned.placement import apply_learned_placements
+
+        scene = from_brief_and_layout(brief, layout)
         # Learned placement -> rules finalize, then stairs
         scene = apply_learned_placements(scene)
         scene = apply_openings(scene)
-        scene = ensure_stairs(scene)
-        terms = evaluate_cost(scene, brief_obj)
-        total, weighted = aggregate_cost(terms, brief_obj)
-        cost = CostBreakdown(total=total, terms=weighted)
-        # Structural/MEP/Facade heuristics
-        structure_info = analyze_structure(scene)
-        mep_info = analyze_mep(scene)
-        facade_info = analyze_facade(scene)
-        analysis = AnalysisReport(structure=structure_info, mep=mep_info, facade=facade_info)
-        metrics = compute_metrics(brief_obj, layout, ValidationReport(**validation) if isinstance(validation, dict) else validation, scene, structure_info, mep_info)
-        applied_rules = [r.get('id','') for r in load_rules(None)]
-        governance = GovernanceReport(run_id=run_id, seed=brief_obj.seed, tenant_id=brief_obj.tenant_id, consent_external=brief_obj.consent_external, rule_ids=applied_rules)
-        return LayoutResponse(layout=layout, validation=validation, cost=cost, analysis=analysis, metrics=metrics, governance=governance)
+        return ensure_stairs(scene)
 
-    def export(self, brief: Dict[str, Any] | Brief, layout: Dict[str, Any] | LayoutResult, formats: list[str] | None = None) -> Dict[str, str]:
-        if not isinstance(brief, Brief):
-            brief = Brief(**brief)
-        if not isinstance(layout, LayoutResult):
-            layout = LayoutResult(**layout)
+    def export(self, brief: Brief, layout: LayoutResult, formats: list[str] | None = None) -> Dict[str, str]:
         scene = from_brief_and_layout(brief, layout)
         from backend.export.service import export_payloads
         meta = {"tenant_id": brief.tenant_id or "", "seed": str(brief.seed) if brief.seed is not None else ""}
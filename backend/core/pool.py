@@ -0,0 +1,197 @@
+from __future__ import annotations
+
+import multiprocessing as mp
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from backend.core.budget import current_deadline
+from backend.core.warmup import LAZY_MODULES
+from backend.models.schema import Brief, LayoutResult
+from backend.rules.engine import RulesEngine
+from backend.rules.profiling import profiler, run_profiled
+
+if TYPE_CHECKING:
+    from backend.learned.critic import Critic
+
+# Per-process evaluators, created once per worker by _warm
+_engine: Optional[RulesEngine] = None
+_critic: Optional[Critic] = None
+
+
+def _warm() -> None:
+    from backend.learned.critic import Critic
+
+    global _engine, _critic
+    _engine = RulesEngine()
+    _critic = Critic()
+    _engine.rule_set()  # compile the default catalog before the first request
+
+
+def _ping() -> int:
+    return os.getpid()
+
+
+def _screen_and_score(brief: Brief, layouts: List[LayoutResult]) -> List[Tuple[bool, Optional[float]]]:
+    # Only candidates passing the screen are scored; see CandidatePool.select
+    from backend.learned.critic import Critic
+
+    engine = _engine or RulesEngine()
+    critic = _critic or Critic()
+    out: List[Tuple[bool, Optional[float]]] = []
+    for l in layouts:
+        ok = engine.screen(l, brief).passed
+        out.append((ok, critic.score(brief, l) if ok else None))
+    return out
+
+
+def _score(brief: Brief, layouts: List[LayoutResult]) -> List[float]:
+    from backend.learned.critic import Critic
+
+    critic = _critic or Critic()
+    return [critic.score(brief, l) for l in layouts]
+
+
+def _pick(passed: Sequence[bool], scores: Sequence[Optional[float]]) -> int:
+    # Highest score among candidates passing the screen (all if none passes);
+    # ties go to the earliest candidate so results never depend on worker timing
+    pool = [i for i, ok in enumerate(passed) if ok] or list(range(len(passed)))
+    return max(pool, key=lambda i: (scores[i], -i))
+
+
+def process_context(preload: List[str]) -> Any:
+    """Start method for worker pools: forkserver children never inherit the solver's threads.
+
+    The forkserver imports ``preload`` and the lazily loaded subsystems once, for every worker.
+    """
+    ctx = mp.get_context("forkserver" if "forkserver" in mp.get_all_start_methods() else "spawn")
+    if ctx.get_start_method() == "forkserver":
+        ctx.set_forkserver_preload([*preload, *LAZY_MODULES])
+    return ctx
+
+
+def default_workers() -> int:
+    env = os.environ.get("BLUEPRINT_CANDIDATE_WORKERS")
+    if env is not None:
+        return max(0, int(env))
+    return min(4, (os.cpu_count() or 1) - 1)
+
+
+class CandidatePool:
+    """Warm worker processes that screen and score layout candidates.
+
+    Each request spreads its candidates over at most ``max_parallel`` tasks (contiguous
+    chunks), so one request cannot occupy the whole pool. Only candidates passing the screen
+    are scored; if none passes, a second round scores them all. With no workers, a single
+    candidate, or a broken pool, the same happens in-process. Both paths pick the same
+    candidate.
+    """
+
+    def __init__(self, workers: Optional[int] = None, max_parallel: Optional[int] = None) -> None:
+        self.workers = default_workers() if workers is None else max(0, workers)
+        self.max_parallel = max(1, max_parallel or self.workers or 1)
+        self._lock = threading.Lock()
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                ctx = process_context(["backend.core.pool"])
+                self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=ctx, initializer=_warm)
+            return self._executor
+
+    def warm(self) -> None:
+        """Start every worker and load its rules now instead of on the first request."""
+        if self.workers <= 0:
+            return
+        ex = self._get_executor()
+        for f in [ex.submit(_ping) for _ in range(self.workers)]:
+            f.result()
+
+    def shutdown(self) -> None:
+        with self._lock:
+            ex, self._executor = self._executor, None
+        if ex is not None:
+            ex.shutdown(wait=True, cancel_futures=True)
+
+    def _map(self, fn: Callable[..., List[Any]], brief: Brief, indices: List[int], candidates: Sequence[LayoutResult], stop_at: Optional[float]) -> Dict[int, Any]:
+        """``fn`` over the candidates at ``indices`` in contiguous chunks on the workers; the
+        results of chunks finished by ``stop_at``, by candidate index."""
+        tasks = min(self.max_parallel, self.workers, len(indices))
+        size = -(-len(indices) // tasks)
+        chunks = [indices[k : k + size] for k in range(0, len(indices), size)]
+        ex = self._get_executor()
+        futures = [ex.submit(run_profiled, profiler.enabled, fn, brief, [candidates[i] for i in c]) for c in chunks]
+        timeout = None if stop_at is None else max(0.0, stop_at - time.perf_counter())
+        done, pending = wait(futures, timeout=timeout)
+        for f in pending:
+            f.cancel()
+        out: Dict[int, Any] = {}
+        for chunk, f in zip(chunks, futures):
+            if f in done:
+                values, stats = f.result()
+                profiler.merge(stats)
+                out.update(zip(chunk, values))
+        return out
+
+    def select(self, brief: Brief, candidates: Sequence[LayoutResult], engine: RulesEngine, critic: Critic, fallback: int = 0) -> int:
+        """Index of the best candidate.
+
+        Under a request deadline (``backend.core.budget``) evaluation stops at the end of the
+        candidates stage and picks among the candidates evaluated so far; ``fallback`` is
+        returned if none was.
+        """
+        n = len(candidates)
+        d = current_deadline()
+        stop_at = d.stage_end("candidates") if d is not None else None
+        if self.workers > 0 and n > 1:
+            try:
+                results = self._map(_screen_and_score, brief, list(range(n)), candidates, stop_at)
+                screened = {i: ok for i, (ok, _) in results.items()}
+                scores = {i: s for i, (ok, s) in results.items() if ok}
+                if results and not scores:
+                    # Nothing passed: pick among all screened candidates, so score them now
+                    scores = self._map(_score, brief, sorted(results), candidates, stop_at)
+                if d is not None and (len(results) < n or len(scores) < (sum(screened.values()) or len(screened))):
+                    d.degrade(f"candidate evaluation cut at deadline ({len(scores)} of {n})")
+                if not scores:
+                    return fallback
+                index = sorted(scores)
+                return index[_pick([screened[i] for i in index], [scores[i] for i in index])]
+            except BrokenProcessPool:
+                self.shutdown()  # recreated on the next request
+        order = list(range(n))
+        if fallback in order:
+            order.remove(fallback)
+            order.insert(0, fallback)  # under a deadline, evaluate the fallback first
+        passed: Dict[int, bool] = {}
+        for i in order:
+            if stop_at is not None and passed and time.perf_counter() >= stop_at:
+                break
+            passed[i] = engine.screen(candidates[i], brief).passed
+        survivors = [i for i in order if passed.get(i)] or list(passed)
+        scores: Dict[int, float] = {}
+        for i in survivors:
+            if stop_at is not None and scores and time.perf_counter() >= stop_at:
+                break
+            scores[i] = critic.score(brief, candidates[i])
+        if d is not None and (len(passed) < n or len(scores) < len(survivors)):
+            d.degrade(f"candidate evaluation cut at deadline ({len(scores)} of {n})")
+        index = sorted(scores)
+        return index[_pick([passed[i] for i in index], [scores[i] for i in index])]
+
+
+_default: Optional[CandidatePool] = None
+_default_lock = threading.Lock()
+
+
+def default_pool() -> CandidatePool:
+    """Process-wide pool shared by orchestrators (sized by BLUEPRINT_CANDIDATE_WORKERS)."""
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = CandidatePool()
+        return _default
@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+import bisect
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from backend.models.schema import Timings
+
+LATENCY_BUCKETS: Tuple[float, ...] = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+Labels = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _num(v: float) -> str:
+    return repr(float(v)) if v != int(v) or abs(v) >= 1e15 else str(int(v))
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()) -> None:
+        self.name, self.help, self.label_names = name, help, tuple(labels)
+        self._lock = threading.Lock()
+        # Unlabelled counters are exported from zero so rates work from the first scrape
+        self._values: Dict[Labels, float] = {} if self.label_names else {(): 0.0}
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        lines += [f"{self.name}{_labels(self.label_names, k)} {_num(v)}" for k, v in items]
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS) -> None:
+        self.name, self.help, self.label_names = name, help, tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        # per label set: [count per bucket (+Inf last), sum]
+        self._values: Dict[Labels, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            v = self._values.get(labels)
+            if v is None:
+                v = self._values[labels] = ([0] * (len(self.buckets) + 1), [0.0])
+            v[0][i] += 1
+            v[1][0] += value
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted((k, list(c), s[0]) for k, (c, s) in self._values.items())
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for k, counts, total in items:
+            cum = 0
+            for le, n in zip(self.buckets + (float("inf"),), counts):
+                cum += n
+                bound = 'le="+Inf"' if le == float("inf") else f'le="{_num(le)}"'
+                lines.append(f"{self.name}_bucket{_labels(self.label_names, k, bound)} {cum}")
+            lines.append(f"{self.name}_sum{_labels(self.label_names, k)} {_num(total)}")
+            lines.append(f"{self.name}_count{_labels(self.label_names, k)} {cum}")
+        return lines
+
+
+class Sampled:
+    """A value read at scrape time from live state (queue depth, cache counters)."""
+
+    def __init__(self, name: str, help: str, kind: str, read: Callable[[], float]) -> None:
+        self.name, self.help, self.kind, self.read = name, help, kind, read
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}", f"{self.name} {_num(self.read())}"]
+
+
+class Registry:
+    """In-process metrics rendered in the Prometheus text exposition format."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._metrics: Dict[str, Counter | Histogram | Sampled] = {}
+
+    def _add(self, metric):
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name: str, help: str, labels: Sequence[str] = ()) -> Counter:
+        return self._add(Counter(name, help, labels))
+
+    def histogram(self, name: str, help: str, labels: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self._add(Histogram(name, help, labels, buckets))
+
+    def sample(self, name: str, help: str, read: Callable[[], float], kind: str = "gauge") -> None:
+        """Register (or replace) a value read from ``read()`` on every scrape."""
+        with self._lock:
+            self._metrics[name] = Sampled(name, help, kind, read)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines: List[str] = []
+        for m in metrics:
+            lines += m.render()
+        return "\n".join(lines) + "\n"
+
+
+# Process-wide registry served by /metrics
+registry = Registry()
+
+request_seconds = registry.histogram(
+    "blueprint_http_request_duration_seconds", "HTTP request latency by route", ("method", "endpoint", "status")
+)
+stage_seconds = registry.histogram(
+    "blueprint_stage_duration_seconds", "Wall time of Orchestrator.run stages (computed runs only)", ("stage",)
+)
+run_seconds = registry.histogram("blueprint_run_duration_seconds", "Wall time of computed pipeline runs")
+strategy_wins = registry.counter("blueprint_solver_strategy_wins_total", "Solver strategy that produced the base layout", ("strategy",))
+candidate_wins = registry.counter("blueprint_candidate_wins_total", "Source of the selected candidate", ("source",))
+cpsat_solves = registry.counter("blueprint_cpsat_solves_total", "CP-SAT searches started")
+cpsat_limit_hits = registry.counter("blueprint_cpsat_time_limit_hits_total", "CP-SAT searches stopped by their time limit")
+
+# Run counters recorded on the trace (``tracing.count``) -> metric, label value taken after ':'
+_EVENTS: Dict[str, Counter] = {
+    "strategy": strategy_wins,
+    "candidate": candidate_wins,
+    "cpsat_solve": cpsat_solves,
+    "cpsat_time_limit": cpsat_limit_hits,
+}
+
+
+def observe_run(timings: Optional[Timings]) -> None:
+    """Record the stages and counters of one traced pipeline run.
+
+    Runs may compute in worker processes; their trace comes back with the response, so the
+    metrics land in the process serving /metrics.
+    """
+    if timings is None:
+        return
+    run_seconds.observe(timings.total_ms / 1e3)
+    for s in timings.stages:
+        stage_seconds.observe(s.wall_ms / 1e3, s.name)
+    for key, n in timings.counters.items():
+        event, _, label = key.partition(":")
+        metric = _EVENTS.get(event)
+        if metric is not None:
+            metric.inc(*((label,) if label else ()), amount=n)
+
+
+class RequestMetrics:
+    """ASGI middleware observing ``request_seconds`` per route template.
+
+    Time runs until the last body chunk is sent, so streamed responses count in full.
+    """
+
+    def __init__(self, app: Any) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        t0 = time.perf_counter()
+        status = [500]
+
+        async def timed_send(message: Dict[str, Any]) -> None:
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, timed_send)
+        finally:
+            # Route templates keep the label set bounded (/jobs/{job_id}, not every id)
+            route = scope.get("route")
+            endpoint = getattr(route, "path", None) or "unmatched"
+            request_seconds.observe(time.perf_counter() - t0, scope["method"], endpoint, str(status[0]))
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional
+
+from backend.models.schema import StageTiming, Timings
+
+_current: ContextVar[Optional["Trace"]] = ContextVar("blueprint_trace", default=None)
+
+
+class Trace:
+    """Wall and CPU time of the stages of one request.
+
+    CPU time is process time, so it includes the solver's worker threads (and anything else
+    running in the process at the same time).
+    """
+
+    def __init__(self) -> None:
+        self.t0 = time.perf_counter()
+        self.spans: List[StageTiming] = []
+        self.counters: Dict[str, int] = {}
+        self._depth = 0
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[None]:
+        w0, c0 = time.perf_counter(), time.process_time()
+        rec = StageTiming(name=name, start_ms=(w0 - self.t0) * 1e3, depth=self._depth)
+        self.spans.append(rec)  # in start order, parents before children
+        self._depth += 1
+        try:
+            yield
+        finally:
+            self._depth -= 1
+            rec.wall_ms = (time.perf_counter() - w0) * 1e3
+            rec.cpu_ms = (time.process_time() - c0) * 1e3
+
+    def count(self, event: str, n: int = 1) -> None:
+        self.counters[event] = self.counters.get(event, 0) + n
+
+    def timings(self) -> Timings:
+        return Timings(total_ms=(time.perf_counter() - self.t0) * 1e3, stages=list(self.spans), counters=dict(self.counters))
+
+
+@contextmanager
+def tracing(enabled: bool = True) -> Iterator[Optional[Trace]]:
+    """Make a new Trace current for the block (yields None when disabled)."""
+    if not enabled:
+        yield None
+        return
+    trace = Trace()
+    token = _current.set(trace)
+    try:
+        yield trace
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    """Time a stage of the current trace; a no-op outside ``tracing``."""
+    trace = _current.get()
+    if trace is None:
+        yield
+        return
+    with trace.span(name):
+        yield
+
+
+def count(event: str, n: int = 1) -> None:
+    """Count a run event (e.g. ``strategy:cpsat_pack``) on the current trace, if any."""
+    trace = _current.get()
+    if trace is not None:
+        trace.count(event, n)
+
+
+def chrome_trace(timings: Timings, name: str = "layout") -> Dict[str, Any]:
+    """Timings as Chrome trace-event JSON (load in chrome://tracing or Perfetto)."""
+    pid, tid = os.getpid(), threading.get_ident()
+    events: List[Dict[str, Any]] = [
+        {"name": name, "ph": "X", "ts": 0.0, "dur": timings.total_ms * 1e3, "pid": pid, "tid": tid, "args": {}}
+    ]
+    for s in timings.stages:
+        events.append({
+            "name": s.name,
+            "ph": "X",
+            "ts": s.start_ms * 1e3,
+            "dur": s.wall_ms * 1e3,
+            "pid": pid,
+            "tid": tid,
+            "args": {"cpu_ms": round(s.cpu_ms, 3)},
+        })
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
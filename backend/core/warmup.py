@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import importlib
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+# Loaded on first use by the modules that need them (importing the API stays light); warm-up
+# and worker-process preloads import them ahead of the first request instead
+LAZY_MODULES: Tuple[str, ...] = (
+    "numpy",
+    "networkx",
+    "ortools.sat.python.cp_model",
+    "backend.solver.cpsat",
+    "backend.learned.critic",
+    "backend.learned.proposal",
+    "backend.learned.topology",
+    "backend.learned.placement",
+    "backend.analysis.structure",
+    "backend.analysis.mep",
+    "backend.analysis.facade",
+    "backend.qa.metrics",
+    "backend.export.service",
+)
+
+# Small enough to solve in tens of milliseconds, large enough to take the corridor path
+# through CP-SAT and every later stage
+TINY_BRIEF: Dict[str, Any] = {
+    "building_w": 900,
+    "building_h": 700,
+    "rooms": [
+        {"name": "living", "min_w": 300, "min_h": 300},
+        {"name": "kitchen", "min_w": 200, "min_h": 200},
+        {"name": "bed1", "min_w": 250, "min_h": 250},
+        {"name": "bed2", "min_w": 250, "min_h": 250},
+        {"name": "bath", "min_w": 150, "min_h": 200},
+    ],
+    "seed": 1,
+}
+
+_lock = threading.Lock()
+_warm_s: Optional[float] = None
+
+
+def preload() -> None:
+    for name in LAZY_MODULES:
+        importlib.import_module(name)
+
+
+def warm_up() -> float:
+    """Import the lazy subsystems and run TINY_BRIEF through the pipeline and export.
+
+    Fills the process-wide state a first request would otherwise pay for (imports, compiled
+    rules, OR-Tools initialisation). Runs once per process image: a process forked after
+    warm-up is already warm. Returns the seconds the first call took.
+    """
+    global _warm_s
+    with _lock:
+        if _warm_s is None:
+            from backend.core.cache import ResultCache
+            from backend.core.orchestrator import Orchestrator
+            from backend.core.pool import CandidatePool
+            from backend.models.schema import Brief
+
+            t0 = time.perf_counter()
+            preload()
+            # In-process and uncached: no worker processes or cache entries for the warm-up
+            orch = Orchestrator(pool=CandidatePool(workers=0), cache=ResultCache(max_entries=0))
+            brief = Brief(**TINY_BRIEF)
+            resp = orch._measured(brief, False, None)
+            orch.export(brief, resp.layout)
+            _warm_s = time.perf_counter() - t0
+        return _warm_s
@@ -31,7 +31,7 @@ def generate_synthetic(n: int = 10, seed: Optional[int] = None, style_tag: Optio
     out: List[DatasetSample] = []
     for _ in range(n):
         brief = _random_brief()
-        res = orch.run(brief.model_dump())
+        res = orch.run(brief)
         scene = from_brief_and_layout(brief, res.layout)
         sample = sample_from_building(scene)
         # augmentations
@@ -3,7 +3,7 @@ from __future__ import annotations
 from typing import Dict, List
 import json
 
-from backend.models.scene import Building
+from backend.models.scene import Building, materialize
 from backend.export.svg import to_svg
 from backend.export.dxf import to_dxf
 from backend.export.ifc import to_ifc_interchange
@@ -25,6 +25,7 @@ def export_payloads(building: Building, formats: List[str], meta: Dict[str, str]
     Includes a manifest.json with hashes and metadata for reproducibility.
     """
     out: Dict[str, str] = {}
+    materialize(building)
     if "svg" in formats:
         out["plan.svg"] = to_svg(building)
     if "dxf" in formats:
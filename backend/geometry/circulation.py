@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import hashlib
+import math
+import threading
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    import numpy as np
+
+from backend.models.scene import WALL_GAP, Floor, OpeningType, Space
+
+_EPS = 1e-6
+
+
+def _on_boundary(sp: Space, x: float, y: float) -> bool:
+    # a door in a wall reaches both rooms, including across the solver's gap between them
+    x0, y0, x1, y1 = sp.rect.bbox()
+    reach = WALL_GAP + _EPS
+    on_v = (abs(x - x0) <= reach or abs(x - x1) <= reach) and y0 - _EPS <= y <= y1 + _EPS
+    on_h = (abs(y - y0) <= reach or abs(y - y1) <= reach) and x0 - _EPS <= x <= x1 + _EPS
+    return on_v or on_h
+
+
+def _center(sp: Space) -> Tuple[float, float]:
+    return (sp.rect.x + sp.rect.w / 2, sp.rect.y + sp.rect.h / 2)
+
+
+class FloorDistances:
+    """Walking distances between the rooms of one floor, through doors.
+
+    Nodes are room centres and doors; a door links every room whose boundary it lies on, and
+    inside a room people walk straight between its centre and doors. The solver leaves up to
+    ``WALL_GAP`` between rooms sharing a wall, so a door links rooms that close to it. All pairs
+    are solved once (Floyd-Warshall), so ``between`` is a dictionary and array lookup. Rooms not
+    linked by doors are ``inf`` apart.
+    """
+
+    def __init__(self, floor: Floor) -> None:
+        spaces = floor.spaces
+        self.names: List[str] = [sp.name for sp in spaces]
+        self.index: Dict[str, int] = {}
+        for i, n in enumerate(self.names):
+            self.index.setdefault(n, i)  # duplicate names: first wins
+        doors: List[Tuple[float, float]] = []
+        seen = set()
+        for sp in spaces:
+            for op in sp.openings:
+                key = (round(op.at.x, 3), round(op.at.y, 3))
+                if op.opening_type == OpeningType.DOOR and key not in seen:
+                    seen.add(key)
+                    doors.append((op.at.x, op.at.y))
+        n, m = len(spaces), len(doors)
+        pts = [_center(sp) for sp in spaces] + doors
+        import numpy as np
+
+        D = np.full((n + m, n + m), np.inf)
+        np.fill_diagonal(D, 0.0)
+        for i, sp in enumerate(spaces):
+            inside = [n + k for k, (x, y) in enumerate(doors) if _on_boundary(sp, x, y)]
+            nodes = [i] + inside
+            for a in range(len(nodes)):
+                for b in range(a + 1, len(nodes)):
+                    pa, pb = pts[nodes[a]], pts[nodes[b]]
+                    d = math.hypot(pa[0] - pb[0], pa[1] - pb[1])
+                    if d < D[nodes[a], nodes[b]]:
+                        D[nodes[a], nodes[b]] = D[nodes[b], nodes[a]] = d
+        for k in range(n + m):
+            np.minimum(D, D[:, k, None] + D[None, k, :], out=D)
+        self.matrix: np.ndarray = D[:n, :n]
+        self.doors = m
+
+    def between(self, a: str, b: str) -> float:
+        i, j = self.index.get(a), self.index.get(b)
+        if i is None or j is None:
+            return math.inf
+        return float(self.matrix[i, j])
+
+
+def floor_hash(floor: Floor) -> str:
+    """Geometry hash of a floor: room names and rectangles plus door positions."""
+    h = hashlib.sha1()
+    for sp in floor.spaces:
+        h.update(f"{sp.name}|{sp.rect.x},{sp.rect.y},{sp.rect.w},{sp.rect.h}".encode())
+        for op in sp.openings:
+            if op.opening_type == OpeningType.DOOR:
+                h.update(f"|d{op.at.x},{op.at.y}".encode())
+        h.update(b";")
+    return h.hexdigest()
+
+
+class DistanceCache:
+    """LRU of FloorDistances keyed by ``floor_hash``; thread-safe."""
+
+    def __init__(self, maxsize: int = 256) -> None:
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._items: "OrderedDict[str, FloorDistances]" = OrderedDict()
+
+    def get(self, floor: Floor) -> FloorDistances:
+        key = floor_hash(floor)
+        with self._lock:
+            hit = self._items.get(key)
+            if hit is not None:
+                self._items.move_to_end(key)
+                return hit
+        dist = FloorDistances(floor)
+        with self._lock:
+            self._items[key] = dist
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+        return dist
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+
+
+_cache = DistanceCache()
+
+
+def floor_distances(floor: Floor, cache: Optional[DistanceCache] = None) -> FloorDistances:
+    """Door-to-door walking distances of ``floor``, computed once per distinct floor geometry."""
+    return (cache or _cache).get(floor)
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from backend.models.scene import Building, Floor, Space, Fixture, FixtureType, Point
+from backend.models.scene import Building, Floor, Space, Fixture, FixtureType, Point, template_floors
 
 
 def ensure_stairs(building: Building) -> Building:
@@ -9,7 +9,7 @@ def ensure_stairs(building: Building) -> Building:
     # Place a single stair core roughly at building center on each floor
     cx = building.width / 2
     cy = building.height / 2
-    for i, floor in enumerate(building.floors):
+    for floor in template_floors(building):
         stair = Fixture(fixture_type=FixtureType.STAIRS, at=Point(x=cx, y=cy), w=1500, h=3000, meta={"rise": "175", "run": "280"})
         # Put in the first space that contains center, else attach to first space
         placed = False
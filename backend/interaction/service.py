@@ -1,17 +1,15 @@
 from __future__ import annotations
 
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, Optional
 from pydantic import BaseModel, Field
 
-from backend.models.schema import Brief, LayoutResult, CostBreakdown, AnalysisReport, Pins, PinRoom
+from backend.models.schema import Brief, LayoutResult, CostBreakdown, AnalysisReport, Pins, PinRoom, PlacedRoom
 from backend.core.orchestrator import Orchestrator
 from backend.solver.costs import evaluate_cost, aggregate_cost
 from backend.models.scene import from_brief_and_layout
-from backend.learned.critic import Critic
-from backend.learned.proposal import propose_variants
-from backend.learned.topology import propose_topologies
 from backend.retrieval.library import retrieve_seed
 from backend.solver.refine import refine_layout
+from backend.core.budget import solver_budget
 
 
 class Candidate(BaseModel):
@@ -22,7 +20,6 @@ class Candidate(BaseModel):
 
 
 def _explain(brief: Brief, layout: LayoutResult) -> tuple[CostBreakdown, AnalysisReport, str]:
-    orch = Orchestrator()
     scene = from_brief_and_layout(brief, layout)
     # reuse orchestrator scene passes: openings/stairs
     from backend.geometry.openings import apply_openings
@@ -44,36 +41,77 @@ def _explain(brief: Brief, layout: LayoutResult) -> tuple[CostBreakdown, Analysi
     return cost, analysis, summary
 
 
-def generate_candidates(brief: Brief | dict, k: int = 4) -> List[Candidate]:
-    if not isinstance(brief, Brief):
-        brief = Brief(**brief)
-    orch = Orchestrator()
-    brief_d = orch.rules.early_prune(brief).model_dump()
+class CandidateUpdate(BaseModel):
+    """One record of a candidate stream.
+
+    A candidate is sent once, with ``candidate`` set, as soon as it is explained; its
+    provisional ``rank`` is its place by soft cost among the candidates sent so far. Once every
+    candidate is in, the critic's ranking follows as ``final`` updates without ``candidate``:
+    ``rank`` best-first, or None for candidates outside the top ``k``.
+    """
+
+    id: int
+    rank: Optional[int]
+    final: bool = False
+    candidate: Optional[Candidate] = None
+
+
+def generate_candidates(brief: Brief, k: int = 4, orch: Optional[Orchestrator] = None) -> List[Candidate]:
+    """The top ``k`` candidates, best-first."""
+    sent: Dict[int, Candidate] = {}
+    ranked: List[tuple[int, int]] = []
+    for u in iter_candidates(brief, k=k, orch=orch):
+        if u.candidate is not None:
+            sent[u.id] = u.candidate
+        elif u.rank is not None:
+            ranked.append((u.rank, u.id))
+    return [sent[i] for _, i in sorted(ranked)]
+
+
+def iter_candidates(brief: Brief, k: int = 4, orch: Optional[Orchestrator] = None) -> Iterator[CandidateUpdate]:
+    """Candidates as they are produced and explained, then the critic's ranking of them.
+
+    Topology proposals come out before the solve, the solved base and its variants after it.
+    Each is sent in provisional (soft cost) order as soon as it is explained; only the final
+    ranking waits for the critic to score every candidate.
+    """
+    from backend.learned.critic import Critic
+    from backend.learned.proposal import propose_variants
+    from backend.learned.topology import propose_topologies
+
+    orch = orch or Orchestrator()
+    brief = orch.rules.early_prune(brief)
+    candidates: List[LayoutResult] = []
+    totals: List[float] = []
+
+    def send(layout: LayoutResult) -> CandidateUpdate:
+        cost, analysis, summary = _explain(brief, layout)
+        rank = sum(1 for t in totals if t <= cost.total)
+        candidates.append(layout)
+        totals.append(cost.total)
+        return CandidateUpdate(id=len(candidates) - 1, rank=rank, candidate=Candidate(layout=layout, cost=cost, analysis=analysis, summary=summary))
+
     # seed paths
-    topo = propose_topologies(brief_d, k=2)
-    seed = retrieve_seed(brief_d)
-    base = orch.solver.solve(brief_d, seed.model_dump() if seed else None)
-    base = LayoutResult(**base)
+    for layout in propose_topologies(brief, k=2):
+        yield send(layout)
+    seed = retrieve_seed(brief)
+    base = orch.solver.solve(brief, seed)
     if len(base.rooms) > 0:
-        base = refine_layout(base, brief_d, iterations=2)
-    candidates = topo + [base] + propose_variants(base, brief_d, k=max(0, k - 3))
+        base = refine_layout(base, brief, iterations=2)
+    yield send(base)
+    for layout in propose_variants(base, brief, k=max(0, k - 3)):
+        yield send(layout)
     critic = Critic()
-    scored = sorted(candidates, key=lambda L: critic.score(brief, L), reverse=True)[:k]
-    out: List[Candidate] = []
-    for c in scored:
-        cost, analysis, summary = _explain(brief, c)
-        out.append(Candidate(layout=c, cost=cost, analysis=analysis, summary=summary))
-    return out
-
-
-def apply_pins_and_optimize(brief: Brief | dict, layout: LayoutResult | dict, pins: Pins | dict) -> LayoutResult:
-    if not isinstance(brief, Brief):
-        brief = Brief(**brief)
-    if not isinstance(layout, LayoutResult):
-        layout = LayoutResult(**layout)
-    if not isinstance(pins, Pins):
-        pins = Pins(**pins)
-    # lock pinned rooms; nudge others with refine only
+    scores = [critic.score(brief, c) for c in candidates]
+    order = sorted(range(len(candidates)), key=lambda i: scores[i], reverse=True)
+    for rank, i in enumerate(order):
+        yield CandidateUpdate(id=i, rank=rank if rank < k else None, final=True)
+
+
+def apply_pins_and_optimize(brief: Brief, layout: LayoutResult, pins: Pins) -> LayoutResult:
+    # Pins and refinement edit rooms in place; the caller's layout stays as it was
+    layout = layout.model_copy(deep=True)
+    # Pinned coordinates and sizes first; the clamp keeps them inside the envelope
     pinned = {p.name: p for p in pins.rooms}
     for r in layout.rooms:
         p = pinned.get(r.name)
@@ -82,36 +120,50 @@ def apply_pins_and_optimize(brief: Brief | dict, layout: LayoutResult | dict, pi
                 r.x, r.y = p.x, p.y
             if p.lock_size and p.w is not None and p.h is not None:
                 r.w, r.h = p.w, p.h
-    # refine others
+    for r in layout.rooms:
+        r.x = max(0, min(r.x, brief.building_w - r.w))
+        r.y = max(0, min(r.y, brief.building_h - r.h))
+    # Re-pack the unpinned rooms around the pinned ones, warm-started from the current layout
+    solved = None
+    with solver_budget(0.5) as limit:
+        if limit > 0:
+            from backend.solver.cpsat import solve_pinned
+
+            fixed = {p.name for p in pins.rooms if p.lock_position}
+            solved = solve_pinned(brief, layout, fixed, time_limit_s=limit)
+    if solved is not None:
+        return solved
+    # No valid packing (pinned rooms overlap or crowd out the rest): nudge with refine only
     refine_layout(layout, brief, iterations=2)
-    # clamp to envelope
     for r in layout.rooms:
         r.x = max(0, min(r.x, brief.building_w - r.w))
         r.y = max(0, min(r.y, brief.building_h - r.h))
     return layout
 
 
-def local_edit_move(layout: LayoutResult | dict, name: str, dx: int, dy: int, brief: Brief | dict) -> LayoutResult:
-    if not isinstance(layout, LayoutResult):
-        layout = LayoutResult(**layout)
-    if not isinstance(brief, Brief):
-        brief = Brief(**brief)
+def move_room(r: PlacedRoom, dx: int, dy: int, brief: Brief) -> None:
+    """Move a room in place, clamped to the envelope."""
+    r.x = max(0, min(r.x + dx, brief.building_w - r.w))
+    r.y = max(0, min(r.y + dy, brief.building_h - r.h))
+
+
+def resize_room(r: PlacedRoom, dw: int, dh: int, brief: Brief) -> None:
+    """Resize a room in place, clamped to the envelope."""
+    r.w = max(1, min(r.w + dw, brief.building_w - r.x))
+    r.h = max(1, min(r.h + dh, brief.building_h - r.y))
+
+
+def local_edit_move(layout: LayoutResult, name: str, dx: int, dy: int, brief: Brief) -> LayoutResult:
     for r in layout.rooms:
         if r.name == name:
-            r.x = max(0, min(r.x + dx, brief.building_w - r.w))
-            r.y = max(0, min(r.y + dy, brief.building_h - r.h))
+            move_room(r, dx, dy, brief)
             break
     return layout
 
 
-def local_edit_resize(layout: LayoutResult | dict, name: str, dw: int, dh: int, brief: Brief | dict) -> LayoutResult:
-    if not isinstance(layout, LayoutResult):
-        layout = LayoutResult(**layout)
-    if not isinstance(brief, Brief):
-        brief = Brief(**brief)
+def local_edit_resize(layout: LayoutResult, name: str, dw: int, dh: int, brief: Brief) -> LayoutResult:
     for r in layout.rooms:
         if r.name == name:
-            r.w = max(1, min(r.w + dw, brief.building_w - r.x))
-            r.h = max(1, min(r.h + dh, brief.building_h - r.y))
+            resize_room(r, dw, dh, brief)
             break
     return layout
@@ -0,0 +1,198 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, List, Optional, Tuple
+from uuid import uuid4
+
+from backend.interaction.service import apply_pins_and_optimize, move_room, resize_room
+from backend.models.schema import Brief, CostBreakdown, EditPreview, LayoutResult, Pins, PlacedRoom, SessionState, ValidationDelta
+from backend.rules.incremental import ValidationState
+from backend.solver.costs import aggregate_cost, evaluate_cost
+
+
+def _overlap(a: PlacedRoom, b: PlacedRoom) -> bool:
+    # Positive-area intersection (shared edges are fine)
+    return min(a.x + a.w, b.x + b.w) > max(a.x, b.x) and min(a.y + a.h, b.y + b.h) > max(a.y, b.y)
+
+
+class Session:
+    """One interactive editing session: a compiled brief and its current, validated layout.
+
+    The validation state keeps the rule scene, room adjacency and per-room violations, so an
+    edit re-runs only the rules of the rooms it changed and of the rooms depending on them.
+    Edits copy only the rooms they change. Cost needs the full scene (openings, stairs) and is
+    computed at most once per layout version.
+
+    ``preview`` answers what an edit would do (for drag feedback) and leaves the session as it
+    was.
+    """
+
+    def __init__(self, brief: Brief, layout: LayoutResult, orchestrator: Any) -> None:
+        self.id = str(uuid4())
+        self.orchestrator = orchestrator
+        self.brief = orchestrator.rules.early_prune(brief)
+        self.state = ValidationState(self.brief, layout, orchestrator.rules)
+        self.version = 0
+        self.last_used = time.monotonic()
+        self.lock = threading.Lock()
+        self.corridor = next((r.name for r in layout.rooms if r.name.lower().startswith("corridor")), None)
+        self._cost: Optional[Tuple[int, CostBreakdown]] = None
+
+    @property
+    def layout(self) -> LayoutResult:
+        return self.state.layout
+
+    def edit(
+        self,
+        move: Optional[Tuple[str, int, int]] = None,
+        resize: Optional[Tuple[str, int, int]] = None,
+        pins: Optional[Pins] = None,
+    ) -> ValidationDelta:
+        """Apply a move, a resize and/or pinned re-optimisation; raises KeyError for an unknown room."""
+        with self.lock:
+            layout, _ = self._edited(move, resize)
+            if pins is not None:
+                layout = apply_pins_and_optimize(self.brief, layout, pins)
+            delta = self.state.update(layout)
+            self.version += 1
+            return delta
+
+    def preview(self, move: Optional[Tuple[str, int, int]] = None, resize: Optional[Tuple[str, int, int]] = None, cost: bool = True) -> EditPreview:
+        """Overlaps, corridor conflict, violation delta and cost change of an edit, not applied."""
+        with self.lock:
+            layout, edited = self._edited(move, resize)
+            before = [self.layout.rooms[i].model_copy() for i in edited]
+            moved = [layout.rooms[i] for i in edited]
+            names = {r.name for r in moved}
+            overlaps = sorted({o.name for r in moved for o in layout.rooms if o.name not in names and _overlap(r, o)})
+            if self.corridor is None:
+                conflict = False
+            elif self.corridor in names:
+                conflict = bool(overlaps)
+            else:
+                conflict = self.corridor in overlaps
+            base = self._current_cost().total if cost else None
+            # Validate the edited layout, then put the original rooms back (both incremental)
+            delta = self.state.update(layout)
+            compliant = not self.state.violations()
+            total = self._layout_cost(layout).total if cost else None
+            restored = list(layout.rooms)
+            for i, r in zip(edited, before):
+                restored[i] = r
+            self.state.update(LayoutResult(rooms=restored, dropped=layout.dropped))
+            return EditPreview(
+                version=self.version,
+                rooms=[r.model_copy() for r in moved],
+                overlaps=overlaps,
+                corridor_conflict=conflict,
+                compliant=compliant,
+                delta=delta,
+                cost_delta=None if base is None else total - base,
+            )
+
+    def _edited(self, move: Optional[Tuple[str, int, int]], resize: Optional[Tuple[str, int, int]]) -> Tuple[LayoutResult, List[int]]:
+        rooms = list(self.layout.rooms)  # unchanged rooms are shared with the state
+        edited: List[int] = []
+        for op, apply in ((move, move_room), (resize, resize_room)):
+            if op:
+                name, a, b = op
+                i = self.state.order.get(name)
+                if i is None:
+                    raise KeyError(name)
+                if i not in edited:
+                    rooms[i] = rooms[i].model_copy()
+                    edited.append(i)
+                apply(rooms[i], a, b, self.brief)
+        return LayoutResult(rooms=rooms, dropped=list(self.layout.dropped)), edited
+
+    def cost(self) -> CostBreakdown:
+        with self.lock:
+            return self._current_cost()
+
+    def _current_cost(self) -> CostBreakdown:
+        if self._cost is None or self._cost[0] != self.version:
+            self._cost = (self.version, self._layout_cost(self.layout))
+        return self._cost[1]
+
+    def _layout_cost(self, layout: LayoutResult) -> CostBreakdown:
+        scene = self.orchestrator.scene(self.brief, layout)
+        total, weighted = aggregate_cost(evaluate_cost(scene, self.brief), self.brief)
+        return CostBreakdown(total=total, terms=weighted)
+
+    def to_state(self, delta: Optional[ValidationDelta] = None, cost: bool = False) -> SessionState:
+        costs = self.cost() if cost else None
+        with self.lock:
+            layout = self.layout.model_copy(deep=True)  # the state keeps editing its rooms in place
+            return SessionState(
+                id=self.id,
+                version=self.version,
+                rooms=layout.rooms,
+                dropped=layout.dropped,
+                validation=self.state.report(),
+                delta=delta,
+                cost=costs,
+            )
+
+
+class SessionStore:
+    """Editing sessions kept in memory.
+
+    A session is evicted after ``idle_s`` seconds without use, and the least recently used
+    ones go first beyond ``max_sessions``. Sessions live in the process that created them.
+    """
+
+    def __init__(self, orchestrator: Any, max_sessions: int = 1000, idle_s: float = 1800.0) -> None:
+        self.orchestrator = orchestrator
+        self.max_sessions = max(1, max_sessions)
+        self.idle_s = idle_s
+        self.evicted = 0
+        self._lock = threading.Lock()
+        self._sessions: "OrderedDict[str, Session]" = OrderedDict()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._sessions)
+
+    def create(self, brief: Brief, layout: LayoutResult) -> Session:
+        session = Session(brief, layout, self.orchestrator)
+        with self._lock:
+            self._sessions[session.id] = session
+            self._evict()
+        return session
+
+    def get(self, session_id: str) -> Optional[Session]:
+        with self._lock:
+            self._evict()
+            session = self._sessions.get(session_id)
+            if session is not None:
+                session.last_used = time.monotonic()
+                self._sessions.move_to_end(session_id)
+            return session
+
+    def delete(self, session_id: str) -> bool:
+        with self._lock:
+            return self._sessions.pop(session_id, None) is not None
+
+    def _evict(self) -> None:
+        # Oldest use first: stop at the first session still in use
+        cutoff = time.monotonic() - self.idle_s
+        stale: List[str] = []
+        for sid, s in self._sessions.items():
+            if s.last_used >= cutoff and len(self._sessions) - len(stale) <= self.max_sessions:
+                break
+            stale.append(sid)
+        for sid in stale:
+            del self._sessions[sid]
+        self.evicted += len(stale)
+
+
+def default_session_store(orchestrator: Any) -> SessionStore:
+    """Store configured from BLUEPRINT_SESSIONS (max live sessions) and BLUEPRINT_SESSION_IDLE_S."""
+    return SessionStore(
+        orchestrator,
+        max_sessions=int(os.environ.get("BLUEPRINT_SESSIONS", "1000")),
+        idle_s=float(os.environ.get("BLUEPRINT_SESSION_IDLE_S", "1800")),
+    )
@@ -12,11 +12,7 @@ from backend.models.scene import from_brief_and_layout
 class Critic:
     """Learned critic stub: combines weighted soft cost with simple daylight heuristics."""
 
-    def score(self, brief: Brief | dict, layout: LayoutResult | dict) -> float:
-        if not isinstance(brief, Brief):
-            brief = Brief(**brief)
-        if not isinstance(layout, LayoutResult):
-            layout = LayoutResult(**layout)
+    def score(self, brief: Brief, layout: LayoutResult) -> float:
         # Build scene and ensure openings/stairs for daylight estimation
         scene = from_brief_and_layout(brief, layout)
         scene = apply_openings(scene)
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from typing import List
 
-from backend.models.scene import Building, Opening, OpeningType, Point, Space, Fixture, FixtureType
+from backend.models.scene import Building, Opening, OpeningType, Point, Space, Fixture, FixtureType, template_floors
 
 
 def apply_learned_placements(building: Building) -> Building:
@@ -12,7 +12,7 @@ def apply_learned_placements(building: Building) -> Building:
     if not building.floors:
         return building
     bw, bh = building.width, building.height
-    for floor in building.floors:
+    for floor in template_floors(building):
         corridor = next((s for s in floor.spaces if s.name.lower() == "corridor"), None)
         for sp in floor.spaces:
             x0, y0, w, h = sp.rect.x, sp.rect.y, sp.rect.w, sp.rect.h
@@ -7,12 +7,8 @@ from backend.solver.costs import evaluate_cost, aggregate_cost
 from backend.models.scene import from_brief_and_layout
 
 
-def propose_variants(layout: LayoutResult | dict, brief: Brief | dict, k: int = 3) -> List[LayoutResult]:
+def propose_variants(layout: LayoutResult, brief: Brief, k: int = 3) -> List[LayoutResult]:
     """Generate k simple heuristic variants by jittering room sizes/positions."""
-    if not isinstance(layout, LayoutResult):
-        layout = LayoutResult(**layout)
-    if not isinstance(brief, Brief):
-        brief = Brief(**brief)
 
     variants: List[LayoutResult] = []
     for i in range(k):
@@ -32,12 +28,8 @@ def propose_variants(layout: LayoutResult | dict, brief: Brief | dict, k: int =
     return variants
 
 
-def score_layout(layout: LayoutResult | dict, brief: Brief | dict) -> float:
+def score_layout(layout: LayoutResult, brief: Brief) -> float:
     """Higher is better. Uses negative weighted cost as score."""
-    if not isinstance(layout, LayoutResult):
-        layout = LayoutResult(**layout)
-    if not isinstance(brief, Brief):
-        brief = Brief(**brief)
     scene = from_brief_and_layout(brief, layout)
     terms = evaluate_cost(scene, brief)
     total, _ = aggregate_cost(terms, brief)
@@ -5,10 +5,7 @@ from typing import List
 from backend.models.schema import Brief, LayoutResult, PlacedRoom
 
 
-def propose_topologies(brief: Brief | dict, k: int = 2) -> List[LayoutResult]:
-    if not isinstance(brief, Brief):
-        brief = Brief(**brief)
-
+def propose_topologies(brief: Brief, k: int = 2) -> List[LayoutResult]:
     # Strategy: place living+kitchen adjacent on first row; bedrooms in second row; bath near bedrooms
     names = [r.name.lower() for r in brief.rooms]
     has_living = any(n.startswith("living") for n in names)
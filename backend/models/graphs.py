@@ -1,7 +1,9 @@
 from __future__ import annotations
 
-from typing import Dict, Tuple
-import networkx as nx
+from typing import TYPE_CHECKING, Dict, Tuple
+
+if TYPE_CHECKING:
+    import networkx as nx
 
 from backend.models.scene import Building, Floor, Space
 
@@ -14,6 +16,8 @@ def _rects_touch_or_overlap(a: Tuple[float, float, float, float], b: Tuple[float
 
 
 def build_room_adjacency(floor: Floor) -> nx.Graph:
+    import networkx as nx
+
     g = nx.Graph()
     for sp in floor.spaces:
         g.add_node(sp.id, name=sp.name)
@@ -27,12 +31,16 @@ def build_room_adjacency(floor: Floor) -> nx.Graph:
 
 def build_circulation_graph(floor: Floor) -> nx.Graph:
     # MVP: reuse adjacency as a proxy for circulation; openings can refine later
+    import networkx as nx
+
     g = build_room_adjacency(floor)
     nx.set_edge_attributes(g, {e: {"kind": "circulation", "weight": 1.0} for e in g.edges})
     return g
 
 
 def build_mep_graph(floor: Floor) -> nx.Graph:
+    import networkx as nx
+
     g = nx.Graph()
     wet_keywords = ("bath", "toilet", "wc", "kitchen", "laundry")
     wet_nodes = []
@@ -5,7 +5,7 @@ from enum import Enum
 from typing import Dict, List, Literal, Optional
 from uuid import uuid4
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr
 
 from backend.models.units import Rounding, UnitSystem
 
@@ -24,6 +24,9 @@ IFC_LAYER_MAP: Dict[Layer, str] = {
     Layer.ANNO: "IfcAnnotation",
 }
 
+# Widest gap the solver leaves between rooms that share a wall (its finalize ``min_gap``)
+WALL_GAP = 20.0
+
 DWG_LAYER_MAP: Dict[Layer, str] = {
     Layer.ARCH: "A-*",
     Layer.STRUCT: "S-*",
@@ -103,10 +106,22 @@ class Space(Node):
     fixtures: List[Fixture] = Field(default_factory=list)
 
 
+class _SharedSpaces:
+    """Space list shared by several floors until one of them writes to it."""
+
+    __slots__ = ("spaces", "refs")
+
+    def __init__(self, spaces: List[Space], refs: int) -> None:
+        self.spaces = spaces
+        self.refs = refs
+
+
 class Floor(Node):
     typ: Literal["floor"] = "floor"
     elevation: float = 0.0
     spaces: List[Space] = Field(default_factory=list)
+    # Set while the spaces belong to a template shared with other floors (copy-on-write)
+    _cow: Optional[_SharedSpaces] = PrivateAttr(default=None)
 
 
 class Building(Node):
@@ -124,23 +139,122 @@ class Building(Node):
         return DWG_LAYER_MAP.get(layer, "")
 
 
+def _clone_space(sp: Space) -> Space:
+    # Fresh IDs so every floor keeps unique node IDs once it owns its spaces.
+    # Points are treated as immutable values and shared with the template.
+    return Space(
+        name=sp.name,
+        rect=sp.rect.model_copy(),
+        layer=sp.layer,
+        meta=dict(sp.meta),
+        boundaries=[b.model_copy(update={"id": str(uuid4())}) for b in sp.boundaries],
+        openings=[op.model_copy(update={"id": str(uuid4()), "meta": dict(op.meta)}) for op in sp.openings],
+        fixtures=[fx.model_copy(update={"id": str(uuid4()), "meta": dict(fx.meta)}) for fx in sp.fixtures],
+    )
+
+
+def own_floor(floor: Floor) -> Floor:
+    """Give ``floor`` its own spaces before a pass mutates them (copy-on-write).
+    The last floor still sharing a template takes the originals without copying.
+    """
+    shared = floor._cow
+    if shared is None:
+        return floor
+    if shared.refs > 1:
+        floor.spaces = [_clone_space(sp) for sp in shared.spaces]
+    shared.refs -= 1
+    floor._cow = None
+    return floor
+
+
+def template_floors(building: Building) -> List[Floor]:
+    """One floor per shared template, plus every floor owning its spaces.
+
+    Passes that make the same edit on every floor (openings, stairs) apply it once through
+    these floors; floors sharing a template see the edit and keep sharing it.
+    """
+    seen = set()
+    out: List[Floor] = []
+    for f in building.floors:
+        key = id(f._cow) if f._cow is not None else id(f)
+        if key not in seen:
+            seen.add(key)
+            out.append(f)
+    return out
+
+
+def materialize(building: Building) -> Building:
+    """Resolve all shared floors, e.g. before exporting IDs that must be unique."""
+    for f in building.floors:
+        own_floor(f)
+    return building
+
+
 # Adapters
 from backend.models.schema import Brief, LayoutResult
 
 
+def geometry_view(brief: Brief, layout: LayoutResult) -> Building:
+    """Read-only scene with room rectangles only (no walls, doors or windows).
+    Enough for geometry rules during candidate screening, at a fraction of the full build cost.
+    """
+    spaces = [
+        Space(name=r.name, rect=Rect(x=r.x, y=r.y, w=r.w, h=r.h))
+        for r in layout.rooms
+    ]
+    floors = brief.building_floors if hasattr(brief, 'building_floors') else 1
+    return Building(
+        width=brief.building_w,
+        height=brief.building_h,
+        floors=[Floor(elevation=i * 3000.0, spaces=spaces) for i in range(max(1, floors))],
+    )
+
+
+def _space_with_walls(r) -> Space:
+    space = Space(name=r.name, rect=Rect(x=r.x, y=r.y, w=r.w, h=r.h))
+    x0, y0, w, h = r.x, r.y, r.w, r.h
+    pts = [Point(x=x0, y=y0), Point(x=x0 + w, y=y0), Point(x=x0 + w, y=y0 + h), Point(x=x0, y=y0 + h)]
+    segs = [(pts[i], pts[(i + 1) % 4]) for i in range(4)]
+    for a, b in segs:
+        space.boundaries.append(Boundary(a=a, b=b))
+    return space
+
+
+def _add_perimeter_windows(sp: Space, width: float, height: float) -> None:
+    n = sp.name.lower()
+    if n.startswith('bath'):
+        return
+    x, y, w, h = sp.rect.x, sp.rect.y, sp.rect.w, sp.rect.h
+    # top
+    if abs(y - 0.0) < 1e-6:
+        sp.openings.append(Opening(opening_type=OpeningType.WINDOW, at=Point(x=x + w/2, y=y), w=120.0, h=1200.0))
+    # bottom
+    if abs(y + h - height) < 1e-6:
+        sp.openings.append(Opening(opening_type=OpeningType.WINDOW, at=Point(x=x + w/2, y=y + h), w=120.0, h=1200.0))
+    # left
+    if abs(x - 0.0) < 1e-6:
+        sp.openings.append(Opening(opening_type=OpeningType.WINDOW, at=Point(x=x, y=y + h/2), w=120.0, h=1200.0))
+    # right
+    if abs(x + w - width) < 1e-6:
+        sp.openings.append(Opening(opening_type=OpeningType.WINDOW, at=Point(x=x + w, y=y + h/2), w=120.0, h=1200.0))
+
+
+def room_space(r, width: float, height: float) -> Space:
+    """One room as a Space with walls and perimeter windows but no doors.
+    Window-based rules see the same result as on the full scene; used for incremental updates.
+    """
+    space = _space_with_walls(r)
+    _add_perimeter_windows(space, width, height)
+    return space
+
+
 def from_brief_and_layout(brief: Brief, layout: LayoutResult) -> Building:
     bldg = Building(unit_system=UnitSystem.METRIC_MM, width=brief.building_w, height=brief.building_h)
     def build_floor() -> Floor:
         floor = Floor(elevation=0.0)
         # First pass: create spaces and walls
         for r in layout.rooms:
-            space = Space(name=r.name, rect=Rect(x=r.x, y=r.y, w=r.w, h=r.h))
-            x0, y0, w, h = r.x, r.y, r.w, r.h
-            pts = [Point(x=x0, y=y0), Point(x=x0 + w, y=y0), Point(x=x0 + w, y=y0 + h), Point(x=x0, y=y0 + h)]
-            segs = [(pts[i], pts[(i + 1) % 4]) for i in range(4)]
-            for a, b in segs:
-                space.boundaries.append(Boundary(a=a, b=b))
-            floor.spaces.append(space)
+            floor.spaces.append(_space_with_walls(r))
         # Second pass: add doors between meaningful adjacencies and windows on perimeter
         def bbox(sp):
             x, y, w, h = sp.rect.x, sp.rect.y, sp.rect.w, sp.rect.h
@@ -156,49 +270,42 @@ def from_brief_and_layout(brief: Brief, layout: LayoutResult) -> Building:
             for j in range(i + 1, len(spaces)):
                 a = spaces[i]; b = spaces[j]
                 ax0, ay0, ax1, ay1 = bbox(a); bx0, by0, bx1, by1 = bbox(b)
-                # vertical shared edge
-                if abs(ax1 - bx0) < 1e-6 or abs(bx1 - ax0) < 1e-6:
+                # vertical shared edge (rooms may stand up to WALL_GAP apart across it)
+                if 0 <= bx0 - ax1 <= WALL_GAP or 0 <= ax0 - bx1 <= WALL_GAP:
                     ov = overlap_len(ay0, ay1, by0, by1)
                     if ov >= min_ov:
                         # corridor-private or corridor-living
                         corridor_pair = (a.name.lower().startswith('corridor') or b.name.lower().startswith('corridor'))
                         if corridor_pair and (is_private(a.name) or is_private(b.name) or a.name.lower().startswith('living') or b.name.lower().startswith('living')):
                             y_mid = max(ay0, by0) + ov / 2.0
-                            x_edge = ax1 if abs(ax1 - bx0) < 1e-6 else bx1
                             sp = a if a.name.lower().startswith('corridor') else b
+                            # on the corridor's own edge of the shared wall
+                            b_right = 0 <= bx0 - ax1 <= WALL_GAP
+                            x_edge = (ax1 if b_right else ax0) if sp is a else (bx0 if b_right else bx1)
                             sp.openings.append(Opening(opening_type=OpeningType.DOOR, at=Point(x=x_edge, y=y_mid), w=door_w, h=door_h))
                 # horizontal shared edge
-                if abs(ay1 - by0) < 1e-6 or abs(by1 - ay0) < 1e-6:
+                if 0 <= by0 - ay1 <= WALL_GAP or 0 <= ay0 - by1 <= WALL_GAP:
                     ov = overlap_len(ax0, ax1, bx0, bx1)
                     if ov >= min_ov:
                         # living–kitchen doorway if they meet
                         names = {a.name.lower(), b.name.lower()}
                         if 'living' in names and 'kitchen' in names:
                             x_mid = max(ax0, bx0) + ov / 2.0
-                            y_edge = ay1 if abs(ay1 - by0) < 1e-6 else by1
+                            y_edge = ay1 if 0 <= by0 - ay1 <= WALL_GAP else ay0
                             a.openings.append(Opening(opening_type=OpeningType.DOOR, at=Point(x=x_mid, y=y_edge), w=door_w, h=door_h))
         # perimeter windows
         for sp in spaces:
-            n = sp.name.lower()
-            if n.startswith('bath'):
-                continue
-            x, y, w, h = sp.rect.x, sp.rect.y, sp.rect.w, sp.rect.h
-            # top
-            if abs(y - 0.0) < 1e-6:
-                sp.openings.append(Opening(opening_type=OpeningType.WINDOW, at=Point(x=x + w/2, y=y), w=120.0, h=1200.0))
-            # bottom
-            if abs(y + h - bldg.height) < 1e-6:
-                sp.openings.append(Opening(opening_type=OpeningType.WINDOW, at=Point(x=x + w/2, y=y + h), w=120.0, h=1200.0))
-            # left
-            if abs(x - 0.0) < 1e-6:
-                sp.openings.append(Opening(opening_type=OpeningType.WINDOW, at=Point(x=x, y=y + h/2), w=120.0, h=1200.0))
-            # right
-            if abs(x + w - bldg.width) < 1e-6:
-                sp.openings.append(Opening(opening_type=OpeningType.WINDOW, at=Point(x=x + w, y=y + h/2), w=120.0, h=1200.0))
+            _add_perimeter_windows(sp, bldg.width, bldg.height)
         return floor
     floors = brief.building_floors if hasattr(brief, 'building_floors') else 1
+    template = build_floor()
+    if floors <= 1:
+        bldg.floors.append(template)
+        return bldg
+    # MVP floors are replicated: share one template and copy only when a pass writes to a floor
+    shared = _SharedSpaces(template.spaces, floors)
     for i in range(floors):
-        f = build_floor()
-        f.elevation = i * 3000.0  # 3m floor-to-floor as placeholder
+        f = Floor(elevation=i * 3000.0, spaces=shared.spaces)  # 3m floor-to-floor as placeholder
+        f._cow = shared
         bldg.floors.append(f)
     return bldg
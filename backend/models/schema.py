@@ -101,11 +101,45 @@ class ValidationReport(BaseModel):
     violations: List[str] = Field(default_factory=list)
 
 
+class ValidationDelta(BaseModel):
+    added: List[str] = Field(default_factory=list)
+    removed: List[str] = Field(default_factory=list)
+    rechecked: List[str] = Field(default_factory=list)  # rooms whose rules were re-run
+
+
+class EditResult(LayoutResult):
+    """Edited layout plus its re-validation; a superset of LayoutResult."""
+
+    validation: Optional[ValidationReport] = None
+    delta: Optional[ValidationDelta] = None  # session edits only (/sessions/{id})
+
+
 class CostBreakdown(BaseModel):
     total: float
     terms: Dict[str, float] = Field(default_factory=dict)
 
 
+class SessionState(EditResult):
+    """Current layout of an editing session; ``delta`` is what the last edit changed."""
+
+    id: str
+    version: int = 0  # edits applied so far
+    cost: Optional[CostBreakdown] = None
+
+
+class EditPreview(BaseModel):
+    """What an edit to a session would change, without applying it."""
+
+    version: int  # session version the preview was computed against
+    seq: Optional[int] = None  # echoed from the request, to match replies to pointer events
+    rooms: List[PlacedRoom] = Field(default_factory=list)  # edited rooms, clamped to the envelope
+    overlaps: List[str] = Field(default_factory=list)  # rooms the edited rooms would overlap
+    corridor_conflict: bool = False  # a room would intrude on the corridor (or the corridor on a room)
+    compliant: bool = True
+    delta: ValidationDelta = Field(default_factory=ValidationDelta)
+    cost_delta: Optional[float] = None  # change in total cost
+
+
 # ----- Interaction -----
 class PinRoom(BaseModel):
     name: str
@@ -133,6 +167,7 @@ class GovernanceReport(BaseModel):
     tenant_id: Optional[str] = None
     consent_external: bool = False
     rule_ids: List[str] = Field(default_factory=list)
+    rules_version: Optional[str] = None
 
 
 class MetricsReport(BaseModel):
@@ -144,6 +179,20 @@ class MetricsReport(BaseModel):
     mep_alignment_score: float
 
 
+class StageTiming(BaseModel):
+    name: str
+    start_ms: float = 0.0  # offset from the start of the request
+    wall_ms: float = 0.0
+    cpu_ms: float = 0.0  # process CPU time, including solver worker threads
+    depth: int = 0  # nesting level (sub-stages are deeper)
+
+
+class Timings(BaseModel):
+    total_ms: float
+    stages: List[StageTiming] = Field(default_factory=list)
+    counters: Dict[str, int] = Field(default_factory=dict)  # run events, e.g. "strategy:cpsat_pack"
+
+
 class LayoutResponse(BaseModel):
     layout: LayoutResult
     validation: ValidationReport
@@ -151,3 +200,19 @@ class LayoutResponse(BaseModel):
     analysis: Optional[AnalysisReport] = None
     metrics: Optional[MetricsReport] = None
     governance: Optional[GovernanceReport] = None
+    timings: Optional[Timings] = None
+    degraded: bool = False  # work was cut to meet the request deadline
+    degraded_reasons: List[str] = Field(default_factory=list)
+
+
+class JobStatus(BaseModel):
+    id: str
+    status: str  # queued | running | done | failed | cancelled
+    created_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    solutions: int = 0  # improving CP-SAT solutions seen so far
+    objective: Optional[float] = None
+    layout: Optional[LayoutResult] = None  # best intermediate layout while running
+    result: Optional[LayoutResponse] = None
+    error: Optional[str] = None
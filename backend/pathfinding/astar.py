@@ -1,44 +1,205 @@
 from __future__ import annotations
 
-from typing import List, Tuple, Optional
+from typing import List, Tuple, Optional, Sequence, Union
 import heapq
 
-Grid = List[List[int]]  # 0=free, 1=blocked
-
-
-def astar(grid: Grid, start: Tuple[int, int], goal: Tuple[int, int]) -> Optional[List[Tuple[int, int]]]:
-    w, h = len(grid[0]), len(grid)
-    sx, sy = start
-    gx, gy = goal
-    def inb(x, y):
-        return 0 <= x < w and 0 <= y < h
-    def hcost(x, y):
-        return abs(x - gx) + abs(y - gy)
-
-    openh = [(hcost(sx, sy), 0, (sx, sy), None)]
-    came = {}
-    gscore = { (sx, sy): 0 }
-    visited = set()
-    while openh:
-        f, g, (x, y), parent = heapq.heappop(openh)
-        if (x, y) in visited:
+import numpy as np
+
+Grid = Union[List[List[int]], np.ndarray]  # 0=free, nonzero=blocked; indexed grid[y][x]
+Path = List[Tuple[int, int]]
+
+
+class _Raster:
+    """Grid padded with a blocked border and flattened; node ids are ``y * W + x`` on the padded
+    grid, so neighbours are ``n±1`` / ``n±W`` without bounds checks.
+    """
+
+    __slots__ = ("W", "N", "blocked")
+
+    def __init__(self, grid: Grid) -> None:
+        arr = np.asarray(grid)
+        padded = np.pad(arr != 0, 1, constant_values=True)
+        self.W = padded.shape[1]
+        self.N = padded.size
+        # bytes indexing is the fastest scalar read for the scan loops
+        self.blocked = padded.astype(np.uint8).tobytes()
+
+    def node(self, p: Tuple[int, int]) -> int:
+        return (p[1] + 1) * self.W + (p[0] + 1)
+
+    def xy(self, n: int) -> Tuple[int, int]:
+        y, x = divmod(n, self.W)
+        return (x - 1, y - 1)
+
+
+def _manhattan(W: int, a: int, b: int) -> int:
+    ay, ax = divmod(a, W)
+    by, bx = divmod(b, W)
+    return abs(ax - bx) + abs(ay - by)
+
+
+def _unroll(ras: _Raster, nodes: Sequence[int]) -> Path:
+    # expand straight segments between consecutive nodes into every grid cell
+    out: Path = [ras.xy(nodes[0])]
+    W = ras.W
+    for a, b in zip(nodes, nodes[1:]):
+        step = (1 if b > a else -1) if abs(b - a) < W else (W if b > a else -W)
+        n = a
+        while n != b:
+            n += step
+            out.append(ras.xy(n))
+    return out
+
+
+def _trace(parent: np.ndarray, n: int) -> List[int]:
+    nodes = [n]
+    while parent[n] >= 0:
+        n = int(parent[n])
+        nodes.append(n)
+    return nodes[::-1]
+
+
+def _plain(ras: _Raster, s: int, t: int) -> Optional[List[int]]:
+    """A* expanding every cell (the reference search)."""
+    W, N, blocked = ras.W, ras.N, ras.blocked
+    g = np.full(N, -1, dtype=np.int64)
+    parent = np.full(N, -1, dtype=np.int64)
+    closed = np.zeros(N, dtype=bool)
+    g[s] = 0
+    heap = [_manhattan(W, s, t) * N + s]
+    while heap:
+        n = heapq.heappop(heap) % N
+        if closed[n]:
             continue
-        visited.add((x, y))
-        came[(x, y)] = parent
-        if (x, y) == (gx, gy):
-            # reconstruct
-            path = []
-            cur = (x, y)
-            while cur is not None:
-                path.append(cur)
-                cur = came[cur]
-            return list(reversed(path))
-        for dx, dy in ((1,0),(-1,0),(0,1),(0,-1)):
-            nx, ny = x+dx, y+dy
-            if not inb(nx, ny) or grid[ny][nx] == 1:
+        closed[n] = True
+        if n == t:
+            return _trace(parent, n)
+        gn = int(g[n])
+        for v in (n + 1, n - 1, n + W, n - W):
+            if blocked[v] or closed[v]:
                 continue
-            ng = g + 1
-            if ng < gscore.get((nx, ny), 1e9):
-                gscore[(nx, ny)] = ng
-                heapq.heappush(openh, (ng + hcost(nx, ny), ng, (nx, ny), (x, y)))
+            if g[v] < 0 or gn + 1 < g[v]:
+                g[v] = gn + 1
+                parent[v] = n
+                heapq.heappush(heap, (gn + 1 + _manhattan(W, v, t)) * N + v)
     return None
+
+
+def _jps(ras: _Raster, s: int, t: int) -> Optional[List[int]]:
+    """Jump point search for 4-connected uniform-cost grids.
+
+    Canonical paths prefer vertical moves: a horizontal run only turns where the cell diagonally
+    behind the turn is blocked (a forced neighbour), while vertical runs may branch sideways at
+    every cell. Only jump points enter the open list; returns them start to goal.
+    """
+    W, blocked = ras.W, ras.blocked
+
+    def jump_h(n: int, d: int) -> int:
+        while True:
+            n += d
+            if blocked[n]:
+                return -1
+            if n == t:
+                return n
+            if (not blocked[n - W] and blocked[n - d - W]) or (not blocked[n + W] and blocked[n - d + W]):
+                return n
+
+    def jump_v(n: int, d: int) -> int:
+        while True:
+            n += d
+            if blocked[n]:
+                return -1
+            if n == t or jump_h(n, 1) >= 0 or jump_h(n, -1) >= 0:
+                return n
+
+    N = ras.N
+    g = np.full(N, -1, dtype=np.int64)
+    parent = np.full(N, -1, dtype=np.int64)
+    closed = np.zeros(N, dtype=bool)
+    g[s] = 0
+    heap = [_manhattan(W, s, t) * N + s]  # f and node packed into one int
+    while heap:
+        n = heapq.heappop(heap) % N
+        if closed[n]:
+            continue
+        closed[n] = True
+        if n == t:
+            return _trace(parent, n)
+        p = int(parent[n])
+        if p < 0:
+            dirs = (1, -1, W, -W)
+        elif abs(n - p) < W:
+            d = 1 if n > p else -1
+            dirs = [d] + [v for v in (W, -W) if blocked[n - d + v] and not blocked[n + v]]
+        else:
+            dirs = (W if n > p else -W, 1, -1)
+        gn = int(g[n])
+        for d in dirs:
+            j = jump_h(n, d) if d in (1, -1) else jump_v(n, d)
+            if j < 0 or closed[j]:
+                continue
+            gj = gn + (abs(j - n) if d in (1, -1) else abs(j - n) // W)
+            if g[j] < 0 or gj < g[j]:
+                g[j] = gj
+                parent[j] = n
+                heapq.heappush(heap, (gj + _manhattan(W, j, t)) * N + j)
+    return None
+
+
+def _bidirectional(ras: _Raster, s: int, t: int) -> Optional[List[int]]:
+    """Bidirectional A* (Manhattan heuristic towards each side's target); stops once the best
+    meeting cost cannot be beaten by any open node of either search.
+    """
+    W, N, blocked = ras.W, ras.N, ras.blocked
+    g = (np.full(N, -1, dtype=np.int64), np.full(N, -1, dtype=np.int64))
+    parent = (np.full(N, -1, dtype=np.int64), np.full(N, -1, dtype=np.int64))
+    closed = (np.zeros(N, dtype=bool), np.zeros(N, dtype=bool))
+    target = (t, s)
+    heaps = ([_manhattan(W, s, t) * N + s], [_manhattan(W, t, s) * N + t])
+    g[0][s] = 0
+    g[1][t] = 0
+    best, meet = -1, -1
+    while heaps[0] and heaps[1]:
+        if best >= 0 and max(heaps[0][0], heaps[1][0]) // N >= best:
+            break
+        side = 0 if heaps[0][0] <= heaps[1][0] else 1
+        n = heapq.heappop(heaps[side]) % N
+        gs, ps, cs, other = g[side], parent[side], closed[side], g[1 - side]
+        if cs[n]:
+            continue
+        cs[n] = True
+        gn = int(gs[n])
+        if other[n] >= 0 and (best < 0 or gn + int(other[n]) < best):
+            best, meet = gn + int(other[n]), n
+        for v in (n + 1, n - 1, n + W, n - W):
+            if blocked[v] or cs[v]:
+                continue
+            if gs[v] < 0 or gn + 1 < gs[v]:
+                gs[v] = gn + 1
+                ps[v] = n
+                heapq.heappush(heaps[side], (gn + 1 + _manhattan(W, v, target[side])) * N + v)
+                if other[v] >= 0 and (best < 0 or gn + 1 + int(other[v]) < best):
+                    best, meet = gn + 1 + int(other[v]), v
+    if meet < 0:
+        return None
+    return _trace(parent[0], meet) + _trace(parent[1], meet)[::-1][1:]
+
+
+def astar(grid: Grid, start: Tuple[int, int], goal: Tuple[int, int], jps: bool = True, bidirectional: bool = False) -> Optional[Path]:
+    """Shortest 4-connected path from ``start`` to ``goal`` as (x, y) cells, or None.
+
+    Runs on a flat padded array with integer node ids. ``jps`` (default) uses jump point
+    search, which only expands turning points on open floor; ``bidirectional`` runs A* from
+    both ends instead. Every variant returns an optimal path listing each cell.
+    """
+    ras = _Raster(grid)
+    s, t = ras.node(start), ras.node(goal)
+    if s == t:
+        return [start]
+    if ras.blocked[t]:
+        return None
+    if bidirectional:
+        nodes = _bidirectional(ras, s, t)
+    else:
+        nodes = _jps(ras, s, t) if jps else _plain(ras, s, t)
+    return _unroll(ras, nodes) if nodes else None
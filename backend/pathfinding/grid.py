@@ -0,0 +1,246 @@
+from __future__ import annotations
+
+import heapq
+import math
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from backend.models.scene import WALL_GAP, FixtureType, Floor, OpeningType, Space
+
+# Cells along the longer building side; bounds the grid to GRID_CELLS^2 cells for any plan size
+GRID_CELLS = 48
+_SQRT2 = math.sqrt(2.0)
+INF = float("inf")
+
+
+@dataclass
+class OccupancyGrid:
+    """Floor rasterized on a square grid; cells are flat integer ids (row * cols + col).
+
+    ``owner`` holds the index of the space covering each cell centre (-1 outside all spaces).
+    Walls block movement between cells of different spaces except at door ``portals``, or at
+    door ``bridges`` where the door crosses a wall gap between the two spaces.
+    """
+
+    cols: int
+    rows: int
+    cell: float
+    owner: List[int]
+    portals: Set[Tuple[int, int]] = field(default_factory=set)  # (a, b) and (b, a) per door cell pair
+    bridges: Dict[int, List[int]] = field(default_factory=dict)  # door cells across a wall gap
+    exterior_doors: Set[int] = field(default_factory=set)  # cells behind a door in the envelope
+    stairs: Set[int] = field(default_factory=set)
+    members: List[List[int]] = field(default_factory=list)  # cells per space index
+
+    def cell_of(self, x: float, y: float) -> Optional[int]:
+        c, r = int(x // self.cell), int(y // self.cell)
+        if 0 <= c < self.cols and 0 <= r < self.rows:
+            return r * self.cols + c
+        return None
+
+    def cells_of(self, idx: int) -> List[int]:
+        return self.members[idx] if 0 <= idx < len(self.members) else []
+
+
+def _span(lo: float, hi: float, cell: float, n: int) -> range:
+    # indices whose cell centre lies in [lo, hi)
+    return range(max(0, math.ceil(lo / cell - 0.5)), min(n, math.ceil(hi / cell - 0.5)))
+
+
+def rasterize(spaces: List[Space], width: float, height: float, cells: int = GRID_CELLS) -> OccupancyGrid:
+    """Rasterize spaces (first space wins on overlap), their doors and stair fixtures."""
+    cell = max(width, height) / cells
+    cols, rows = max(1, math.ceil(width / cell)), max(1, math.ceil(height / cell))
+    owner = [-1] * (cols * rows)
+    members: List[List[int]] = []
+    for k, sp in enumerate(spaces):
+        x0, y0, x1, y1 = sp.rect.bbox()
+        xs = _span(x0, x1, cell, cols)
+        mine: List[int] = []
+        for r in _span(y0, y1, cell, rows):
+            base = r * cols
+            for c in xs:
+                if owner[base + c] < 0:
+                    owner[base + c] = k
+                    mine.append(base + c)
+        members.append(mine)
+    grid = OccupancyGrid(cols=cols, rows=rows, cell=cell, owner=owner, members=members)
+    for sp in spaces:
+        x0, y0, x1, y1 = sp.rect.bbox()
+        for op in sp.openings:
+            if op.opening_type != OpeningType.DOOR:
+                continue
+            p, half = op.at, op.w / 2.0
+            if abs(p.x - x0) < 1e-6 or abs(p.x - x1) < 1e-6:
+                # door in a vertical wall: cross along x
+                lanes = _span(p.y - half, p.y + half, cell, rows) or [min(rows - 1, int(p.y // cell))]
+                pairs = [((p.x - cell / 2, (r + 0.5) * cell), (p.x + cell / 2, (r + 0.5) * cell)) for r in lanes]
+                step = (WALL_GAP, 0.0)
+            elif abs(p.y - y0) < 1e-6 or abs(p.y - y1) < 1e-6:
+                lanes = _span(p.x - half, p.x + half, cell, cols) or [min(cols - 1, int(p.x // cell))]
+                pairs = [(((c + 0.5) * cell, p.y - cell / 2), ((c + 0.5) * cell, p.y + cell / 2)) for c in lanes]
+                step = (0.0, WALL_GAP)
+            else:
+                continue
+            for (ax, ay), (bx, by) in pairs:
+                a, b = grid.cell_of(ax, ay), grid.cell_of(bx, by)
+                # a gap cell between two rooms is wall, not outside: look across it
+                if a is not None and owner[a] < 0:
+                    a = grid.cell_of(ax - step[0], ay - step[1])
+                if b is not None and owner[b] < 0:
+                    b = grid.cell_of(bx + step[0], by + step[1])
+                oa = owner[a] if a is not None else -1
+                ob = owner[b] if b is not None else -1
+                if oa >= 0 and ob >= 0:
+                    if oa == ob:
+                        continue
+                    if abs(a - b) in (1, cols):
+                        grid.portals.add((a, b))
+                        grid.portals.add((b, a))
+                    else:
+                        grid.bridges.setdefault(a, []).append(b)
+                        grid.bridges.setdefault(b, []).append(a)
+                elif oa >= 0 or ob >= 0:
+                    grid.exterior_doors.add(a if oa >= 0 else b)
+        for fx in sp.fixtures:
+            if fx.fixture_type == FixtureType.STAIRS:
+                c = grid.cell_of(fx.at.x, fx.at.y)
+                if c is not None and owner[c] >= 0:
+                    grid.stairs.add(c)
+    return grid
+
+
+def envelope_cells(grid: OccupancyGrid) -> Set[int]:
+    """Occupied cells with nothing between them and the outside along a row or column."""
+    out: Set[int] = set()
+    cols, rows, owner = grid.cols, grid.rows, grid.owner
+    for r in range(rows):
+        row = [r * cols + c for c in range(cols) if owner[r * cols + c] >= 0]
+        if row:
+            out.add(row[0])
+            out.add(row[-1])
+    for c in range(cols):
+        col = [r * cols + c for r in range(rows) if owner[r * cols + c] >= 0]
+        if col:
+            out.add(col[0])
+            out.add(col[-1])
+    return out
+
+
+def distance_field(grid: OccupancyGrid, sources: Iterable[int]) -> List[float]:
+    """Multi-source Dijkstra from ``sources``; travel distance in plan units for every cell.
+
+    8-connected inside a space (no corner cutting), 4-connected through door portals; a bridge
+    across a wall gap costs its length in cells.
+    Cells unreachable from every source stay ``INF``.
+    """
+    cols, rows, owner, portals, bridges = grid.cols, grid.rows, grid.owner, grid.portals, grid.bridges
+    n = cols * rows
+    dist = [INF] * n
+    heap: List[Tuple[float, int]] = []
+    for s in sources:
+        if owner[s] >= 0 and dist[s] > 0.0:
+            dist[s] = 0.0
+            heap.append((0.0, s))
+    heapq.heapify(heap)
+    pop, push = heapq.heappop, heapq.heappush
+    last = cols - 1
+    while heap:
+        d, u = pop(heap)
+        if d > dist[u]:
+            continue
+        c = u % cols
+        o = owner[u]
+        left = u - 1 if c > 0 else -1
+        right = u + 1 if c < last else -1
+        up = u - cols if u >= cols else -1
+        down = u + cols if u + cols < n else -1
+        d1 = d + 1.0
+        for v in (left, right, up, down):
+            if v >= 0 and d1 < dist[v] and (owner[v] == o or (u, v) in portals):
+                dist[v] = d1
+                push(heap, (d1, v))
+        # diagonals stay inside the space and never cut a corner
+        d2 = d + _SQRT2
+        for a, b in ((left, up), (left, down), (right, up), (right, down)):
+            if a >= 0 and b >= 0 and owner[a] == o and owner[b] == o:
+                v = a + b - u
+                if d2 < dist[v] and owner[v] == o:
+                    dist[v] = d2
+                    push(heap, (d2, v))
+        for v in bridges.get(u, ()):
+            r, c2 = divmod(v, cols)
+            db = d + abs(r - u // cols) + abs(c2 - c)
+            if db < dist[v]:
+                dist[v] = db
+                push(heap, (db, v))
+    cell = grid.cell
+    return [x * cell for x in dist]
+
+
+@dataclass
+class EgressField:
+    """Distance-to-exit field of one floor, shared by all egress checks of a plan run."""
+
+    grid: OccupancyGrid
+    dist: List[float]
+    exits: Set[int]
+    index: Dict[str, int] = field(default_factory=dict)  # space id -> space index on the grid
+
+    def travel(self, idx: int) -> float:
+        """Longest travel distance from any point of space ``idx`` to the nearest exit."""
+        cells = self.grid.cells_of(idx)
+        return max((self.dist[i] for i in cells), default=0.0)
+
+    def dead_end(self, idx: int) -> float:
+        """Longest dead end of corridor space ``idx``: length from a corridor end over which
+        the distance to an exit only decreases, i.e. there is a single direction of travel.
+        """
+        g = self.grid
+        cells = g.cells_of(idx)
+        if not cells:
+            return 0.0
+        rs = [i // g.cols for i in cells]
+        cs = [i % g.cols for i in cells]
+        along_x = (max(cs) - min(cs)) >= (max(rs) - min(rs))
+        # centreline profile: nearest-exit distance per slice across the corridor
+        profile: Dict[int, float] = {}
+        for i, r, c in zip(cells, rs, cs):
+            k = c if along_x else r
+            profile[k] = min(profile.get(k, INF), self.dist[i])
+        line = [profile[k] for k in sorted(profile)]
+        if any(d == INF for d in line):
+            return 0.0  # unreachable corridor; reported as travel distance instead
+        longest = 0
+        for seq in (line, line[::-1]):
+            n = 0
+            while n + 1 < len(seq) and seq[n + 1] < seq[n]:
+                n += 1
+            longest = max(longest, n)
+        return longest * g.cell
+
+
+EXIT_ROOMS = ("living", "entry", "foyer", "hall")
+
+
+def egress_field(floor: Floor, width: float, height: float, upper: bool = False) -> EgressField:
+    """Rasterize ``floor`` and run one multi-source search from all of its exits.
+
+    Exits are doors in the envelope; on upper floors, stairs. Scenes without modelled
+    exterior doors assume the entrance on the envelope side of the entry rooms
+    (``EXIT_ROOMS``; the corridor if none of them reaches the envelope).
+    """
+    spaces = floor.spaces
+    grid = rasterize(spaces, width, height)
+    exits: Set[int] = set(grid.exterior_doors)
+    if upper:
+        exits |= grid.stairs
+    if not exits:
+        envelope = envelope_cells(grid)
+        for prefixes in (EXIT_ROOMS, ("corridor",)):
+            ids = {k for k, sp in enumerate(spaces) if sp.name.lower().startswith(prefixes)}
+            exits = {i for i in envelope if grid.owner[i] in ids}
+            if exits:
+                break
+    index = {sp.id: k for k, sp in enumerate(spaces)}
+    return EgressField(grid=grid, dist=distance_field(grid, exits), exits=exits, index=index)
@@ -40,9 +40,7 @@ def _distance(sig_a: Dict[str, int], sig_b: Dict[str, int]) -> int:
     return sum(abs(sig_a.get(k, 0) - sig_b.get(k, 0)) for k in keys)
 
 
-def retrieve_seed(brief: Brief | dict) -> Optional[LayoutResult]:
-    if not isinstance(brief, Brief):
-        brief = Brief(**brief)
+def retrieve_seed(brief: Brief) -> Optional[LayoutResult]:
     if not brief.rooms:
         return None
 
@@ -1,9 +1,13 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Any, Dict, List, Optional
+from dataclasses import dataclass, field
+from time import perf_counter
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple
 
-from backend.models.scene import Building, Space
+from backend.models.graphs import _rects_touch_or_overlap
+from backend.models.scene import Building, Floor, Space
+from backend.pathfinding.grid import INF, EgressField, egress_field
+from backend.rules.profiling import profiler
 
 
 @dataclass
@@ -24,156 +28,499 @@ def _is_habitable(sp: Space) -> bool:
     return n.startswith("bed") or n.startswith("living") or n.startswith("kitchen")
 
 
-def evaluate_rule(rule: Dict[str, Any], building: Building) -> List[RuleViolation]:
-    out: List[RuleViolation] = []
+def _overlap_len(a0: float, a1: float, b0: float, b1: float) -> float:
+    return max(0, min(a1, b1) - max(a0, b0))
+
+
+# ----- Compiled evaluation plan -----
+# Space classes route per-space checks so a space only visits the checks that can apply to it.
+ANY = "any"
+CORRIDOR = "corridor"  # exact name match (corridor width rule)
+BEDROOM = "bedroom"
+HABITABLE = "habitable"
+PRIVATE = "private"
+LIVING = "living"
+
+
+def _space_classes(n: str) -> Tuple[str, ...]:
+    out = [ANY]
+    if n == "corridor":
+        out.append(CORRIDOR)
+    if n.startswith("bed"):
+        out.append(BEDROOM)
+    if n.startswith("bed") or n.startswith("living") or n.startswith("kitchen"):
+        out.append(HABITABLE)
+    if n.startswith("bed") or n.startswith("bath"):
+        out.append(PRIVATE)
+    if n.startswith("living"):
+        out.append(LIVING)
+    return tuple(out)
+
+
+@dataclass
+class FloorFacts:
+    """Facts shared by all checks while walking one floor; computed once per plan run."""
+
+    building: Building
+    floor: Floor
+    corridor: Optional[Space] = None  # first corridor* space of the building
+    isolated: Set[str] = field(default_factory=set)  # ids of spaces without any adjacency
+    windows: int = 0  # window count of the space currently visited
+    egress: Optional[EgressField] = None  # distance-to-exit field of the floor
+
+
+SpaceCheck = Callable[[Space, FloorFacts], Optional[RuleViolation]]
+
+
+# Shared facts a check may read, and their cost tier. Tier 0/1 checks only look at room
+# rectangles and names; windows and doors only exist on the full scene (see from_brief_and_layout).
+FACT_COST: Dict[str, int] = {"": 0, "corridor": 0, "adjacency": 1, "windows": 2, "egress": 3}
+SCENE_COST = 2
+
+
+@dataclass
+class CompiledCheck:
+    rule_id: str
+    space_class: str
+    check: SpaceCheck
+    severity: str = "warn"
+    needs: str = ""  # shared fact read by the check: "", "corridor", "adjacency", "windows" or "egress"
+    slot: int = 0  # output position; keeps violations in catalog order
+
+    @property
+    def cost(self) -> int:
+        return FACT_COST.get(self.needs, SCENE_COST)
+
+
+def _check_corridor_width(rule: Dict[str, Any]) -> Tuple[str, SpaceCheck]:
     r_id = rule.get("id", "rule")
     title = rule.get("title", r_id)
     severity = rule.get("severity", "warn")
-    kind = rule.get("kind")
-
-    # Corridor width check
-    if kind == "min_corridor_width":
-        min_w = float(rule.get("min", 900))
-        for f in building.floors:
-            for sp in f.spaces:
-                if sp.name.lower() == "corridor":
-                    cw = min(sp.rect.w, sp.rect.h)
-                    if cw < min_w:
-                        out.append(
-                            RuleViolation(
-                                id=r_id,
-                                title=title,
-                                severity=severity,
-                                where=f"floor@{f.elevation}:corridor",
-                                suggestion=f"Increase corridor width to at least {int(min_w)} mm (current {int(cw)}).",
-                            )
-                        )
-    # Bedroom egress window (at least one window opening)
-    elif kind == "bedroom_egress_window":
-        for f in building.floors:
-            for sp in f.spaces:
-                if _is_bedroom(sp):
-                    wins = [op for op in sp.openings if op.opening_type.name == "WINDOW"]
-                    if len(wins) == 0:
-                        out.append(
-                            RuleViolation(
-                                id=r_id,
-                                title=title,
-                                severity=severity,
-                                where=f"room:{sp.name}",
-                                suggestion="Add at least one operable window meeting egress dimensions.",
-                            )
-                        )
-    # Habitable daylight (at least one window)
-    elif kind == "habitable_daylight_window":
-        for f in building.floors:
-            for sp in f.spaces:
-                if _is_habitable(sp):
-                    wins = [op for op in sp.openings if op.opening_type.name == "WINDOW"]
-                    if len(wins) == 0:
-                        out.append(
-                            RuleViolation(
-                                id=r_id,
-                                title=title,
-                                severity=severity,
-                                where=f"room:{sp.name}",
-                                suggestion="Provide at least one window for daylight/ventilation in habitable room.",
-                            )
-                        )
-    # Min room area
-    elif kind == "min_room_area":
-        min_area = float(rule.get("min", 70000))
-        selector = rule.get("selector", "bedroom")
-        for f in building.floors:
-            for sp in f.spaces:
-                cond = _is_bedroom(sp) if selector == "bedroom" else True
-                if cond:
-                    area = sp.rect.w * sp.rect.h
-                    if area < min_area:
-                        out.append(
-                            RuleViolation(
-                                id=r_id,
-                                title=title,
-                                severity=severity,
-                                where=f"room:{sp.name}",
-                                suggestion=f"Increase area to at least {int(min_area)} mm^2 (current {int(area)}).",
-                            )
-                        )
-    return out
+    min_w = float(rule.get("min", 900))
 
+    def check(sp: Space, facts: FloorFacts) -> Optional[RuleViolation]:
+        cw = min(sp.rect.w, sp.rect.h)
+        if cw < min_w:
+            return RuleViolation(
+                id=r_id,
+                title=title,
+                severity=severity,
+                where=f"floor@{facts.floor.elevation}:corridor",
+                suggestion=f"Increase corridor width to at least {int(min_w)} mm (current {int(cw)}).",
+            )
+        return None
 
-def evaluate_rules(rules: List[Dict[str, Any]], building: Building) -> List[RuleViolation]:
-    violations: List[RuleViolation] = []
-    for r in rules:
-        violations.extend(evaluate_rule(r, building))
-    # Connectivity rule (implicit): if specified via kind
-    if any(r.get("kind") == "connected_rooms" for r in rules):
-        # Build adjacency by shared edges/overlap
-        from backend.models.graphs import build_room_adjacency
-        for f in building.floors:
-            g = build_room_adjacency(f)
-            for sp in f.spaces:
-                if g.degree(sp.id) == 0:
-                    violations.append(
-                        RuleViolation(
-                            id="graph.connected",
-                            title="Room is isolated (no adjacency)",
-                            severity="warn",
-                            where=f"room:{sp.name}",
-                            suggestion="Snap or move room to share an edge with another room or corridor.",
-                        )
-                    )
-    # Corridor-private rules
-    if any(r.get("kind") == "private_rooms_to_corridor" for r in rules) or any(r.get("kind") == "corridor_touches_living" for r in rules):
-        corridor = None
-        for f in building.floors:
-            for sp in f.spaces:
-                if sp.name.lower().startswith("corridor"):
-                    corridor = sp
-                    break
-            if corridor:
+    return CORRIDOR, check
+
+
+def _check_bedroom_egress(rule: Dict[str, Any]) -> Tuple[str, SpaceCheck]:
+    r_id = rule.get("id", "rule")
+    title = rule.get("title", r_id)
+    severity = rule.get("severity", "warn")
+
+    def check(sp: Space, facts: FloorFacts) -> Optional[RuleViolation]:
+        if facts.windows == 0:
+            return RuleViolation(
+                id=r_id,
+                title=title,
+                severity=severity,
+                where=f"room:{sp.name}",
+                suggestion="Add at least one operable window meeting egress dimensions.",
+            )
+        return None
+
+    return BEDROOM, check
+
+
+def _check_habitable_daylight(rule: Dict[str, Any]) -> Tuple[str, SpaceCheck]:
+    r_id = rule.get("id", "rule")
+    title = rule.get("title", r_id)
+    severity = rule.get("severity", "warn")
+
+    def check(sp: Space, facts: FloorFacts) -> Optional[RuleViolation]:
+        if facts.windows == 0:
+            return RuleViolation(
+                id=r_id,
+                title=title,
+                severity=severity,
+                where=f"room:{sp.name}",
+                suggestion="Provide at least one window for daylight/ventilation in habitable room.",
+            )
+        return None
+
+    return HABITABLE, check
+
+
+def _check_min_room_area(rule: Dict[str, Any]) -> Tuple[str, SpaceCheck]:
+    r_id = rule.get("id", "rule")
+    title = rule.get("title", r_id)
+    severity = rule.get("severity", "warn")
+    min_area = float(rule.get("min", 70000))
+    selector = rule.get("selector", "bedroom")
+
+    def check(sp: Space, facts: FloorFacts) -> Optional[RuleViolation]:
+        area = sp.rect.w * sp.rect.h
+        if area < min_area:
+            return RuleViolation(
+                id=r_id,
+                title=title,
+                severity=severity,
+                where=f"room:{sp.name}",
+                suggestion=f"Increase area to at least {int(min_area)} mm^2 (current {int(area)}).",
+            )
+        return None
+
+    return (BEDROOM if selector == "bedroom" else ANY), check
+
+
+def _check_travel_distance(rule: Dict[str, Any]) -> Tuple[str, SpaceCheck]:
+    r_id = rule.get("id", "rule")
+    title = rule.get("title", r_id)
+    severity = rule.get("severity", "warn")
+    max_d = float(rule.get("max", 7600))
+
+    def check(sp: Space, facts: FloorFacts) -> Optional[RuleViolation]:
+        e = facts.egress
+        idx = e.index.get(sp.id, -1) if e is not None else -1
+        if idx < 0 or not e.grid.cells_of(idx):
+            return None  # hidden by an overlapping space or too small for the grid
+        d = e.travel(idx)
+        if d == INF:
+            suggestion = "No path to an exit; add a door towards the corridor or an exit room."
+        elif d > max_d:
+            suggestion = f"Reduce travel distance to an exit to at most {int(max_d)} mm (current {int(d)})."
+        else:
+            return None
+        return RuleViolation(id=r_id, title=title, severity=severity, where=f"room:{sp.name}", suggestion=suggestion)
+
+    return ANY, check
+
+
+def _check_dead_end(rule: Dict[str, Any]) -> Tuple[str, SpaceCheck]:
+    r_id = rule.get("id", "rule")
+    title = rule.get("title", r_id)
+    severity = rule.get("severity", "warn")
+    max_d = float(rule.get("max", 1500))
+
+    def check(sp: Space, facts: FloorFacts) -> Optional[RuleViolation]:
+        e = facts.egress
+        idx = e.index.get(sp.id, -1) if e is not None else -1
+        if idx < 0:
+            return None
+        d = e.dead_end(idx)
+        if d > max_d:
+            return RuleViolation(
+                id=r_id,
+                title=title,
+                severity=severity,
+                where=f"floor@{facts.floor.elevation}:corridor",
+                suggestion=f"Shorten dead-end corridor to at most {int(max_d)} mm (current {int(d)}) or add an exit at its end.",
+            )
+        return None
+
+    return CORRIDOR, check
+
+
+# kind -> factory(rule) -> (space class, predicate); WINDOW_KINDS read FloorFacts.windows,
+# EGRESS_KINDS read FloorFacts.egress
+SPACE_RULE_KINDS: Dict[str, Callable[[Dict[str, Any]], Tuple[str, SpaceCheck]]] = {
+    "min_corridor_width": _check_corridor_width,
+    "bedroom_egress_window": _check_bedroom_egress,
+    "habitable_daylight_window": _check_habitable_daylight,
+    "min_room_area": _check_min_room_area,
+    "max_travel_distance": _check_travel_distance,
+    "max_dead_end": _check_dead_end,
+}
+WINDOW_KINDS = {"bedroom_egress_window", "habitable_daylight_window"}
+EGRESS_KINDS = {"max_travel_distance", "max_dead_end"}
+CORRIDOR_KINDS = {"private_rooms_to_corridor", "corridor_touches_living"}
+
+
+def _check_connected(sp: Space, facts: FloorFacts) -> Optional[RuleViolation]:
+    if sp.id in facts.isolated:
+        return RuleViolation(
+            id="graph.connected",
+            title="Room is isolated (no adjacency)",
+            severity="warn",
+            where=f"room:{sp.name}",
+            suggestion="Snap or move room to share an edge with another room or corridor.",
+        )
+    return None
+
+
+def _check_private_touch(min_ov: float) -> SpaceCheck:
+    def check(sp: Space, facts: FloorFacts) -> Optional[RuleViolation]:
+        c = facts.corridor
+        if c is None:
+            return None
+        r = sp.rect
+        cr = c.rect
+        y_ov = _overlap_len(r.y, r.y + r.h, cr.y, cr.y + cr.h) >= min_ov
+        x_ov = _overlap_len(r.x, r.x + r.w, cr.x, cr.x + cr.w) >= min_ov
+        v1 = r.x + r.w == cr.x and y_ov
+        v2 = cr.x + cr.w == r.x and y_ov
+        v3 = r.y + r.h == cr.y and x_ov
+        v4 = cr.y + cr.h == r.y and x_ov
+        if not (v1 or v2 or v3 or v4):
+            return RuleViolation(
+                id="corridor.private.touch",
+                title="Private room not connected to corridor",
+                severity="error",
+                where=f"room:{sp.name}",
+                suggestion="Move room to share an edge with the corridor.",
+            )
+        return None
+
+    return check
+
+
+def _check_living_end(min_ov: float) -> SpaceCheck:
+    def check(sp: Space, facts: FloorFacts) -> Optional[RuleViolation]:
+        c = facts.corridor
+        if c is None:
+            return None
+        r = sp.rect
+        cr = c.rect
+        b = facts.building
+        y_ov = _overlap_len(r.y, r.y + r.h, cr.y, cr.y + cr.h) >= min_ov
+        x_ov = _overlap_len(r.x, r.x + r.w, cr.x, cr.x + cr.w) >= min_ov
+        left_end = r.x + r.w == cr.x and y_ov and r.x == 0
+        right_end = cr.x + cr.w == r.x and y_ov and cr.x + cr.w == b.width
+        top_end = r.y + r.h == cr.y and x_ov and r.y == 0
+        bottom_end = cr.y + cr.h == r.y and x_ov and cr.y + cr.h == b.height
+        if not (left_end or right_end or top_end or bottom_end):
+            return RuleViolation(
+                id="corridor.living.end",
+                title="Living should connect to corridor at an end",
+                severity="warn",
+                where=f"room:{sp.name}",
+                suggestion="Align living to one corridor end.",
+            )
+        return None
+
+    return check
+
+
+def _isolated_ids(floor: Floor, only: Optional[Set[str]] = None) -> Set[str]:
+    boxes = [sp.rect.bbox() for sp in floor.spaces]
+    if only is not None:
+        # O(k*n) for a subset of spaces (incremental re-validation)
+        out: Set[str] = set()
+        for i, sp in enumerate(floor.spaces):
+            if sp.id in only and not any(_rects_touch_or_overlap(boxes[i], b) for j, b in enumerate(boxes) if j != i):
+                out.add(sp.id)
+        return out
+    touched = [False] * len(boxes)
+    for i, a in enumerate(boxes):
+        for j in range(i + 1, len(boxes)):
+            if _rects_touch_or_overlap(a, boxes[j]):
+                touched[i] = True
+                touched[j] = True
+    return {sp.id for sp, t in zip(floor.spaces, touched) if not t}
+
+
+def find_corridor(building: Building) -> Optional[Space]:
+    for f in building.floors:
+        for sp in f.spaces:
+            if sp.name.lower().startswith("corridor"):
+                return sp
+    return None
+
+
+def _window_count(sp: Space) -> int:
+    return sum(1 for op in sp.openings if op.opening_type.name == "WINDOW")
+
+
+class _WalkTiming:
+    """Time spent per check and per shared fact during one profiled plan walk."""
+
+    def __init__(self) -> None:
+        self.checks: Dict[int, List[Any]] = {}  # id(check) -> [check, seconds, evals, violations]
+        self.facts: Dict[str, float] = {}
+
+    def fact(self, name: str, seconds: float) -> None:
+        self.facts[name] = self.facts.get(name, 0.0) + seconds
+
+    def timed(self, name: str, fn: Callable[..., Any], *args: Any) -> Any:
+        t0 = perf_counter()
+        result = fn(*args)
+        self.fact(name, perf_counter() - t0)
+        return result
+
+    def check(self, c: CompiledCheck, sp: Space, facts: FloorFacts) -> Optional[RuleViolation]:
+        t0 = perf_counter()
+        v = c.check(sp, facts)
+        seconds = perf_counter() - t0
+        st = self.checks.get(id(c))
+        if st is None:
+            st = self.checks[id(c)] = [c, 0.0, 0, 0]
+        st[1] += seconds
+        st[2] += 1
+        st[3] += v is not None
+        return v
+
+    def record(self) -> None:
+        # Only checks that ran: a walk stopped at the first error does not count the rest
+        for c, seconds, evals, violations in self.checks.values():
+            profiler.record(c.rule_id, seconds, evals=evals, violations=violations)
+        for name, seconds in self.facts.items():
+            profiler.record(name, seconds)
+
+
+class RulePlan:
+    """Execution plan compiled from a rule catalog.
+
+    Walks every space once and dispatches to the checks registered for its space classes.
+    Shared facts (corridor, adjacency, window counts, egress distances) are computed once per run and only if a
+    compiled check needs them. Violations are returned in catalog order.
+    """
+
+    def __init__(self, checks: List[CompiledCheck]) -> None:
+        self.checks = checks
+        self.slots = max((c.slot for c in checks), default=-1) + 1
+        self.needs_windows = any(c.needs == "windows" for c in checks)
+        self.needs_adjacency = any(c.needs == "adjacency" for c in checks)
+        self.needs_corridor = any(c.needs == "corridor" for c in checks)
+        self.needs_egress = any(c.needs == "egress" for c in checks)
+        self.by_class: Dict[str, List[CompiledCheck]] = {}
+        for c in checks:
+            self.by_class.setdefault(c.space_class, []).append(c)
+        self._class_cache: Dict[str, Tuple[List[CompiledCheck], ...]] = {}
+        self._tiers: Dict[bool, List[Tuple[int, RulePlan]]] = {}
+
+    def tiers(self, errors_only: bool = False) -> List[Tuple[int, RulePlan]]:
+        """Sub-plans grouped by cost tier, cheapest first (for fail-fast screening).
+        ``errors_only`` keeps only error-severity checks, the ones that can reject a candidate.
+        """
+        hit = self._tiers.get(errors_only)
+        if hit is None:
+            by_cost: Dict[int, List[CompiledCheck]] = {}
+            for c in self.checks:
+                if errors_only and c.severity != "error":
+                    continue
+                by_cost.setdefault(c.cost, []).append(c)
+            hit = self._tiers[errors_only] = [(cost, RulePlan(by_cost[cost])) for cost in sorted(by_cost)]
+        return hit
+
+    def _checks_for(self, name: str) -> Tuple[List[CompiledCheck], ...]:
+        n = name.lower()
+        hit = self._class_cache.get(n)
+        if hit is None:
+            hit = tuple(self.by_class[c] for c in _space_classes(n) if c in self.by_class)
+            self._class_cache[n] = hit
+        return hit
+
+    def _floor_facts(self, building: Building, fi: int, corridor: Optional[Space], only: Optional[Set[str]], cache: Dict[Tuple[Any, ...], Any], timing: Optional[_WalkTiming] = None) -> FloorFacts:
+        f = building.floors[fi]
+        facts = FloorFacts(building=building, floor=f, corridor=corridor)
+        if not (self.needs_adjacency or self.needs_egress):
+            return facts
+        # floors replicated from one template hold the same space objects; reuse their facts
+        key = tuple(id(sp) for sp in f.spaces)
+        if self.needs_adjacency:
+            t0 = perf_counter()
+            isolated = cache.get(("adjacency",) + key)
+            if isolated is None:
+                isolated = cache[("adjacency",) + key] = _isolated_ids(f, only)
+            facts.isolated = isolated
+            if timing is not None:
+                timing.fact("facts.adjacency", perf_counter() - t0)
+        if self.needs_egress:
+            t0 = perf_counter()
+            ekey = ("egress", fi > 0) + key  # upper floors exit by the stairs
+            field_ = cache.get(ekey)
+            if field_ is None:
+                field_ = cache[ekey] = egress_field(f, building.width, building.height, upper=fi > 0)
+            facts.egress = field_
+            if timing is not None:
+                timing.fact("facts.egress", perf_counter() - t0)
+        return facts
+
+    def run(self, building: Building, only: Optional[Set[str]] = None) -> Iterator[Tuple[CompiledCheck, int, Space, RuleViolation]]:
+        """Yield (check, floor index, space, violation) in walk order.
+        ``only`` restricts the walk to the given space ids (shared facts still see every space).
+        With the profiler on, the walk is timed and recorded even if it stops early.
+        """
+        if not self.checks:
+            return
+        timing = _WalkTiming() if profiler.enabled else None
+        try:
+            corridor = None
+            if self.needs_corridor:
+                corridor = find_corridor(building) if timing is None else timing.timed("facts.corridor", find_corridor, building)
+            cache: Dict[Tuple[Any, ...], Any] = {}
+            for fi, f in enumerate(building.floors):
+                facts = self._floor_facts(building, fi, corridor, only, cache, timing)
+                for sp in f.spaces:
+                    if only is not None and sp.id not in only:
+                        continue
+                    groups = self._checks_for(sp.name)
+                    if not groups:
+                        continue
+                    if self.needs_windows:
+                        facts.windows = _window_count(sp) if timing is None else timing.timed("facts.windows", _window_count, sp)
+                    for group in groups:
+                        for c in group:
+                            v = c.check(sp, facts) if timing is None else timing.check(c, sp, facts)
+                            if v is not None:
+                                yield c, fi, sp, v
+        finally:
+            if timing is not None:
+                timing.record()
+
+    def evaluate(self, building: Building, stop_on_error: bool = False) -> List[RuleViolation]:
+        """Run the plan; with ``stop_on_error`` return as soon as an error-severity violation is found."""
+        buckets: List[List[RuleViolation]] = [[] for _ in range(self.slots)]
+        for c, _, _, v in self.run(building):
+            buckets[c.slot].append(v)
+            if stop_on_error and v.severity == "error":
                 break
-        if corridor:
+        return [v for b in buckets for v in b]
+
+
+def compile_rules(rules: List[Dict[str, Any]], implicit: bool = True) -> RulePlan:
+    """Compile a rule catalog into a single-pass RulePlan.
+    ``implicit`` adds the catalog-wide sections (connectivity, corridor-private/living).
+    """
+    checks: List[CompiledCheck] = []
+    for r in rules:
+        kind = r.get("kind")
+        factory = SPACE_RULE_KINDS.get(kind)
+        if factory is None:
+            continue
+        space_class, fn = factory(r)
+        checks.append(
+            CompiledCheck(
+                rule_id=r.get("id", "rule"),
+                space_class=space_class,
+                check=fn,
+                severity=r.get("severity", "warn"),
+                needs="windows" if kind in WINDOW_KINDS else "egress" if kind in EGRESS_KINDS else "",
+            )
+        )
+    if implicit:
+        # Connectivity rule (implicit): if specified via kind
+        if any(r.get("kind") == "connected_rooms" for r in rules):
+            checks.append(CompiledCheck(rule_id="graph.connected", space_class=ANY, check=_check_connected, needs="adjacency"))
+        # Corridor-private rules
+        if any(r.get("kind") in CORRIDOR_KINDS for r in rules):
             min_ov = 50
             for r in rules:
-                if r.get("kind") in ("private_rooms_to_corridor", "corridor_touches_living") and r.get("min_overlap"):
+                if r.get("kind") in CORRIDOR_KINDS and r.get("min_overlap"):
                     try:
                         min_ov = int(r.get("min_overlap"))
                     except Exception:
                         pass
-            def overlap_len(a0,a1,b0,b1):
-                return max(0, min(a1,b1) - max(a0,b0))
-            # private rooms must share corridor edge with overlap
-            for f in building.floors:
-                for sp in f.spaces:
-                    n = sp.name.lower()
-                    if n.startswith("bed") or n.startswith("bath"):
-                        v1 = (sp.rect.x + sp.rect.w == corridor.rect.x and overlap_len(sp.rect.y, sp.rect.y+sp.rect.h, corridor.rect.y, corridor.rect.y+corridor.rect.h) >= min_ov)
-                        v2 = (corridor.rect.x + corridor.rect.w == sp.rect.x and overlap_len(sp.rect.y, sp.rect.y+sp.rect.h, corridor.rect.y, corridor.rect.y+corridor.rect.h) >= min_ov)
-                        v3 = (sp.rect.y + sp.rect.h == corridor.rect.y and overlap_len(sp.rect.x, sp.rect.x+sp.rect.w, corridor.rect.x, corridor.rect.x+corridor.rect.w) >= min_ov)
-                        v4 = (corridor.rect.y + corridor.rect.h == sp.rect.y and overlap_len(sp.rect.x, sp.rect.x+sp.rect.w, corridor.rect.x, corridor.rect.x+corridor.rect.w) >= min_ov)
-                        if not (v1 or v2 or v3 or v4):
-                            violations.append(RuleViolation(
-                                id="corridor.private.touch",
-                                title="Private room not connected to corridor",
-                                severity="error",
-                                where=f"room:{sp.name}",
-                                suggestion="Move room to share an edge with the corridor.",
-                            ))
-            # living should touch an end of corridor
-            for f in building.floors:
-                for sp in f.spaces:
-                    if sp.name.lower().startswith("living"):
-                        left_end = (sp.rect.x + sp.rect.w == corridor.rect.x and overlap_len(sp.rect.y, sp.rect.y+sp.rect.h, corridor.rect.y, corridor.rect.y+corridor.rect.h) >= min_ov and sp.rect.x==0)
-                        right_end = (corridor.rect.x + corridor.rect.w == sp.rect.x and overlap_len(sp.rect.y, sp.rect.y+sp.rect.h, corridor.rect.y, corridor.rect.y+corridor.rect.h) >= min_ov and corridor.rect.x+corridor.rect.w==building.width)
-                        top_end = (sp.rect.y + sp.rect.h == corridor.rect.y and overlap_len(sp.rect.x, sp.rect.x+sp.rect.w, corridor.rect.x, corridor.rect.x+corridor.rect.w) >= min_ov and sp.rect.y==0)
-                        bottom_end = (corridor.rect.y + corridor.rect.h == sp.rect.y and overlap_len(sp.rect.x, sp.rect.x+sp.rect.w, corridor.rect.x, corridor.rect.x+corridor.rect.w) >= min_ov and corridor.rect.y+corridor.rect.h==building.height)
-                        if not (left_end or right_end or top_end or bottom_end):
-                            violations.append(RuleViolation(
-                                id="corridor.living.end",
-                                title="Living should connect to corridor at an end",
-                                severity="warn",
-                                where=f"room:{sp.name}",
-                                suggestion="Align living to one corridor end.",
-                            ))
-    return violations
+            checks.append(CompiledCheck(rule_id="corridor.private.touch", space_class=PRIVATE, check=_check_private_touch(min_ov), severity="error", needs="corridor"))
+            checks.append(CompiledCheck(rule_id="corridor.living.end", space_class=LIVING, check=_check_living_end(min_ov), needs="corridor"))
+    for slot, c in enumerate(checks):
+        c.slot = slot
+    return RulePlan(checks)
+
+
+def evaluate_rule(rule: Dict[str, Any], building: Building) -> List[RuleViolation]:
+    return compile_rules([rule], implicit=False).evaluate(building)
+
+
+def evaluate_rules(rules: List[Dict[str, Any]], building: Building) -> List[RuleViolation]:
+    return compile_rules(rules).evaluate(building)
@@ -1,61 +1,104 @@
+from dataclasses import dataclass, field
 from typing import Dict, Any, List
 from backend.models.schema import Brief, LayoutResult, PlacedRoom
-from backend.models.scene import from_brief_and_layout
-from backend.rules.dsl import evaluate_rules, RuleViolation
-from backend.rules.loader import load_rules
+from backend.models.scene import from_brief_and_layout, geometry_view
+from backend.rules.dsl import RuleViolation, SCENE_COST
+from backend.rules.registry import RuleRegistry, RuleSet, default_registry
+
+
+def format_violation(v: RuleViolation) -> str:
+    return f"[{v.severity}] {v.id}: {v.title} @ {v.where} — {v.suggestion}"
+
+
+def dimension_violations(r: PlacedRoom) -> List[str]:
+    if r.w <= 0 or r.h <= 0:
+        return [f"{r.name}: non-positive dimensions {r.w}x{r.h}"]
+    return []
+
+
+def area_violations(r: PlacedRoom, bounds: tuple | None) -> List[str]:
+    if bounds is None:
+        return []
+    out: List[str] = []
+    mn, mx = bounds
+    area = r.w * r.h
+    if mn is not None and area < mn:
+        out.append(f"{r.name}: area {area} below min {mn}")
+    if mx is not None and area > mx:
+        out.append(f"{r.name}: area {area} above max {mx}")
+    return out
+
+
+def area_bounds(brief: Brief) -> Dict[str, tuple]:
+    return {c.name: (c.min_area, c.max_area) for c in (brief.hard.room_areas if brief.hard else [])}
+
+
+@dataclass
+class ScreenResult:
+    passed: bool
+    violations: List[RuleViolation] = field(default_factory=list)
 
 
 class RulesEngine:
     """Validate hard constraints and declarative scene rules."""
 
-    def early_prune(self, brief: Dict[str, Any] | Brief) -> Brief:
-        """Adjust incoming brief to meet absolute minimums (e.g., corridor width, min dims)."""
-        if not isinstance(brief, Brief):
-            brief = Brief(**brief)
-        # Ensure room min dims are at least 1 unit and sensible
-        for r in brief.rooms:
-            r.min_w = max(1, r.min_w)
-            r.min_h = max(1, r.min_h)
-        return brief
-
-    def check(self, layout: Dict[str, Any], brief: Dict[str, Any] | Brief | None = None, rule_paths: List[str] | None = None) -> Dict[str, Any]:
-        # Accept both dict and LayoutResult
-        if isinstance(layout, LayoutResult):
-            rooms = layout.rooms
-            dropped = layout.dropped
-            layout_obj = layout
-        else:
-            data = LayoutResult(**layout)
-            rooms = data.rooms
-            dropped = data.dropped
-            layout_obj = data
+    def __init__(self, registry: RuleRegistry | None = None) -> None:
+        self.registry = registry or default_registry
+
+    def rule_set(self, rule_paths: List[str] | None = None) -> RuleSet:
+        """Compiled rules for ``rule_paths`` (cached; reloaded when the files change)."""
+        return self.registry.get(rule_paths)
+
+    def early_prune(self, brief: Brief) -> Brief:
+        """Copy of the incoming brief adjusted to absolute minimums (e.g., corridor width, min dims)."""
+        # Ensure room min dims are at least 1 unit and sensible; the caller's brief is not edited
+        rooms = [r.model_copy(update={"min_w": max(1, r.min_w), "min_h": max(1, r.min_h)}) for r in brief.rooms]
+        return brief.model_copy(update={"rooms": rooms})
+
+    def check(self, layout: LayoutResult, brief: Brief | None = None, rule_paths: List[str] | None = None) -> Dict[str, Any]:
+        rooms = layout.rooms
+        dropped = layout.dropped
 
         violations: List[str] = []
 
         for r in rooms:
-            if r.w <= 0 or r.h <= 0:
-                violations.append(f"{r.name}: non-positive dimensions {r.w}x{r.h}")
+            violations.extend(dimension_violations(r))
 
         for name in dropped:
             violations.append(f"{name}: could not be placed within envelope")
 
         if brief is not None:
-            if not isinstance(brief, Brief):
-                brief = Brief(**brief)
-            area_bounds = {c.name: (c.min_area, c.max_area) for c in (brief.hard.room_areas if brief.hard else [])}
+            bounds = area_bounds(brief)
             for r in rooms:
-                if r.name in area_bounds:
-                    mn, mx = area_bounds[r.name]
-                    area = r.w * r.h
-                    if mn is not None and area < mn:
-                        violations.append(f"{r.name}: area {area} below min {mn}")
-                    if mx is not None and area > mx:
-                        violations.append(f"{r.name}: area {area} above max {mx}")
+                violations.extend(area_violations(r, bounds.get(r.name)))
             # Scene-level declarative rules
-            building = from_brief_and_layout(brief, layout_obj)
-            rules = load_rules(rule_paths)
-            scene_violations: List[RuleViolation] = evaluate_rules(rules, building)
-            for v in scene_violations:
-                violations.append(f"[{v.severity}] {v.id}: {v.title} @ {v.where} — {v.suggestion}")
+            building = from_brief_and_layout(brief, layout)
+            scene_violations: List[RuleViolation] = self.rule_set(rule_paths).plan.evaluate(building)
+            violations.extend(format_violation(v) for v in scene_violations)
 
         return {"compliant": len(violations) == 0, "violations": violations}
+
+    def screen(self, layout: LayoutResult, brief: Brief, rule_paths: List[str] | None = None, fail_fast: bool = True) -> ScreenResult:
+        """Screen a candidate against the declarative rules, cheapest rules first.
+
+        Geometry-only rules run on a rectangles-only view; the full scene is built only if
+        rules that need openings remain. With ``fail_fast`` only error-severity rules run and
+        screening stops at the first error, so rejected candidates skip everything else.
+        Hard layout checks (dimensions, dropped rooms, area bounds) are not screened; they
+        never reject a candidate. Violations come back structured, grouped by cost tier.
+        """
+        plan = self.rule_set(rule_paths).plan
+        violations: List[RuleViolation] = []
+        view = None
+        full = False
+        for cost, tier in plan.tiers(errors_only=fail_fast):
+            if cost >= SCENE_COST and not full:
+                view = from_brief_and_layout(brief, layout)
+                full = True
+            elif view is None:
+                view = geometry_view(brief, layout)
+            found = tier.evaluate(view, stop_on_error=fail_fast)
+            violations.extend(found)
+            if fail_fast and any(v.severity == "error" for v in found):
+                return ScreenResult(passed=False, violations=violations)
+        return ScreenResult(passed=not any(v.severity == "error" for v in violations), violations=violations)
@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+from collections import Counter
+from typing import Dict, List, Set, Tuple
+
+from backend.models.graphs import _rects_touch_or_overlap
+from backend.models.scene import Building, Floor, Space, room_space
+from backend.models.schema import Brief, LayoutResult, PlacedRoom, ValidationDelta, ValidationReport
+from backend.rules.dsl import find_corridor
+from backend.rules.engine import RulesEngine, area_bounds, area_violations, dimension_violations, format_violation
+
+
+def _geom(r: PlacedRoom) -> Tuple[int, int, int, int]:
+    return (r.x, r.y, r.w, r.h)
+
+
+def _box(r: PlacedRoom) -> Tuple[float, float, float, float]:
+    return (r.x, r.y, r.x + r.w, r.y + r.h)
+
+
+class ValidationState:
+    """Dependency-tracked validation of one layout, for interactive edits.
+
+    Every room keeps the violations of the rules evaluated on it and the set of rooms those
+    results depend on (itself, its touching neighbours for connectivity, the corridor for the
+    corridor rules). ``update`` re-runs only the rules of rooms that moved or resized and of
+    the rooms depending on them, and returns the violation delta. ``report`` matches
+    ``RulesEngine.check`` for the current layout.
+    """
+
+    def __init__(self, brief: Brief, layout: LayoutResult, engine: RulesEngine | None = None, rule_paths: List[str] | None = None) -> None:
+        self.brief = brief
+        self.engine = engine or RulesEngine()
+        self.rule_paths = rule_paths
+        self._bounds = area_bounds(brief)
+        self._load(layout)
+
+    # ----- full (re)build -----
+    def _load(self, layout: LayoutResult) -> None:
+        rule_set = self.engine.rule_set(self.rule_paths)
+        self.version = rule_set.version
+        self.plan = rule_set.plan
+        self.layout = layout.model_copy(deep=True)
+        self.names = [r.name for r in self.layout.rooms]
+        self.unique = len(set(self.names)) == len(self.names)
+        self.rooms: Dict[str, PlacedRoom] = {r.name: r for r in self.layout.rooms}
+        self.order = {n: i for i, n in enumerate(self.names)}
+        self._full: List[str] | None = None
+        if not self.unique or self.plan.needs_egress:
+            # Rooms are tracked by name, so duplicate names fall back to full validation; so do
+            # egress rules, which read doors of the full scene and depend on every room
+            self._full = self.engine.check(self.layout, self.brief, self.rule_paths)["violations"]
+            return
+        W, H = self.brief.building_w, self.brief.building_h
+        spaces = [room_space(r, W, H) for r in self.layout.rooms]
+        self.spaces: Dict[str, Space] = {sp.name: sp for sp in spaces}
+        floors = max(1, self.brief.building_floors)
+        self.building = Building(width=W, height=H, floors=[Floor(elevation=i * 3000.0, spaces=spaces) for i in range(floors)])
+        corridor = find_corridor(self.building)
+        self.corridor = corridor.name if corridor is not None else None
+        self.neighbours: Dict[str, Set[str]] = {}
+        if self.plan.needs_adjacency:
+            for n in self.names:
+                self.neighbours[n] = self._touching(n)
+        self.dims: Dict[str, List[str]] = {}
+        self.areas: Dict[str, List[str]] = {}
+        self.scene: Dict[str, List[Tuple[int, int, str]]] = {}
+        self.deps: Dict[str, Set[str]] = {}
+        self._evaluate(set(self.names))
+
+    def _touching(self, name: str, rooms: Dict[str, PlacedRoom] | None = None) -> Set[str]:
+        rooms = rooms if rooms is not None else self.rooms
+        box = _box(rooms[name])
+        return {m for m, r in rooms.items() if m != name and _rects_touch_or_overlap(box, _box(r))}
+
+    def _evaluate(self, names: Set[str]) -> None:
+        for n in names:
+            r = self.rooms[n]
+            self.dims[n] = dimension_violations(r)
+            self.areas[n] = area_violations(r, self._bounds.get(n))
+            self.scene[n] = []
+            deps = {n}
+            if self.plan.needs_adjacency:
+                deps |= self.neighbours[n]
+            if self.plan.needs_corridor and self.corridor is not None:
+                deps.add(self.corridor)
+            self.deps[n] = deps
+        only = {self.spaces[n].id for n in names}
+        for c, fi, sp, v in self.plan.run(self.building, only=only):
+            self.scene[sp.name].append((c.slot, fi, format_violation(v)))
+
+    def _strings(self, names: Set[str]) -> List[str]:
+        return [s for n in names for s in self.dims[n] + self.areas[n]] + [s for n in names for (_, _, s) in self.scene[n]]
+
+    # ----- public API -----
+    def violations(self) -> List[str]:
+        if self._full is not None:
+            return list(self._full)
+        # same order as RulesEngine.check: dimensions, dropped, area bounds, scene rules
+        out: List[str] = [s for n in self.names for s in self.dims[n]]
+        out += [f"{name}: could not be placed within envelope" for name in self.layout.dropped]
+        out += [s for n in self.names for s in self.areas[n]]
+        scene = sorted(
+            ((slot, fi, self.order[n], k, s) for n in self.names for k, (slot, fi, s) in enumerate(self.scene[n])),
+        )
+        out += [s for (_, _, _, _, s) in scene]
+        return out
+
+    def report(self) -> ValidationReport:
+        v = self.violations()
+        return ValidationReport(compliant=len(v) == 0, violations=v)
+
+    def update(self, layout: LayoutResult) -> ValidationDelta:
+        """Re-validate after a local edit (moves/resizes) and return what changed."""
+        new_names = [r.name for r in layout.rooms]
+        if (
+            self._full is not None
+            or new_names != self.names
+            or layout.dropped != self.layout.dropped
+            or self.engine.rule_set(self.rule_paths).version != self.version
+        ):
+            # Program or rule catalog changed: nothing to reuse
+            before = self.violations()
+            self._load(layout)
+            return _delta(before, self.violations(), self.names)
+        incoming = {r.name: r for r in layout.rooms}
+        changed = {n for n, r in incoming.items() if _geom(r) != _geom(self.rooms[n])}
+        if not changed:
+            return ValidationDelta()
+        # rooms whose results depend on an edited room, before and after the edit
+        affected = set(changed) | {m for m, d in self.deps.items() if d & changed}
+        touching: Dict[str, Set[str]] = {}
+        if self.plan.needs_adjacency:
+            for n in changed:
+                touching[n] = self._touching(n, incoming)
+                affected |= touching[n]
+        before = self._strings(affected)
+        W, H = self.brief.building_w, self.brief.building_h
+        for n in changed:
+            mine, r = self.rooms[n], incoming[n]
+            mine.x, mine.y, mine.w, mine.h = r.x, r.y, r.w, r.h
+            sp = room_space(mine, W, H)
+            idx = self.order[n]
+            for f in self.building.floors:
+                f.spaces[idx] = sp
+            self.spaces[n] = sp
+        for n, new in touching.items():
+            old = self.neighbours[n]
+            for m in old - new:
+                self.neighbours[m].discard(n)
+            for m in new - old:
+                self.neighbours[m].add(n)
+            self.neighbours[n] = new
+        self._evaluate(affected)
+        return _delta(before, self._strings(affected), sorted(affected, key=self.order.get))
+
+
+def _delta(before: List[str], after: List[str], rechecked: List[str]) -> ValidationDelta:
+    b, a = Counter(before), Counter(after)
+    return ValidationDelta(
+        added=list((a - b).elements()),
+        removed=list((b - a).elements()),
+        rechecked=list(rechecked),
+    )
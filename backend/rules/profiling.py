@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import threading
+from collections import deque
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+
+class _RuleStats:
+    __slots__ = ("calls", "evals", "violations", "total_s", "samples")
+
+    def __init__(self, window: int) -> None:
+        self.calls = 0  # plan runs that evaluated the rule
+        self.evals = 0  # predicate invocations (spaces visited)
+        self.violations = 0
+        self.total_s = 0.0
+        self.samples: Deque[float] = deque(maxlen=window)  # per-run durations for p95
+
+
+class RuleProfiler:
+    """Per-rule timing and hit counts for compiled rule plans.
+
+    Disabled by default (set ``BLUEPRINT_RULE_PROFILE=1`` or call ``enable``); when disabled
+    the plan walk does not take any timestamps. Time is attributed per rule ID and plan run;
+    shared facts are reported under ``facts.*`` IDs. Rules evaluated in worker processes are
+    merged in when their task returns (see ``run_profiled``).
+    """
+
+    def __init__(self, window: int = 2048) -> None:
+        self.enabled = os.environ.get("BLUEPRINT_RULE_PROFILE", "") not in ("", "0")
+        self.window = window
+        self._lock = threading.Lock()
+        self._stats: Dict[str, _RuleStats] = {}
+
+    def enable(self) -> None:
+        self.enabled = True
+
+    def disable(self) -> None:
+        self.enabled = False
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+
+    def record(self, rule_id: str, seconds: float, evals: int = 0, violations: int = 0) -> None:
+        with self._lock:
+            st = self._stats.get(rule_id)
+            if st is None:
+                st = self._stats[rule_id] = _RuleStats(self.window)
+            st.calls += 1
+            st.evals += evals
+            st.violations += violations
+            st.total_s += seconds
+            st.samples.append(seconds)
+
+    def drain(self) -> Dict[str, Tuple[int, int, int, float, List[float]]]:
+        """Take the raw stats recorded so far (for ``merge`` in another process) and reset."""
+        with self._lock:
+            stats, self._stats = self._stats, {}
+        return {k: (st.calls, st.evals, st.violations, st.total_s, list(st.samples)) for k, st in stats.items()}
+
+    def merge(self, raw: Optional[Dict[str, Tuple[int, int, int, float, List[float]]]]) -> None:
+        if not raw:
+            return
+        with self._lock:
+            for rule_id, (calls, evals, violations, total_s, samples) in raw.items():
+                st = self._stats.get(rule_id)
+                if st is None:
+                    st = self._stats[rule_id] = _RuleStats(self.window)
+                st.calls += calls
+                st.evals += evals
+                st.violations += violations
+                st.total_s += total_s
+                st.samples.extend(samples)
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        """Rows sorted by total time, slowest first."""
+        with self._lock:
+            items = [(k, st.calls, st.evals, st.violations, st.total_s, sorted(st.samples)) for k, st in self._stats.items()]
+        rows: List[Dict[str, Any]] = []
+        for rule_id, calls, evals, violations, total_s, samples in items:
+            p95 = samples[int(0.95 * (len(samples) - 1))] if samples else 0.0
+            rows.append({
+                "rule_id": rule_id,
+                "calls": calls,
+                "evals": evals,
+                "violations": violations,
+                "total_ms": total_s * 1e3,
+                "mean_ms": (total_s / calls * 1e3) if calls else 0.0,
+                "p95_ms": p95 * 1e3,
+            })
+        rows.sort(key=lambda r: r["total_ms"], reverse=True)
+        return rows
+
+
+# Process-wide profiler read by RulePlan.run
+profiler = RuleProfiler()
+
+
+def run_profiled(enabled: bool, fn: Callable[..., Any], *args: Any) -> Tuple[Any, Optional[Dict[str, Tuple[int, int, int, float, List[float]]]]]:
+    """Run ``fn(*args)`` in a worker process under the submitting process's profiler switch.
+
+    Returns the result and the rule stats recorded meanwhile (None when disabled); the
+    submitter passes them to ``profiler.merge``.
+    """
+    profiler.enabled = enabled
+    if not enabled:
+        return fn(*args), None
+    profiler.reset()
+    result = fn(*args)
+    return result, profiler.drain()
+
+
+def format_table(rows: List[Dict[str, Any]]) -> str:
+    head = f"{'rule_id':<32} {'calls':>7} {'evals':>8} {'viol':>6} {'total_ms':>10} {'mean_ms':>9} {'p95_ms':>9}"
+    lines = [head, "-" * len(head)]
+    for r in rows:
+        lines.append(
+            f"{r['rule_id']:<32} {r['calls']:>7} {r['evals']:>8} {r['violations']:>6} "
+            f"{r['total_ms']:>10.3f} {r['mean_ms']:>9.4f} {r['p95_ms']:>9.4f}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv: List[str] | None = None) -> None:
+    """Profile a rule catalog against briefs: solve each brief once, then validate it repeatedly."""
+    ap = argparse.ArgumentParser(prog="python -m backend.rules.profiling", description=main.__doc__)
+    ap.add_argument("briefs", nargs="+", help="brief JSON files (e.g. briefs/*.json)")
+    ap.add_argument("--rules", nargs="*", default=None, help="custom rule catalog JSON files")
+    ap.add_argument("--repeat", type=int, default=20, help="validations per brief")
+    ap.add_argument("--json", action="store_true", help="dump rows as JSON instead of a table")
+    args = ap.parse_args(argv)
+
+    from backend.core.orchestrator import Orchestrator
+    from backend.models.schema import Brief
+    from backend.rules.profiling import profiler  # the instance the rule plans read, also under -m
+
+    orch = Orchestrator()
+    profiler.disable()
+    work = []
+    for p in args.briefs:
+        brief = Brief(**json.loads(Path(p).read_text(encoding="utf-8")))
+        work.append((brief, orch.run(brief).layout))
+    profiler.reset()
+    profiler.enable()
+    for brief, layout in work:
+        for _ in range(max(1, args.repeat)):
+            orch.rules.check(layout, brief, rule_paths=args.rules)
+    profiler.disable()
+    rows = profiler.snapshot()
+    print(json.dumps(rows, indent=2) if args.json else format_table(rows))
+
+
+if __name__ == "__main__":
+    main()
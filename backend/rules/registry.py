@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from backend.rules.dsl import RulePlan, compile_rules
+from backend.rules.loader import load_rules
+
+# (mtime_ns, size) per path; None when the file is missing
+Signature = Tuple[Optional[Tuple[int, int]], ...]
+
+
+@dataclass(frozen=True)
+class RuleSet:
+    """Parsed and compiled rule catalog; immutable once published by the registry."""
+
+    rules: Tuple[Dict[str, Any], ...]
+    plan: RulePlan
+    version: str
+
+    @property
+    def rule_ids(self) -> List[str]:
+        return [r.get("id", "") for r in self.rules]
+
+
+def _rules_version(rules: List[Dict[str, Any]]) -> str:
+    blob = json.dumps(rules, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()[:12]
+
+
+def _signature(paths: Tuple[str, ...]) -> Signature:
+    sig = []
+    for p in paths:
+        try:
+            st = os.stat(p)
+            sig.append((st.st_mtime_ns, st.st_size))
+        except OSError:
+            sig.append(None)
+    return tuple(sig)
+
+
+class RuleRegistry:
+    """Cache of compiled rule sets keyed by rule paths, invalidated by file mtime/size.
+
+    The default catalog (no paths) never touches disk. Custom catalogs are re-stat'ed at most
+    once per ``check_interval_s``; between checks ``get`` is a dict lookup. ``reload`` forces a
+    re-read (hot reload), e.g. after deploying a new customer catalog.
+    """
+
+    def __init__(self, check_interval_s: float = 1.0) -> None:
+        self.check_interval_s = check_interval_s
+        self._lock = threading.Lock()
+        # key -> (rule set, file signature, monotonic time of last stat)
+        self._entries: Dict[Tuple[str, ...], Tuple[RuleSet, Signature, float]] = {}
+
+    @staticmethod
+    def _key(paths: List[str] | None) -> Tuple[str, ...]:
+        return tuple(str(p) for p in paths) if paths else ()
+
+    def _build(self, key: Tuple[str, ...]) -> RuleSet:
+        rules = load_rules(list(key) or None)
+        return RuleSet(rules=tuple(rules), plan=compile_rules(rules), version=_rules_version(rules))
+
+    def get(self, paths: List[str] | None = None) -> RuleSet:
+        key = self._key(paths)
+        entry = self._entries.get(key)
+        if entry is not None:
+            rule_set, sig, checked = entry
+            if not key:
+                return rule_set
+            now = time.monotonic()
+            if now - checked < self.check_interval_s:
+                return rule_set
+            new_sig = _signature(key)
+            if new_sig == sig:
+                with self._lock:
+                    self._entries[key] = (rule_set, sig, now)
+                return rule_set
+        return self.reload(paths)
+
+    def reload(self, paths: List[str] | None = None) -> RuleSet:
+        key = self._key(paths)
+        sig = _signature(key)
+        rule_set = self._build(key)
+        with self._lock:
+            self._entries[key] = (rule_set, sig, time.monotonic())
+        return rule_set
+
+    def version(self, paths: List[str] | None = None) -> str:
+        return self.get(paths).version
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+# Process-wide registry shared by RulesEngine instances
+default_registry = RuleRegistry()
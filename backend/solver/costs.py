@@ -1,7 +1,9 @@
 from __future__ import annotations
 
+import math
 from typing import Dict, Tuple
 
+from backend.geometry.circulation import floor_distances
 from backend.models.graphs import build_graphs
 from backend.models.scene import Building
 from backend.models.schema import Brief, LayoutResult, SoftObjectives, SoftWeights
@@ -77,7 +79,7 @@ def evaluate_cost(building: Building, brief: Brief) -> Dict[str, float]:
         excess = max(0.0, abs(ratio - target) - tol)
         terms["aspect_ratio_deviation"] += excess
 
-    # hub distance to corridor/living (center-to-center normalized)
+    # hub distance to corridor/living (walking distance through doors, normalized)
     # select hub: corridor else living
     if building.floors:
         spaces = building.floors[0].spaces
@@ -92,13 +94,19 @@ def evaluate_cost(building: Building, brief: Brief) -> Dict[str, float]:
         if hub is None and spaces:
             hub = spaces[0]
         if hub is not None:
+            walk = floor_distances(building.floors[0])
+            hub_i = spaces.index(hub)
             hx, hy = hub.rect.x + hub.rect.w/2, hub.rect.y + hub.rect.h/2
             norm = max(1.0, building.width + building.height)
-            for sp in spaces:
+            for i, sp in enumerate(spaces):
                 if sp is hub:
                     continue
-                cx, cy = sp.rect.x + sp.rect.w/2, sp.rect.y + sp.rect.h/2
-                terms["hub_distance"] += (abs(cx - hx) + abs(cy - hy)) / norm
+                d = float(walk.matrix[hub_i, i])
+                if math.isinf(d):
+                    # no door path: fall back to center-to-center Manhattan distance
+                    cx, cy = sp.rect.x + sp.rect.w/2, sp.rect.y + sp.rect.h/2
+                    d = abs(cx - hx) + abs(cy - hy)
+                terms["hub_distance"] += d / norm
 
     # area target deviation (normalize by target to be scale-free)
     spec_targets = {s.name: s.target_area for s in brief.rooms if s.target_area}
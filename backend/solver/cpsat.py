@@ -1,12 +1,14 @@
 from __future__ import annotations
 
-from typing import Dict, Any, List, Tuple
+from typing import Callable, Collection, Dict, Any, List, Tuple
 
 try:
     from ortools.sat.python import cp_model
 except Exception:  # pragma: no cover
     cp_model = None
 
+from backend.core.jobs import current_job
+from backend.core.tracing import count
 from backend.models.schema import Brief, LayoutResult, PlacedRoom, RoomSpec
 
 
@@ -21,6 +23,41 @@ def _choose_size(spec: RoomSpec) -> Tuple[int, int]:
     return spec.min_w, spec.min_h
 
 
+if cp_model is not None:
+
+    class _Progress(cp_model.CpSolverSolutionCallback):
+        """Reports each improving solution to a running job and stops the search on cancel."""
+
+        def __init__(self, job: Any, build: Callable[[Callable[[Any], int]], LayoutResult]) -> None:
+            super().__init__()
+            self.job = job
+            self.build = build
+
+        def on_solution_callback(self) -> None:
+            if self.job.cancelled:
+                self.StopSearch()
+                return
+            self.job.report(self.build(self.Value), self.ObjectiveValue())
+
+
+def _solve(model: Any, time_limit_s: float, build: Callable[[Callable[[Any], int]], LayoutResult]) -> LayoutResult | None:
+    # Captured here: the callback runs on a solver thread, outside this context
+    job = current_job()
+    if job is not None and job.cancelled:
+        return None
+    solver = cp_model.CpSolver()
+    solver.parameters.max_time_in_seconds = time_limit_s
+    solver.parameters.num_search_workers = 8
+    res = solver.Solve(model, _Progress(job, build) if job is not None else None)
+    count("cpsat_solve")
+    # Without a proof of optimality (or infeasibility) the search ran out of time
+    if res in (cp_model.FEASIBLE, cp_model.UNKNOWN) and not (job is not None and job.cancelled):
+        count("cpsat_time_limit")
+    if res not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+        return None
+    return build(solver.Value)
+
+
 def _find_hub_index(brief: Brief) -> int:
     for i, s in enumerate(brief.rooms):
         if s.name.lower().startswith("corridor"):
@@ -31,11 +68,9 @@ def _find_hub_index(brief: Brief) -> int:
     return 0
 
 
-def solve_rect_pack(brief: Brief | Dict[str, Any], seed: LayoutResult | Dict[str, Any] | None = None, time_limit_s: float = 0.5) -> LayoutResult | None:
+def solve_rect_pack(brief: Brief, seed: LayoutResult | None = None, time_limit_s: float = 0.5) -> LayoutResult | None:
     if cp_model is None:
         return None
-    if not isinstance(brief, Brief):
-        brief = Brief(**brief)
 
     model = cp_model.CpModel()
 
@@ -72,8 +107,6 @@ def solve_rect_pack(brief: Brief | Dict[str, Any], seed: LayoutResult | Dict[str
 
     # Seed hint
     if seed is not None:
-        if not isinstance(seed, LayoutResult):
-            seed = LayoutResult(**seed)
         name_to_index = {s.name: i for i, s in enumerate(brief.rooms)}
         for pr in seed.rooms:
             i = name_to_index.get(pr.name)
@@ -161,33 +194,27 @@ def solve_rect_pack(brief: Brief | Dict[str, Any], seed: LayoutResult | Dict[str
     if dist_terms:
         model.Minimize(sum(dist_terms))
 
-    solver = cp_model.CpSolver()
-    solver.parameters.max_time_in_seconds = time_limit_s
-    solver.parameters.num_search_workers = 8
-    res = solver.Solve(model)
-    if res not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
-        return None
+    def build(value: Callable[[Any], int]) -> LayoutResult:
+        rooms = []
+        for i, spec in enumerate(brief.rooms):
+            wi, hi = sizes[i]
+            x = int(value(X[i]))
+            y = int(value(Y[i]))
+            rooms.append(PlacedRoom(name=spec.name, x=x, y=y, w=wi, h=hi))
+        return LayoutResult(rooms=rooms, dropped=[])
 
-    rooms = []
-    for i, spec in enumerate(brief.rooms):
-        wi, hi = sizes[i]
-        x = int(solver.Value(X[i]))
-        y = int(solver.Value(Y[i]))
-        rooms.append(PlacedRoom(name=spec.name, x=x, y=y, w=wi, h=hi))
-    return LayoutResult(rooms=rooms, dropped=[])
+    return _solve(model, time_limit_s, build)
 
 
 def solve_with_corridor(
-    brief: Brief | Dict[str, Any],
+    brief: Brief,
     corridor_rect: Dict[str, int],
-    seed: LayoutResult | Dict[str, Any] | None = None,
+    seed: LayoutResult | None = None,
     time_limit_s: float = 1.0,
     y_band: tuple[int, int] | None = None,
 ) -> LayoutResult | None:
     if cp_model is None:
         return None
-    if not isinstance(brief, Brief):
-        brief = Brief(**brief)
 
     model = cp_model.CpModel()
     n = len(brief.rooms)
@@ -237,8 +264,6 @@ def solve_with_corridor(
 
     # Seed hints
     if seed is not None:
-        if not isinstance(seed, LayoutResult):
-            seed = LayoutResult(**seed)
         name_to_index = {s.name: i for i, s in enumerate(brief.rooms)}
         for pr in seed.rooms:
             i = name_to_index.get(pr.name)
@@ -340,18 +365,99 @@ def solve_with_corridor(
     if dist_terms:
         model.Minimize(sum(dist_terms))
 
-    solver = cp_model.CpSolver()
-    solver.parameters.max_time_in_seconds = time_limit_s
-    solver.parameters.num_search_workers = 8
-    res = solver.Solve(model)
-    if res not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+    def build(value: Callable[[Any], int]) -> LayoutResult:
+        rooms = []
+        for i, spec in enumerate(brief.rooms):
+            wi, hi = sizes[i]
+            x = int(value(X[i])); y = int(value(Y[i]))
+            rooms.append(PlacedRoom(name=spec.name, x=x, y=y, w=wi, h=hi))
+        # append corridor as room for downstream
+        rooms.append(PlacedRoom(name="corridor", x=cx, y=cy, w=cw, h=ch))
+        return LayoutResult(rooms=rooms, dropped=[])
+
+    return _solve(model, time_limit_s, build)
+
+
+def solve_pinned(
+    brief: Brief,
+    layout: LayoutResult,
+    fixed: Collection[str],
+    time_limit_s: float = 0.5,
+) -> LayoutResult | None:
+    """Re-optimise ``layout`` around rooms held in place.
+
+    Rooms keep their current sizes. Rooms named in ``fixed`` are fixed intervals; every other
+    room is free and hinted from where it is now, so the search starts from the current
+    layout. Free rooms are pulled towards the hub and their preferred neighbours and pay for
+    every unit they move. None if the locked rooms leave no valid packing.
+    """
+    if cp_model is None:
         return None
+    n = len(layout.rooms)
+    if n == 0:
+        return LayoutResult(rooms=[], dropped=list(layout.dropped))
 
-    rooms = []
-    for i, spec in enumerate(brief.rooms):
-        wi, hi = sizes[i]
-        x = int(solver.Value(X[i])); y = int(solver.Value(Y[i]))
-        rooms.append(PlacedRoom(name=spec.name, x=x, y=y, w=wi, h=hi))
-    # append corridor as room for downstream
-    rooms.append(PlacedRoom(name="corridor", x=cx, y=cy, w=cw, h=ch))
-    return LayoutResult(rooms=rooms, dropped=[])
+    W, H = brief.building_w, brief.building_h
+    model = cp_model.CpModel()
+    sizes = [(max(1, min(r.w, W)), max(1, min(r.h, H))) for r in layout.rooms]
+    X: List[Any] = []
+    Y: List[Any] = []
+    Xiv = []
+    Yiv = []
+    moves: List[Any] = []
+    for i, r in enumerate(layout.rooms):
+        w, h = sizes[i]
+        x0 = max(0, min(r.x, W - w))
+        y0 = max(0, min(r.y, H - h))
+        if r.name in fixed:
+            x = model.NewConstant(x0)
+            y = model.NewConstant(y0)
+        else:
+            x = model.NewIntVar(0, W - w, f"x_{i}")
+            y = model.NewIntVar(0, H - h, f"y_{i}")
+            model.AddHint(x, x0)
+            model.AddHint(y, y0)
+            mx = model.NewIntVar(0, W, f"mx_{i}")
+            my = model.NewIntVar(0, H, f"my_{i}")
+            model.AddAbsEquality(mx, x - x0)
+            model.AddAbsEquality(my, y - y0)
+            moves += [mx, my]
+        X.append(x)
+        Y.append(y)
+        Xiv.append(model.NewFixedSizeIntervalVar(x, w, f"xint_{i}"))
+        Yiv.append(model.NewFixedSizeIntervalVar(y, h, f"yint_{i}"))
+
+    model.AddNoOverlap2D(Xiv, Yiv)
+
+    def centre_distance(i: int, j: int, tag: str) -> Any:
+        (wi, hi), (wj, hj) = sizes[i], sizes[j]
+        dx = model.NewIntVar(0, W, f"dx_{tag}_{i}_{j}")
+        dy = model.NewIntVar(0, H, f"dy_{tag}_{i}_{j}")
+        model.AddAbsEquality(dx, (X[i] + wi // 2) - (X[j] + wj // 2))
+        model.AddAbsEquality(dy, (Y[i] + hi // 2) - (Y[j] + hj // 2))
+        return dx + dy
+
+    index = {r.name: i for i, r in enumerate(layout.rooms)}
+    pairs: List[Tuple[str, str]] = [(p.a, p.b) for p in (brief.soft.adjacency if brief.soft else [])]
+    pairs += list(brief.adjacency_preferences)
+    terms = []
+    for a, b in pairs:
+        i, j = index.get(a), index.get(b)
+        if i is not None and j is not None and i != j:
+            terms.append(centre_distance(i, j, "p"))
+    hub = next((i for i, r in enumerate(layout.rooms) if r.name.lower().startswith("corridor")), None)
+    if hub is None:
+        hub = next((i for i, r in enumerate(layout.rooms) if r.name.lower().startswith("living")), 0)
+    terms += [centre_distance(i, hub, "h") for i in range(n) if i != hub]
+    # Travel counts double: a free room moves only to clear a locked room or where the move
+    # shortens its pulls by twice the distance (stable layouts, and the hint proves quickly)
+    model.Minimize(sum(terms) + 2 * sum(moves))
+
+    def build(value: Callable[[Any], int]) -> LayoutResult:
+        rooms = [
+            PlacedRoom(name=r.name, x=int(value(X[i])), y=int(value(Y[i])), w=sizes[i][0], h=sizes[i][1])
+            for i, r in enumerate(layout.rooms)
+        ]
+        return LayoutResult(rooms=rooms, dropped=list(layout.dropped))
+
+    return _solve(model, time_limit_s, build)
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import Dict, Any, List, Tuple
+from typing import List, Tuple
 
 from backend.models.schema import Brief, LayoutResult, PlacedRoom, RoomSpec
 
@@ -16,9 +16,7 @@ def _find_hub_name(brief: Brief) -> str | None:
     return brief.rooms[0].name if brief.rooms else None
 
 
-def pack_with_corridor(brief: Brief | Dict[str, Any]) -> LayoutResult:
-    if not isinstance(brief, Brief):
-        brief = Brief(**brief)
+def pack_with_corridor(brief: Brief) -> LayoutResult:
     # Decide corridor width
     cw = (brief.connectivity.corridor_width if brief.connectivity and brief.connectivity.corridor_width else 120)
     # Insert horizontal corridor at y = approx one third
@@ -82,9 +80,7 @@ def pack_with_corridor(brief: Brief | Dict[str, Any]) -> LayoutResult:
     return LayoutResult(rooms=rooms, dropped=dropped)
 
 
-def pack_with_hub(brief: Brief | Dict[str, Any]) -> LayoutResult:
-    if not isinstance(brief, Brief):
-        brief = Brief(**brief)
+def pack_with_hub(brief: Brief) -> LayoutResult:
 
     def size_for(s: RoomSpec) -> Tuple[int, int]:
         import math
@@ -128,9 +124,7 @@ def pack_with_hub(brief: Brief | Dict[str, Any]) -> LayoutResult:
     return LayoutResult(rooms=rooms, dropped=dropped)
 
 
-def pack_next_fit(brief: Brief | Dict[str, Any]) -> LayoutResult:
-    if not isinstance(brief, Brief):
-        brief = Brief(**brief)
+def pack_next_fit(brief: Brief) -> LayoutResult:
 
     def size_for(s: RoomSpec) -> Tuple[int, int]:
         import math
@@ -5,12 +5,7 @@ from typing import Dict
 from backend.models.schema import Brief, LayoutResult
 
 
-def refine_layout(layout: LayoutResult | dict, brief: Brief | dict, iterations: int = 2) -> LayoutResult:
-    if not isinstance(layout, LayoutResult):
-        layout = LayoutResult(**layout)
-    if not isinstance(brief, Brief):
-        brief = Brief(**brief)
-
+def refine_layout(layout: LayoutResult, brief: Brief, iterations: int = 2) -> LayoutResult:
     # Nudge room sizes toward target area and aspect ratio target
     target_ratio = (brief.soft.aspect_ratio_target if brief.soft else 1.5)
     tol = (brief.soft.aspect_ratio_tolerance if brief.soft else 0.5)
@@ -53,12 +48,7 @@ def refine_layout(layout: LayoutResult | dict, brief: Brief | dict, iterations:
     return layout
 
 
-def ensure_connectivity(layout: LayoutResult | dict, brief: Brief | dict, max_passes: int = 3) -> LayoutResult:
-    if not isinstance(layout, LayoutResult):
-        layout = LayoutResult(**layout)
-    if not isinstance(brief, Brief):
-        brief = Brief(**brief)
-
+def ensure_connectivity(layout: LayoutResult, brief: Brief, max_passes: int = 3) -> LayoutResult:
     def bbox(r):
         return (r.x, r.y, r.x + r.w, r.y + r.h)
 
@@ -115,11 +105,7 @@ def ensure_connectivity(layout: LayoutResult | dict, brief: Brief | dict, max_pa
     return layout
 
 
-def attract_to_hub(layout: LayoutResult | dict, brief: Brief | dict, step: int = 20, iters: int = 20) -> LayoutResult:
-    if not isinstance(layout, LayoutResult):
-        layout = LayoutResult(**layout)
-    if not isinstance(brief, Brief):
-        brief = Brief(**brief)
+def attract_to_hub(layout: LayoutResult, brief: Brief, step: int = 20, iters: int = 20) -> LayoutResult:
     # find hub in current layout (corridor else living*)
     def find_hub():
         for r in layout.rooms:
@@ -160,11 +146,7 @@ def attract_to_hub(layout: LayoutResult | dict, brief: Brief | dict, step: int =
     return layout
 
 
-def attract_to_corridor(layout: LayoutResult | dict, brief: Brief | dict, step: int = 20, iters: int = 20) -> LayoutResult:
-    if not isinstance(layout, LayoutResult):
-        layout = LayoutResult(**layout)
-    if not isinstance(brief, Brief):
-        brief = Brief(**brief)
+def attract_to_corridor(layout: LayoutResult, brief: Brief, step: int = 20, iters: int = 20) -> LayoutResult:
     corridor = next((r for r in layout.rooms if r.name.lower().startswith("corridor")), None)
     if corridor is None:
         return layout
@@ -195,11 +177,7 @@ def attract_to_corridor(layout: LayoutResult | dict, brief: Brief | dict, step:
     return layout
 
 
-def ensure_corridor_overlap(layout: LayoutResult | dict, brief: Brief | dict) -> LayoutResult:
-    if not isinstance(layout, LayoutResult):
-        layout = LayoutResult(**layout)
-    if not isinstance(brief, Brief):
-        brief = Brief(**brief)
+def ensure_corridor_overlap(layout: LayoutResult, brief: Brief) -> LayoutResult:
     corridor = next((r for r in layout.rooms if r.name.lower().startswith("corridor")), None)
     if corridor is None:
         return layout
@@ -231,12 +209,7 @@ def ensure_corridor_overlap(layout: LayoutResult | dict, brief: Brief | dict) ->
     return layout
 
 
-def resolve_overlaps(layout: LayoutResult | dict, brief: Brief | dict, passes: int = 20, min_gap: int = 0) -> LayoutResult:
-    if not isinstance(layout, LayoutResult):
-        layout = LayoutResult(**layout)
-    if not isinstance(brief, Brief):
-        brief = Brief(**brief)
-
+def resolve_overlaps(layout: LayoutResult, brief: Brief, passes: int = 20, min_gap: int = 0) -> LayoutResult:
     def overlap(a, b):
         ox = min(a.x + a.w, b.x + b.w) - max(a.x, b.x)
         oy = min(a.y + a.h, b.y + b.h) - max(a.y, b.y)
@@ -320,15 +293,11 @@ def resolve_overlaps(layout: LayoutResult | dict, brief: Brief | dict, passes: i
     return layout
 
 
-def keep_corridor_clear(layout: LayoutResult | dict, brief: Brief | dict) -> LayoutResult:
+def keep_corridor_clear(layout: LayoutResult, brief: Brief) -> LayoutResult:
     """Force all rooms out of the corridor band (no intersections).
 
     Deterministic cleanup used after heuristic moves; never moves the corridor, only others.
     """
-    if not isinstance(layout, LayoutResult):
-        layout = LayoutResult(**layout)
-    if not isinstance(brief, Brief):
-        brief = Brief(**brief)
     corridor = next((r for r in layout.rooms if r.name.lower().startswith("corridor")), None)
     if corridor is None:
         return layout
@@ -354,9 +323,7 @@ def keep_corridor_clear(layout: LayoutResult | dict, brief: Brief | dict) -> Lay
     return layout
 
 
-def has_overlap(layout: LayoutResult | dict) -> bool:
-    if not isinstance(layout, LayoutResult):
-        layout = LayoutResult(**layout)
+def has_overlap(layout: LayoutResult) -> bool:
     n = len(layout.rooms)
     for i in range(n):
         a = layout.rooms[i]
@@ -369,14 +336,10 @@ def has_overlap(layout: LayoutResult | dict) -> bool:
     return False
 
 
-def legalize_no_overlap(layout: LayoutResult | dict, brief: Brief | dict, min_gap: int = 0) -> LayoutResult:
+def legalize_no_overlap(layout: LayoutResult, brief: Brief, min_gap: int = 0) -> LayoutResult:
     """Re-pack rooms (keeping sizes) into rows to guarantee no overlaps.
     Preserves corridor position if present; other rooms are packed above/below.
     """
-    if not isinstance(layout, LayoutResult):
-        layout = LayoutResult(**layout)
-    if not isinstance(brief, Brief):
-        brief = Brief(**brief)
 
     rooms = [r for r in layout.rooms]
     corridor = next((r for r in rooms if r.name.lower().startswith("corridor")), None)
@@ -422,14 +385,10 @@ def legalize_no_overlap(layout: LayoutResult | dict, brief: Brief | dict, min_ga
 
 # Presentation / geometry polishing
 
-def snap_and_align(layout: LayoutResult | dict, brief: Brief | dict, grid: int = 10, margin: int = 20, min_gap: int = 0) -> LayoutResult:
+def snap_and_align(layout: LayoutResult, brief: Brief, grid: int = 10, margin: int = 20, min_gap: int = 0) -> LayoutResult:
     """Snap all rectangles to grid, enforce outer margin, and align rows/columns.
     Does not change corridor size/position beyond snapping.
     """
-    if not isinstance(layout, LayoutResult):
-        layout = LayoutResult(**layout)
-    if not isinstance(brief, Brief):
-        brief = Brief(**brief)
 
     def snap(v: int) -> int:
         r = int(round(v / grid) * grid)
@@ -499,12 +458,7 @@ def snap_and_align(layout: LayoutResult | dict, brief: Brief | dict, grid: int =
     return layout
 
 
-def add_corridor(layout: LayoutResult | dict, brief: Brief | dict) -> LayoutResult:
-    if not isinstance(layout, LayoutResult):
-        layout = LayoutResult(**layout)
-    if not isinstance(brief, Brief):
-        brief = Brief(**brief)
-
+def add_corridor(layout: LayoutResult, brief: Brief) -> LayoutResult:
     min_cw = (brief.hard.min_corridor_width if (brief.hard and brief.hard.min_corridor_width) else None)
     if not min_cw or not layout.rooms:
         return layout
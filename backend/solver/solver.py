@@ -1,14 +1,10 @@
 from typing import Dict, Any, List
 from math import ceil, sqrt
 
-try:
-    from ortools.sat.python import cp_model
-except Exception:  # pragma: no cover - allow working without OR-Tools installed yet
-    cp_model = None
-
+from backend.core.budget import solver_budget
+from backend.core.tracing import count, span
 from backend.models.schema import Brief, LayoutResult, PlacedRoom, RoomSpec
 from backend.solver.refine import add_corridor, ensure_connectivity, keep_corridor_clear, resolve_overlaps, has_overlap, legalize_no_overlap, snap_and_align
-from backend.solver.cpsat import solve_rect_pack
 from backend.solver.packing import pack_next_fit, pack_with_hub
 
 
@@ -20,87 +16,109 @@ class LayoutSolver:
     Units are arbitrary integer grid units (e.g., centimeters).
     """
 
-    def solve(self, brief: Dict[str, Any], seed: Dict[str, Any] | None = None) -> Dict[str, Any]:
+    def solve(self, brief: Brief, seed: LayoutResult | None = None) -> LayoutResult:
         # Accept dict or pydantic Brief
-        if not isinstance(brief, Brief):
-            brief = Brief(**brief)
 
-        # If seed provided, start from it (clamped to envelope)
-        if seed:
-            layout = LayoutResult(**seed)
-        else:
-            # improved heuristic packer with hub-first placement
-            layout = pack_with_hub(brief)
-            if not layout.rooms:
-                layout = pack_next_fit(brief)
+        # If seed provided, start from it (clamped to envelope); the passes below edit rooms
+        # in place, so work on a copy
+        with span("solve.pack"):
+            if seed:
+                layout = seed.model_copy(deep=True)
+            else:
+                # improved heuristic packer with hub-first placement
+                layout = pack_with_hub(brief)
+                if not layout.rooms:
+                    layout = pack_next_fit(brief)
+        strategy = "seed" if seed else "heuristic"
 
         # Corridor policy
-        private_count = len([s for s in (brief.rooms if isinstance(brief, Brief) else Brief(**brief).rooms) if s.name.lower().startswith('bed') or s.name.lower().startswith('bath')])
-        min_priv = (brief.connectivity.min_private_for_corridor if isinstance(brief, Brief) and brief.connectivity else 3)
+        private_count = len([s for s in brief.rooms if s.name.lower().startswith('bed') or s.name.lower().startswith('bath')])
+        min_priv = brief.connectivity.min_private_for_corridor if brief.connectivity else 3
         use_corr = private_count >= min_priv
 
         if use_corr:
             # Heuristic initial corridor placement
             from backend.solver.packing import pack_with_corridor
-            init = pack_with_corridor(brief)
+            with span("solve.pack_corridor"):
+                init = pack_with_corridor(brief)
             # Extract corridor rect
             cor = next((r for r in init.rooms if r.name.lower().startswith('corridor')), None)
             if cor is not None:
                 from backend.solver.cpsat import solve_with_corridor
-                cp_layout = solve_with_corridor(
-                    brief,
-                    {"x": cor.x, "y": cor.y, "w": cor.w, "h": cor.h},
-                    seed=init,
-                    time_limit_s=1.0,
-                    y_band=(max(0, cor.y-200), min((brief.building_h - cor.h), cor.y+200))
-                )
+                cp_layout = None
+                with span("solve.cpsat_corridor"), solver_budget(1.0) as limit:
+                    if limit > 0:
+                        cp_layout = solve_with_corridor(
+                            brief,
+                            {"x": cor.x, "y": cor.y, "w": cor.w, "h": cor.h},
+                            seed=init,
+                            time_limit_s=limit,
+                            y_band=(max(0, cor.y-200), min((brief.building_h - cor.h), cor.y+200))
+                        )
+                strategy = "cpsat_corridor"
                 if cp_layout is None:
+                    strategy = "cpsat_corridor_full"
                     # try full-height band as fallback attempt (still CP-SAT), do not revert to heuristic silently
-                    cp_layout = solve_with_corridor(
-                        brief,
-                        {"x": cor.x, "y": cor.y, "w": cor.w, "h": cor.h},
-                        seed=init,
-                        time_limit_s=1.5,
-                        y_band=(0, max(0, brief.building_h - cor.h))
-                    )
+                    with span("solve.cpsat_corridor_full"), solver_budget(1.5) as limit:
+                        if limit > 0:
+                            cp_layout = solve_with_corridor(
+                                brief,
+                                {"x": cor.x, "y": cor.y, "w": cor.w, "h": cor.h},
+                                seed=init,
+                                time_limit_s=limit,
+                                y_band=(0, max(0, brief.building_h - cor.h))
+                            )
                 layout = cp_layout if cp_layout is not None else init
             else:
                 layout = init
+            if layout is init:
+                strategy = "corridor_heuristic"
             # After CP-SAT, avoid heuristic moves that can overlap; just run a safety resolver
-            layout = resolve_overlaps(layout, brief)
-            layout = keep_corridor_clear(layout, brief)
+            with span("solve.repair"):
+                layout = resolve_overlaps(layout, brief)
+                layout = keep_corridor_clear(layout, brief)
         else:
-            # Optionally add corridor if requested
-            layout = add_corridor(layout, brief)
-            # Ensure connectivity (snap isolated rooms)
-            layout = ensure_connectivity(layout, brief)
-            # Attraction to hub
-            from backend.solver.refine import attract_to_hub
-            layout = attract_to_hub(layout, brief)
-            layout = resolve_overlaps(layout, brief)
-            layout = keep_corridor_clear(layout, brief)
+            with span("solve.heuristics"):
+                # Optionally add corridor if requested
+                layout = add_corridor(layout, brief)
+                # Ensure connectivity (snap isolated rooms)
+                layout = ensure_connectivity(layout, brief)
+                # Attraction to hub
+                from backend.solver.refine import attract_to_hub
+                layout = attract_to_hub(layout, brief)
+                layout = resolve_overlaps(layout, brief)
+                layout = keep_corridor_clear(layout, brief)
 
         # Try CP-SAT if available; fall back to heuristic result
-        cp_layout = None if use_corr else solve_rect_pack(brief, layout)
+        cp_layout = None
+        if not use_corr:
+            with span("solve.cpsat_pack"), solver_budget(0.5) as limit:
+                if limit > 0:
+                    from backend.solver.cpsat import solve_rect_pack
+                    cp_layout = solve_rect_pack(brief, layout, time_limit_s=limit)
         if cp_layout is not None:
-            layout = cp_layout
-            # post-process connectivity again just in case and attract
-            layout = ensure_connectivity(layout, brief)
-            from backend.solver.refine import attract_to_hub
-            layout = attract_to_hub(layout, brief)
-            # final safety: resolve any overlaps and clear corridor band
-            layout = resolve_overlaps(layout, brief)
-            layout = keep_corridor_clear(layout, brief)
+            strategy = "cpsat_pack"
+            with span("solve.repair"):
+                layout = cp_layout
+                # post-process connectivity again just in case and attract
+                layout = ensure_connectivity(layout, brief)
+                from backend.solver.refine import attract_to_hub
+                layout = attract_to_hub(layout, brief)
+                # final safety: resolve any overlaps and clear corridor band
+                layout = resolve_overlaps(layout, brief)
+                layout = keep_corridor_clear(layout, brief)
 
         # Presentation snap/align and margining (overlap-safe)
-        layout = snap_and_align(layout, brief, grid=10, margin=20, min_gap=20)
-        # Final clean: resolve tiny overlaps with a gap
-        layout = resolve_overlaps(layout, brief, min_gap=20)
-        layout = keep_corridor_clear(layout, brief)
-        if has_overlap(layout):
-            layout = legalize_no_overlap(layout, brief, min_gap=20)
+        with span("solve.finalize"):
+            layout = snap_and_align(layout, brief, grid=10, margin=20, min_gap=20)
+            # Final clean: resolve tiny overlaps with a gap
+            layout = resolve_overlaps(layout, brief, min_gap=20)
+            layout = keep_corridor_clear(layout, brief)
+            if has_overlap(layout):
+                layout = legalize_no_overlap(layout, brief, min_gap=20)
 
-        return layout.model_dump()
+        count(f"strategy:{strategy}")
+        return layout
 
     def _heuristic_pack(self, brief: Brief) -> Dict[str, Any]:
         # Simple row-wise packer with line breaks when exceeding building width
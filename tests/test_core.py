@@ -0,0 +1,460 @@
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+from backend.cli import main as cli
+from backend.core.batch import BatchRunner, ndjson
+from backend.core.budget import Deadline, candidate_count, deadline, solver_budget
+from backend.core.cache import ResultCache, SingleFlight, result_key
+from backend.core.jobs import FINAL, Job, JobQueue, QueueFull, running
+from backend.core.offload import Overloaded, WorkPool, candidate_stream_task
+from backend.core.orchestrator import Orchestrator, sections
+from backend.core.pool import CandidatePool
+from backend.core.telemetry import Registry, observe_run, registry
+from backend.core.tracing import chrome_trace, count, span, tracing
+from backend.core.warmup import LAZY_MODULES, TINY_BRIEF, warm_up
+from backend.learned.critic import Critic
+from backend.models.schema import Brief, GovernanceReport, LayoutResponse, LayoutResult, PlacedRoom, ValidationReport
+from backend.rules.engine import RulesEngine
+
+
+def test_trace_nests_spans_and_exports_chrome_events():
+    with span("outside"):  # no trace: a no-op
+        count("ignored")
+    with tracing() as trace:
+        with span("solve"):
+            with span("solve.pack"):
+                count("cpsat_solve")
+                count("cpsat_solve")
+        with span("validate"):
+            pass
+    timings = trace.timings()
+    assert [(s.name, s.depth) for s in timings.stages] == [("solve", 0), ("solve.pack", 1), ("validate", 0)]
+    solve, pack, validate = timings.stages
+    assert solve.start_ms <= pack.start_ms and pack.start_ms + pack.wall_ms <= solve.start_ms + solve.wall_ms + 1e-6
+    assert validate.start_ms >= solve.start_ms + solve.wall_ms - 1e-6
+    assert timings.counters == {"cpsat_solve": 2}
+    events = chrome_trace(timings)["traceEvents"]
+    assert [e["name"] for e in events] == ["layout", "solve", "solve.pack", "validate"]
+    assert all(e["ph"] == "X" and e["dur"] >= 0 for e in events)
+
+    orch = Orchestrator(pool=CandidatePool(workers=0), cache=ResultCache(max_entries=8))
+    resp = orch.run(TINY_BRIEF, timings=True)
+    names = [s.name for s in resp.timings.stages]
+    assert {"solve", "screen_and_score", "validate"} <= set(names)
+    assert any(k.startswith("strategy:") for k in resp.timings.counters)
+    assert orch.run(TINY_BRIEF).timings is None  # only when asked for
+
+
+def test_deadline_shares_budget_and_degrades_runs():
+    d = Deadline(1000)
+    # later stages keep their reserve: solve may use 60%, candidates what solve left minus 15%
+    assert 0.59 < d.allot("solve") <= 0.6
+    assert 0.84 < d.allot("candidates") <= 0.85
+    assert 0.99 < d.allot("finalize") <= 1.0
+
+    with solver_budget(0.5) as limit:  # no deadline: the default
+        assert limit == 0.5
+    with deadline(1000) as d:
+        with solver_budget(0.5) as limit:
+            assert limit == 0.5
+        assert candidate_count(3) == 3 and not d.degraded
+    with deadline(1) as d:
+        with solver_budget(0.5) as limit:
+            assert limit == 0.0
+        assert candidate_count(3) == 0
+    assert d.reasons == ["solver skipped: no time left for CP-SAT", "candidate set reduced (0 of 3)"]
+
+    orch = Orchestrator(pool=CandidatePool(workers=0), cache=ResultCache(max_entries=8))
+    rushed = orch.run(TINY_BRIEF, deadline_ms=1)
+    assert rushed.degraded and rushed.layout.rooms  # a heuristic layout, still returned
+    assert "deadline of 1 ms exceeded" in rushed.degraded_reasons
+    relaxed = orch.run(TINY_BRIEF, deadline_ms=60_000)
+    assert not relaxed.degraded and relaxed.degraded_reasons == []
+    assert orch.cache.misses == 2  # the degraded run was not cached
+
+
+def test_batch_streams_one_record_per_brief(tmp_path, capsys):
+    briefs = [TINY_BRIEF, {"building_w": -1}, dict(TINY_BRIEF, seed=2)]
+    serial = BatchRunner(workers=0, orchestrator=Orchestrator(pool=CandidatePool(workers=0), cache=ResultCache(max_entries=8)))
+    records = list(serial.run(briefs))
+    assert [(r["index"], r["status"]) for r in records] == [(0, "ok"), (1, "error"), (2, "ok")]
+    assert records[0]["result"]["layout"]["rooms"]
+    lines = list(ndjson(records))
+    assert all(line.endswith("\n") and "\n" not in line[:-1] for line in lines)
+    assert [json.loads(line) for line in lines] == records
+
+    parallel = BatchRunner(workers=2)
+    try:
+        records = list(parallel.run(briefs))  # completion order
+    finally:
+        parallel.shutdown()
+    assert sorted((r["index"], r["status"]) for r in records) == [(0, "ok"), (1, "error"), (2, "ok")]
+
+    good, bad = tmp_path / "good.json", tmp_path / "bad.json"
+    good.write_text(json.dumps(TINY_BRIEF), encoding="utf-8")
+    bad.write_text("{", encoding="utf-8")
+    assert cli(["solve", str(good), str(bad)]) == 1
+    out = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert [(r["path"], r["status"]) for r in out] == [(str(bad), "error"), (str(good), "ok")]
+    assert cli(["solve", str(good)]) == 0
+
+
+def test_concurrent_identical_runs_share_one_computation():
+    orch = Orchestrator(pool=CandidatePool(workers=0), cache=ResultCache(max_entries=0))  # coalesced, not cached
+    entered, release = threading.Event(), threading.Event()
+    computed = []
+    measured = orch._measured
+
+    def gated(brief, timings, deadline_ms, parts):
+        computed.append(1)
+        entered.set()
+        assert release.wait(10)
+        return measured(brief, timings, deadline_ms, parts)
+
+    orch._measured = gated
+    results = {}
+    leader = threading.Thread(target=lambda: results.setdefault("leader", orch.run(TINY_BRIEF)))
+    follower = threading.Thread(target=lambda: results.setdefault("follower", orch.run(TINY_BRIEF)))
+    leader.start()
+    assert entered.wait(10)
+    follower.start()
+    end = time.time() + 10
+    while orch.flights.shared == 0 and time.time() < end:
+        time.sleep(0.001)
+    release.set()
+    leader.join(10)
+    follower.join(10)
+    assert len(computed) == 1
+    assert results["leader"] is not results["follower"]
+    assert results["leader"].layout == results["follower"].layout
+    assert results["leader"].governance.run_id != results["follower"].governance.run_id
+    orch.run(TINY_BRIEF)  # finished flights are not reused
+    assert len(computed) == 2
+
+
+def test_included_sections_and_narrow_hits_from_full_responses():
+    assert sections(None) == {"cost", "analysis", "metrics", "governance"}
+    assert sections(["layout", "cost"]) == {"cost"}
+    with pytest.raises(ValueError):
+        sections(["layout", "floorplan"])
+
+    orch = Orchestrator(pool=CandidatePool(workers=0), cache=ResultCache(max_entries=8))
+    slim = orch.run(TINY_BRIEF, include=["layout", "validation"])
+    assert slim.layout.rooms and slim.validation is not None
+    assert (slim.cost, slim.analysis, slim.metrics, slim.governance) == (None, None, None, None)
+
+    brief = dict(TINY_BRIEF, seed=5)
+    full = orch.run(brief)
+    assert full.cost is not None and full.governance is not None
+    hits = orch.cache.hits
+    narrow = orch.run(brief, include=["layout", "cost"])  # served from the full response
+    assert orch.cache.hits == hits + 1
+    assert narrow.layout == full.layout and narrow.cost == full.cost
+    assert narrow.analysis is None and narrow.metrics is None
+    assert orch.run(brief).analysis is not None  # the cached full response is intact
+
+
+def test_metrics_render_in_prometheus_text_format():
+    reg = Registry()
+    runs = reg.counter("runs_total", "Runs", ("strategy",))
+    runs.inc("cpsat_pack")
+    runs.inc("cpsat_pack", amount=2)
+    runs.inc('odd"name')
+    latency = reg.histogram("latency_seconds", "Latency", buckets=(0.1, 1.0))
+    latency.observe(0.05)
+    latency.observe(0.5)
+    latency.observe(5.0)
+    reg.sample("queue_depth", "Queued", lambda: 3)
+    assert reg.render().splitlines() == [
+        "# HELP runs_total Runs",
+        "# TYPE runs_total counter",
+        'runs_total{strategy="cpsat_pack"} 3',
+        'runs_total{strategy="odd\\"name"} 1',
+        "# HELP latency_seconds Latency",
+        "# TYPE latency_seconds histogram",
+        'latency_seconds_bucket{le="0.1"} 1',
+        'latency_seconds_bucket{le="1"} 2',
+        'latency_seconds_bucket{le="+Inf"} 3',
+        "latency_seconds_sum 5.55",
+        "latency_seconds_count 3",
+        "# HELP queue_depth Queued",
+        "# TYPE queue_depth gauge",
+        "queue_depth 3",
+    ]
+
+    from fastapi.testclient import TestClient
+
+    from backend.api.main import app
+
+    with tracing() as trace:
+        with span("solve"):
+            count("strategy:seed")
+    observe_run(trace.timings())
+    assert 'blueprint_solver_strategy_wins_total{strategy="seed"}' in registry.render()
+
+    client = TestClient(app)  # no lifespan: nothing is warmed up or started
+    assert client.get("/jobs/unknown").status_code == 404
+    text = client.get("/metrics").text
+    assert 'blueprint_http_request_duration_seconds_count{method="GET",endpoint="/jobs/{job_id}",status="404"}' in text
+    assert "# TYPE blueprint_result_cache_hits_total counter" in text
+    assert "blueprint_work_inflight 0" in text
+
+
+def test_api_import_defers_heavy_modules_until_warm_up():
+    # A fresh interpreter: this one has imported them already
+    probe = (
+        "import sys, backend.api.main as api\n"
+        f"print(sorted(m for m in {list(LAZY_MODULES)!r} if m in sys.modules))\n"
+        "print([f.cache_info().currsize for f in (api.orchestrator, api.work_pool, api.job_queue, api.batch_runner, api.session_store)])\n"
+        "from backend.core.warmup import warm_up\n"
+        "warm_up()\n"
+        f"print(sorted(m for m in {list(LAZY_MODULES)!r} if m not in sys.modules))\n"
+    )
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    out = subprocess.run([sys.executable, "-c", probe], cwd=root, capture_output=True, text=True, check=True).stdout
+    assert out.splitlines() == ["[]", "[0, 0, 0, 0, 0]", "[]"]  # nothing built on import either
+
+    first = warm_up()
+    assert warm_up() == first  # once per process
+
+
+def layout(*rooms):
+    return LayoutResult(rooms=[PlacedRoom(name=n, x=x, y=y, w=w, h=h) for n, x, y, w, h in rooms])
+
+
+def test_parallel_pick_matches_serial_pick():
+    brief = Brief(building_w=1200, building_h=800)
+    passing = layout(("living", 0, 0, 400, 300), ("bed1", 400, 0, 300, 300))
+    passing_twin = layout(("living", 0, 0, 400, 300), ("bed1", 0, 300, 300, 300))  # same score
+    narrow_corridor = layout(("corridor", 0, 300, 1200, 120), ("bed1", 400, 420, 300, 200))
+    inner_bedroom = layout(("living", 0, 0, 400, 300), ("bed1", 500, 300, 300, 300))  # fails, scores best
+    engine, critic = RulesEngine(), Critic()
+    assert critic.score(brief, passing) == critic.score(brief, passing_twin)
+    assert not engine.screen(inner_bedroom, brief).passed
+
+    cases = [
+        ([passing, passing_twin, narrow_corridor, inner_bedroom], 0),  # tie: earliest passing
+        ([inner_bedroom, passing_twin, passing], 1),  # a failing candidate never wins
+        ([narrow_corridor, inner_bedroom], 1),  # none passes: best score overall
+    ]
+    parallel = CandidatePool(workers=2)
+    try:
+        for candidates, expected in cases:
+            serial = CandidatePool(workers=0).select(brief, candidates, engine, critic)
+            assert serial == expected
+            assert parallel.select(brief, candidates, engine, critic) == expected
+    finally:
+        parallel.shutdown()
+
+
+class _Gated:
+    """Orchestrator stand-in that holds each run until released."""
+
+    def __init__(self, orch):
+        self.orch = orch
+        self.started = threading.Event()
+        self.go = threading.Event()
+
+    def run(self, brief, deadline_ms=None):
+        self.started.set()
+        assert self.go.wait(10)
+        return self.orch.run(brief, deadline_ms=deadline_ms)
+
+
+def wait_final(jobs, job_id):
+    end = time.time() + 20
+    while time.time() < end:
+        status = jobs.get(job_id)
+        if status.status in FINAL:
+            return status
+        time.sleep(0.01)
+    raise AssertionError(f"job {job_id} did not finish")
+
+
+def test_job_submit_cancel_and_status():
+    orch = Orchestrator(pool=CandidatePool(workers=0), cache=ResultCache(max_entries=8))
+    gated = _Gated(orch)
+    jobs = JobQueue(gated)
+    try:
+        running = jobs.submit(Brief(**TINY_BRIEF))
+        queued = jobs.submit(Brief(**dict(TINY_BRIEF, seed=2)))
+        assert gated.started.wait(10)
+        assert jobs.get(running.id).status == "running"
+        assert jobs.get(queued.id).status == "queued"
+
+        assert jobs.cancel(queued.id).status == "cancelled"
+        jobs.cancel(running.id)  # stops CP-SAT; the run finishes with what it has
+        gated.go.set()
+        assert wait_final(jobs, running.id).status == "cancelled"
+        assert jobs.get(queued.id).result is None
+        # the cut-short run was not cached as the brief's answer
+        assert not orch.run(TINY_BRIEF).degraded
+        assert orch.cache.hits == 0
+
+        done = wait_final(jobs, jobs.submit(Brief(**TINY_BRIEF)).id)
+        assert done.status == "done" and done.result.layout.rooms
+        assert orch.cache.hits == 1
+    finally:
+        gated.go.set()
+        jobs.shutdown()
+
+
+def test_cancelled_run_is_degraded():
+    orch = Orchestrator(pool=CandidatePool(workers=0), cache=ResultCache(max_entries=8))
+    job = Job(brief=Brief(**TINY_BRIEF))
+    job.cancel_event.set()
+    with running(job):
+        resp = orch.run(TINY_BRIEF)
+    assert resp.degraded and "job cancelled" in resp.degraded_reasons[-1]
+    assert orch.cache.get(result_key(Brief(**TINY_BRIEF), orch.rules.rule_set().version)) is None
+
+
+def response(name):
+    return LayoutResponse(
+        layout=layout((name, 0, 0, 300, 300)),
+        validation=ValidationReport(compliant=True),
+        governance=GovernanceReport(run_id="r0"),
+    )
+
+
+def test_result_cache_hits_misses_and_lru_eviction():
+    cache = ResultCache(max_entries=2)
+    assert cache.get("a") is None
+    cache.put("a", response("a"))
+    cache.put("b", response("b"))
+    hit = cache.get("a")  # "a" is now the most recently used
+    assert hit.layout.rooms[0].name == "a" and hit.governance.run_id != "r0"
+    cache.put("c", response("c"))
+    assert cache.get("b") is None
+    assert cache.get("missing", "c").layout.rooms[0].name == "c"  # first key found
+    assert (cache.hits, cache.misses) == (2, 2)
+
+    # callers own what they get and what they put
+    cache = ResultCache(max_entries=2)
+    stored = response("a")
+    cache.put("a", stored)
+    stored.layout.rooms[0].x = 999
+    cache.get("a").layout.rooms[0].x = 999
+    assert cache.get("a").layout.rooms[0].x == 0
+
+
+def test_result_cache_sqlite_tier(tmp_path):
+    path = str(tmp_path / "results.db")
+    cache = ResultCache(max_entries=1, path=path)
+    cache.put("a", response("a"))
+    cache.put("b", response("b"))  # "a" leaves memory but stays in SQLite
+    assert cache.get("a").layout.rooms[0].name == "a"
+    # a new process (or restart) reads the same file
+    assert ResultCache(max_entries=0, path=path).get("b").layout.rooms[0].name == "b"
+
+    size = len(response("x").model_dump_json())
+    small = ResultCache(max_entries=0, path=str(tmp_path / "small.db"), max_db_bytes=2 * size)
+    for name in "xyz":
+        small.put(name, response(name))
+        time.sleep(0.01)  # distinct last-used times
+    assert small.get("x") is None  # least recently used goes first
+    assert small.get("z") is not None
+
+
+def test_single_flight_followers_share_the_leaders_result():
+    flights = SingleFlight()
+    entered, release = threading.Event(), threading.Event()
+    calls = []
+    results = {}
+
+    def compute():
+        calls.append(1)
+        entered.set()
+        assert release.wait(10)
+        return object()
+
+    leader = threading.Thread(target=lambda: results.setdefault("leader", flights.do("k", compute)))
+    follower = threading.Thread(target=lambda: results.setdefault("follower", flights.do("k", compute)))
+    leader.start()
+    assert entered.wait(10)
+    follower.start()
+    end = time.time() + 10
+    while flights.shared == 0 and time.time() < end:
+        time.sleep(0.001)
+    release.set()
+    leader.join(10)
+    follower.join(10)
+    assert len(calls) == 1
+    assert results["leader"][1] is False and results["follower"][1] is True
+    assert results["leader"][0] is results["follower"][0]
+    # once finished, the next call computes again
+    assert flights.do("k", lambda: 1) == (1, False)
+
+
+def test_unseeded_briefs_are_not_cached():
+    orch = Orchestrator(pool=CandidatePool(workers=0), cache=ResultCache(max_entries=8))
+    unseeded = {k: v for k, v in TINY_BRIEF.items() if k != "seed"}
+    orch.run(unseeded)
+    orch.run(unseeded)
+    assert orch.cache.hits == 0
+    first = orch.run(TINY_BRIEF)
+    first.layout.rooms[0].x += 1  # the caller's copy, not the cache's
+    again = orch.run(TINY_BRIEF)
+    assert orch.cache.hits == 1
+    assert again.layout.rooms[0].x == first.layout.rooms[0].x - 1
+
+
+def test_streams_and_jobs_are_admitted_within_limits():
+    work = WorkPool(workers=0, max_queue=0)
+    try:
+        chunks = work.stream(iter(["a", "b"]))
+        with pytest.raises(Overloaded):
+            work.stream(iter([]))
+        assert list(chunks) == ["a", "b"]  # the slot is released when the stream ends
+        dropped = work.stream(iter(["a", "b"]))
+        next(dropped)
+        dropped.close()  # client went away
+        assert work.inflight == 0 and work.rejected == 1
+    finally:
+        work.shutdown()
+
+    gated = _Gated(Orchestrator(pool=CandidatePool(workers=0), cache=ResultCache(max_entries=8)))
+    jobs = JobQueue(gated, max_queued=1)
+    try:
+        first = jobs.submit(Brief(**TINY_BRIEF))
+        assert gated.started.wait(10)
+        jobs.submit(Brief(**TINY_BRIEF))  # waits for the worker
+        with pytest.raises(QueueFull):
+            jobs.submit(Brief(**TINY_BRIEF))
+        assert jobs.rejected == 1
+        gated.go.set()
+        assert wait_final(jobs, first.id).status == "done"
+    finally:
+        gated.go.set()
+        jobs.shutdown()
+
+
+def test_jobs_and_candidate_streams_run_on_worker_processes():
+    work = WorkPool(workers=1)
+    orch = Orchestrator(pool=CandidatePool(workers=0), cache=ResultCache(max_entries=8))
+    jobs = JobQueue(orch, work=work)
+    try:
+        done = wait_final(jobs, jobs.submit(Brief(**TINY_BRIEF)).id)
+        assert done.status == "done" and done.result.layout.rooms
+        assert work._executor is not None  # the pipeline ran on the pool's process
+        again = wait_final(jobs, jobs.submit(Brief(**TINY_BRIEF)).id)
+        assert again.status == "done" and orch.cache.hits == 1  # cache lookups stay here
+
+        records = work.produce(candidate_stream_task, Brief(**TINY_BRIEF), 2)
+        first = next(records)
+        assert first["candidate"] is not None and not first["final"]
+        rest = list(records)
+        assert rest and rest[-1]["final"]
+        stopped = work.produce(candidate_stream_task, Brief(**TINY_BRIEF), 2)
+        next(stopped)
+        stopped.close()  # client went away: the worker stops and takes the next task
+        assert wait_final(jobs, jobs.submit(Brief(**dict(TINY_BRIEF, seed=2))).id).status == "done"
+    finally:
+        jobs.shutdown()
+        work.shutdown()
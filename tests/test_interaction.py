@@ -0,0 +1,147 @@
+import pytest
+
+from backend.core.cache import ResultCache
+from backend.core.orchestrator import Orchestrator
+from backend.core.pool import CandidatePool
+from backend.core.warmup import TINY_BRIEF
+from backend.interaction.service import apply_pins_and_optimize, generate_candidates, iter_candidates
+from backend.learned.critic import Critic
+from backend.interaction.session import SessionStore
+from backend.models.schema import Brief, LayoutResult, PinRoom, Pins, PlacedRoom
+
+
+def layout(*rooms):
+    return LayoutResult(rooms=[PlacedRoom(name=n, x=x, y=y, w=w, h=h) for n, x, y, w, h in rooms])
+
+
+def plan():
+    brief = Brief(building_w=1200, building_h=800)
+    start = layout(
+        ("corridor", 0, 300, 1200, 120),
+        ("living", 0, 0, 400, 300),
+        ("bed1", 400, 420, 300, 380),
+        ("bath", 900, 600, 150, 150),
+    )
+    return brief, start
+
+
+def orchestrator():
+    return Orchestrator(pool=CandidatePool(workers=0), cache=ResultCache(max_entries=0))
+
+
+def test_session_edits_stay_validated_and_evict_when_idle():
+    brief, start = plan()
+    orch = orchestrator()
+    store = SessionStore(orch, max_sessions=2)
+    session = store.create(brief, start)
+    assert store.get(session.id) is session
+
+    delta = session.edit(resize=("living", 0, -100))  # detached from the corridor
+    assert session.version == 1 and "living" in delta.rechecked and delta.added
+    assert session.state.report().violations == orch.rules.check(session.layout, brief)["violations"]
+    session.edit(move=("bath", 0, -180), resize=("bath", 20, 0))
+    bath = next(r for r in session.layout.rooms if r.name == "bath")
+    assert (bath.y, bath.w) == (420, 170)
+    assert session.state.report().violations == orch.rules.check(session.layout, brief)["violations"]
+    with pytest.raises(KeyError):
+        session.edit(move=("garage", 10, 0))
+    assert session.version == 2
+    assert start.rooms[1].h == 300  # the layout the session started from is not edited
+
+    state = session.to_state(cost=True)
+    assert state.version == 2 and state.cost is not None
+    state.rooms[0].x = 999  # a snapshot, not the live layout
+    assert session.layout.rooms[0].x == 0
+
+    # least recently used go first beyond max_sessions, and idle ones after idle_s
+    second = store.create(brief, start)
+    store.get(session.id)
+    third = store.create(brief, start)
+    assert store.get(second.id) is None and len(store) == 2
+    session.last_used -= store.idle_s + 1  # now the oldest, and idle
+    assert store.get(third.id) is third
+    assert store.get(session.id) is None and store.evicted == 2
+    assert store.delete(third.id) and len(store) == 0
+
+
+def test_drag_preview_reports_conflicts_and_leaves_the_session_alone():
+    brief, start = plan()
+    orch = orchestrator()
+    session = SessionStore(orch).create(brief, start)
+    before = session.to_state(cost=True)
+
+    preview = session.preview(move=("bath", -400, -200))  # onto bed1 and into the corridor
+    assert preview.version == 0
+    assert [(r.name, r.x, r.y) for r in preview.rooms] == [("bath", 500, 400)]
+    assert preview.overlaps == ["bed1", "corridor"] and preview.corridor_conflict
+    assert preview.cost_delta is not None
+
+    clear = session.preview(move=("bath", 0, -50), cost=False)
+    assert clear.overlaps == [] and not clear.corridor_conflict and clear.cost_delta is None
+
+    after = session.to_state(cost=True)
+    assert after.rooms == before.rooms and after.version == before.version
+    assert after.validation == before.validation and after.cost == before.cost
+    assert session.state.report().violations == orch.rules.check(start, brief)["violations"]
+    # previewing then applying gives what applying alone gives
+    session.edit(move=("bath", -400, -200))
+    assert session.state.report().compliant == preview.compliant
+
+
+def overlapping(l):
+    return [
+        (a.name, b.name)
+        for i, a in enumerate(l.rooms)
+        for b in l.rooms[i + 1 :]
+        if min(a.x + a.w, b.x + b.w) > max(a.x, b.x) and min(a.y + a.h, b.y + b.h) > max(a.y, b.y)
+    ]
+
+
+def test_pinned_reoptimisation_keeps_pins_and_the_callers_layout():
+    brief = Brief(**TINY_BRIEF)
+    start = layout(
+        ("living", 0, 0, 300, 300),
+        ("kitchen", 300, 0, 200, 200),
+        ("bed1", 0, 300, 250, 250),
+        ("bed2", 250, 300, 250, 250),
+        ("bath", 500, 300, 150, 200),
+    )
+    before = start.model_copy(deep=True)
+    pins = Pins(rooms=[PinRoom(name="bed1", x=600, y=400, w=250, h=250)])
+    out = apply_pins_and_optimize(brief, start, pins)
+    assert start == before
+    bed1 = next(r for r in out.rooms if r.name == "bed1")
+    assert (bed1.x, bed1.y, bed1.w, bed1.h) == (600, 400, 250, 250)
+    assert not overlapping(out)
+    assert all(r.x >= 0 and r.y >= 0 and r.x + r.w <= 900 and r.y + r.h <= 700 for r in out.rooms)
+
+    # two rooms pinned on top of each other have no valid packing: refine only, inside the envelope
+    clash = Pins(rooms=[PinRoom(name="bed1", x=0, y=0), PinRoom(name="bed2", x=100, y=100)])
+    out = apply_pins_and_optimize(brief, start, clash)
+    assert start == before
+    assert {r.name for r in out.rooms} == {r.name for r in start.rooms}
+    assert all(r.x >= 0 and r.y >= 0 and r.x + r.w <= 900 and r.y + r.h <= 700 for r in out.rooms)
+
+
+def test_candidates_stream_before_scoring_then_rank(monkeypatch):
+    brief = Brief(**TINY_BRIEF)
+    orch = orchestrator()
+    scored, solves = [], []
+    score, solve = Critic.score, orch.solver.solve
+    monkeypatch.setattr(Critic, "score", lambda self, b, l: scored.append(l) or score(self, b, l))
+    monkeypatch.setattr(orch.solver, "solve", lambda *a: solves.append(a) or solve(*a))
+
+    updates = iter_candidates(brief, k=2, orch=orch)
+    first = next(updates)
+    assert first.candidate is not None and first.rank == 0 and not first.final
+    assert not scored and not solves  # a topology proposal, sent before the solve and any score
+    rest = list(updates)
+    sent = [first] + [u for u in rest if not u.final]
+    final = [u for u in rest if u.final]
+    assert [u.id for u in sent] == list(range(len(sent))) and len(scored) == len(sent)
+    assert sorted(u.id for u in final) == [u.id for u in sent]
+    assert [u.rank for u in final] == [0, 1] + [None] * (len(sent) - 2)
+
+    critic = Critic()
+    best = sorted((u.candidate.layout for u in sent), key=lambda l: critic.score(brief, l), reverse=True)[:2]
+    assert [c.layout for c in generate_candidates(brief, k=2, orch=orch)] == best
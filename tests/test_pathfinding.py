@@ -0,0 +1,84 @@
+import random
+
+from backend.pathfinding.astar import astar
+
+
+def test_astar_variants_return_optimal_paths():
+    rng = random.Random(7)
+    for _ in range(200):
+        w, h = rng.randint(2, 20), rng.randint(2, 20)
+        grid = [[1 if rng.random() < 0.3 else 0 for _ in range(w)] for _ in range(h)]
+        start, goal = (0, 0), (w - 1, h - 1)
+        grid[0][0] = grid[h - 1][w - 1] = 0
+        paths = [astar(grid, start, goal, jps=False), astar(grid, start, goal), astar(grid, start, goal, bidirectional=True)]
+        if paths[0] is None:
+            assert paths == [None, None, None]
+            continue
+        assert len({len(p) for p in paths}) == 1
+        for p in paths:
+            assert p[0] == start and p[-1] == goal
+            for (x0, y0), (x1, y1) in zip(p, p[1:]):
+                assert abs(x0 - x1) + abs(y0 - y1) == 1 and grid[y1][x1] == 0
+
+
+def test_floor_distances_walk_through_doors():
+    from backend.geometry.circulation import floor_distances
+    from backend.geometry.openings import apply_openings
+    from backend.models.scene import from_brief_and_layout
+    from backend.models.schema import Brief, LayoutResult, PlacedRoom
+
+    brief = Brief(building_w=1300, building_h=400)
+    layout = LayoutResult(
+        rooms=[
+            PlacedRoom(name="living", x=0, y=0, w=300, h=400),
+            PlacedRoom(name="corridor", x=300, y=150, w=700, h=100),
+            PlacedRoom(name="bed1", x=1000, y=0, w=300, h=400),
+            PlacedRoom(name="store", x=500, y=300, w=200, h=100),
+        ]
+    )
+    floor = apply_openings(from_brief_and_layout(brief, layout)).floors[0]
+    dist = floor_distances(floor)
+    assert dist.between("living", "bed1") == 1000.0  # centre -> door -> corridor -> door -> centre
+    assert dist.between("living", "store") == float("inf")  # no door
+    assert floor_distances(floor) is dist
+
+
+def test_hub_distance_walks_through_doors_on_solved_layouts():
+    import json
+
+    from backend.core.cache import ResultCache
+    from backend.core.orchestrator import Orchestrator
+    from backend.core.pool import CandidatePool
+    from backend.geometry.circulation import floor_distances
+    from backend.geometry.openings import apply_openings
+    from backend.models.scene import OpeningType, from_brief_and_layout
+    from backend.models.schema import Brief, LayoutResult, PlacedRoom
+    from backend.pathfinding.grid import rasterize
+    from backend.solver.costs import evaluate_cost
+
+    orch = Orchestrator(pool=CandidatePool(workers=0), cache=ResultCache(max_entries=0))
+    with open("briefs/with_corridor.json") as f:
+        brief = orch.rules.early_prune(Brief(**json.load(f)))
+    layout = orch.run(brief).layout
+    scene = orch.scene(brief, layout)
+    dist = floor_distances(scene.floors[0])
+    # the solver leaves a wall gap between rooms; corridor doors still bridge it
+    assert dist.doors > 0
+    assert any(dist.between("corridor", r.name) < float("inf") for r in layout.rooms if r.name != "corridor")
+
+    walked = evaluate_cost(scene, brief)["hub_distance"]
+    for sp in scene.floors[0].spaces:
+        sp.openings = [op for op in sp.openings if op.opening_type != OpeningType.DOOR]
+    manhattan = evaluate_cost(scene, brief)["hub_distance"]
+    assert walked != manhattan
+
+    # on the egress grid such a door crosses the gap cells instead of opening onto them
+    small = Brief(building_w=200, building_h=200)
+    gapped = LayoutResult(
+        rooms=[PlacedRoom(name="corridor", x=0, y=0, w=200, h=90), PlacedRoom(name="bed1", x=0, y=110, w=200, h=90)]
+    )
+    spaces = apply_openings(from_brief_and_layout(small, gapped)).floors[0].spaces
+    grid = rasterize(spaces, 200, 200, cells=20)
+    bridged = [b for a, bs in grid.bridges.items() for b in bs if grid.owner[a] == 1]
+    assert bridged and all(grid.owner[b] == 0 for b in bridged)
+    assert not any(grid.owner[c] == 1 for c in grid.exterior_doors)
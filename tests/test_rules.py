@@ -0,0 +1,230 @@
+import json
+import os
+
+from backend.geometry.openings import apply_openings
+from backend.geometry.stairs import ensure_stairs
+from backend.models.scene import Opening, OpeningType, Point, from_brief_and_layout, own_floor
+from backend.models.schema import Brief, LayoutResult, PlacedRoom
+from backend.rules.catalog import DEFAULT_RULES
+from backend.rules.dsl import compile_rules, evaluate_rule
+from backend.rules.engine import RulesEngine
+from backend.rules.incremental import ValidationState
+from backend.rules.registry import RuleRegistry
+
+
+def make_scene(floors=1):
+    brief = Brief(building_w=1200, building_h=800, building_floors=floors)
+    layout = LayoutResult(
+        rooms=[
+            PlacedRoom(name="corridor", x=0, y=300, w=1200, h=120),
+            PlacedRoom(name="living", x=0, y=0, w=400, h=300),
+            PlacedRoom(name="bed1", x=400, y=420, w=300, h=200),
+            PlacedRoom(name="bath", x=900, y=600, w=150, h=150),
+        ]
+    )
+    return from_brief_and_layout(brief, layout)
+
+
+def test_replicated_floors_share_until_written():
+    building = ensure_stairs(apply_openings(make_scene(floors=3)))
+    # same-on-every-floor passes edit the shared template once
+    assert all(f.spaces[0] is building.floors[0].spaces[0] for f in building.floors)
+    before = building.floors[1].model_dump()
+
+    copied = own_floor(building.floors[0])
+    copied.spaces[0].openings.append(Opening(opening_type=OpeningType.DOOR, at=Point(x=0, y=0), w=90, h=2000))
+    copied.spaces[0].rect.w += 100
+    assert copied.spaces[0] is not building.floors[1].spaces[0]
+    assert building.floors[1].model_dump() == before
+    assert building.floors[2].spaces[0] is building.floors[1].spaces[0]
+    ids = {o.id for sp in copied.spaces for o in sp.openings}
+    assert not ids & {o.id for sp in building.floors[1].spaces for o in sp.openings}
+
+
+def test_plan_keeps_catalog_order():
+    scene = make_scene()
+    ids = [v.id for v in compile_rules(DEFAULT_RULES).evaluate(scene)]
+    assert ids == [
+        "corridor.min.width",
+        "bedroom.window.egress",
+        "habitable.daylight.window",
+        "bedroom.min.area",
+        "graph.connected",
+        "corridor.private.touch",
+    ]
+
+
+def test_plan_matches_single_rule_evaluation():
+    scene = make_scene(floors=2)
+    plan = compile_rules(DEFAULT_RULES, implicit=False)
+    expected = [v for r in DEFAULT_RULES for v in evaluate_rule(r, scene)]
+    assert plan.evaluate(scene) == expected
+    # replicated floors report per-floor violations
+    assert sum(1 for v in expected if v.id == "corridor.min.width") == 2
+
+
+def test_registry_caches_and_reloads_on_change(tmp_path):
+    path = tmp_path / "rules.json"
+    path.write_text(json.dumps([{"id": "a", "kind": "min_room_area", "min": 10}]), encoding="utf-8")
+    reg = RuleRegistry(check_interval_s=0.0)
+
+    first = reg.get([str(path)])
+    assert first.rule_ids == ["a"]
+    assert reg.get([str(path)]) is first
+
+    path.write_text(json.dumps([{"id": "b", "kind": "min_room_area", "min": 20}]), encoding="utf-8")
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    second = reg.get([str(path)])
+    assert second.rule_ids == ["b"]
+    assert second.version != first.version
+
+
+def test_default_rules_version_is_stable():
+    reg = RuleRegistry()
+    assert reg.get(None).rule_ids == [r["id"] for r in DEFAULT_RULES]
+    assert reg.version(None) == RuleRegistry().version(None)
+
+
+def test_early_prune_returns_a_copy():
+    brief = Brief(building_w=1200, building_h=800, rooms=[{"name": "bath", "min_w": 150, "min_h": 200}])
+    pruned = RulesEngine().early_prune(brief)
+    assert pruned == brief
+    pruned.rooms[0].min_w = 300
+    assert brief.rooms[0].min_w == 150  # the caller's brief is not edited
+
+
+def test_screen_stops_at_first_error():
+    brief = Brief(building_w=1200, building_h=800)
+    layout = LayoutResult(
+        rooms=[
+            PlacedRoom(name="corridor", x=0, y=300, w=1200, h=120),
+            PlacedRoom(name="bed1", x=400, y=420, w=300, h=200),
+        ]
+    )
+    engine = RulesEngine()
+    quick = engine.screen(layout, brief)
+    assert not quick.passed
+    assert [v.id for v in quick.violations] == ["corridor.min.width"]
+    full = engine.screen(layout, brief, fail_fast=False)
+    assert not full.passed
+    assert {"bedroom.window.egress", "bedroom.min.area"} <= {v.id for v in full.violations}
+
+
+def test_incremental_update_matches_full_check():
+    brief = Brief(building_w=1200, building_h=800)
+    layout = LayoutResult(
+        rooms=[
+            PlacedRoom(name="corridor", x=0, y=300, w=1200, h=120),
+            PlacedRoom(name="living", x=0, y=0, w=400, h=300),
+            PlacedRoom(name="bed1", x=400, y=420, w=300, h=380),
+            PlacedRoom(name="bath", x=900, y=600, w=150, h=150),
+        ]
+    )
+    engine = RulesEngine()
+    state = ValidationState(brief, layout, engine)
+    assert state.report().violations == engine.check(layout, brief)["violations"]
+
+    edited = layout.model_copy(deep=True)
+    edited.rooms[3].y = 420  # bath now touches the corridor
+    delta = state.update(edited)
+    assert any("corridor.private.touch" in v for v in delta.removed)
+    assert "living" not in delta.rechecked
+    assert state.report().violations == engine.check(edited, brief)["violations"]
+
+
+def test_incremental_update_matches_full_check_after_moves():
+    from backend.interaction.service import move_room
+
+    brief = Brief(building_w=1200, building_h=800)
+    layout = LayoutResult(
+        rooms=[
+            PlacedRoom(name="corridor", x=0, y=300, w=1200, h=120),
+            PlacedRoom(name="living", x=0, y=0, w=400, h=300),
+            PlacedRoom(name="bed1", x=400, y=420, w=300, h=380),
+            PlacedRoom(name="bath", x=900, y=600, w=150, h=150),
+        ]
+    )
+    engine = RulesEngine()
+    state = ValidationState(brief, layout, engine)
+    # detach living, re-attach bath, move the corridor under everything, then back
+    for name, dx, dy in [("living", 0, -100), ("bath", 0, -180), ("corridor", 0, 100), ("corridor", 0, -100), ("living", 50, 100)]:
+        layout = layout.model_copy(deep=True)
+        move_room(next(r for r in layout.rooms if r.name == name), dx, dy, brief)
+        state.update(layout)
+        assert state.report().violations == engine.check(layout, brief)["violations"]
+
+
+def test_profiler_records_per_rule_stats():
+    from backend.rules.profiling import profiler
+
+    plan = compile_rules(DEFAULT_RULES)
+    building = make_scene(floors=2)
+    expected = plan.evaluate(building)
+    profiler.reset()
+    profiler.enable()
+    try:
+        assert plan.evaluate(building) == expected
+    finally:
+        profiler.disable()
+    rows = {r["rule_id"]: r for r in profiler.snapshot()}
+    profiler.reset()
+    assert {c.rule_id for c in plan.checks} <= set(rows)
+    assert all(rows[c.rule_id]["calls"] == 1 for c in plan.checks)
+    assert sum(rows[c.rule_id]["violations"] for c in plan.checks) == len(expected)
+
+    # a fail-fast walk stops at the corridor's width error: only the checks it ran are counted
+    profiler.enable()
+    try:
+        assert [v.id for v in plan.evaluate(building, stop_on_error=True)] == ["corridor.min.width"]
+    finally:
+        profiler.disable()
+    rows = {r["rule_id"]: r for r in profiler.snapshot() if not r["rule_id"].startswith("facts.")}
+    profiler.reset()
+    assert set(rows) == {"graph.connected", "corridor.min.width"}
+    assert all(r["calls"] == 1 and r["evals"] == 1 for r in rows.values())
+
+
+def test_profiler_merges_worker_process_stats():
+    from backend.core.pool import CandidatePool
+    from backend.rules.profiling import profiler
+
+    brief = Brief(building_w=1200, building_h=800)
+    layouts = [
+        LayoutResult(rooms=[PlacedRoom(name="living", x=0, y=0, w=400, h=300), PlacedRoom(name="bed1", x=400, y=0, w=300, h=300)]),
+        LayoutResult(rooms=[PlacedRoom(name="living", x=0, y=0, w=400, h=300), PlacedRoom(name="bed1", x=0, y=300, w=300, h=300)]),
+    ]
+    pool = CandidatePool(workers=1)
+    profiler.reset()
+    profiler.enable()
+    try:
+        pool.select(brief, layouts, RulesEngine(), None)
+    finally:
+        profiler.disable()
+        pool.shutdown()
+    rows = profiler.snapshot()
+    profiler.reset()
+    # both candidates were screened in the worker; its stats came back with the results
+    assert {r["rule_id"]: r["calls"] for r in rows}["bedroom.min.area"] == len(layouts)
+
+
+def test_egress_rules_use_one_distance_field():
+    brief = Brief(building_w=1300, building_h=400)
+    layout = LayoutResult(
+        rooms=[
+            PlacedRoom(name="living", x=0, y=0, w=300, h=400),
+            PlacedRoom(name="corridor", x=300, y=150, w=700, h=100),
+            PlacedRoom(name="bed1", x=1000, y=0, w=300, h=400),
+        ]
+    )
+    scene = from_brief_and_layout(brief, layout)
+    rules = [
+        {"id": "egress.travel", "kind": "max_travel_distance", "max": 1000},
+        {"id": "egress.dead_end", "kind": "max_dead_end", "max": 300},
+    ]
+    found = [(v.id, v.where) for v in compile_rules(rules).evaluate(scene)]
+    # bed1 is reached through the corridor from the living-room entrance; the corridor only
+    # leads back towards the living room, so it is a dead end
+    assert found == [("egress.travel", "room:bed1"), ("egress.dead_end", "floor@0.0:corridor")]
+    relaxed = [dict(r, max=5000) for r in rules]
+    assert compile_rules(relaxed).evaluate(scene) == []